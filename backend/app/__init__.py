@@ -0,0 +1,4 @@
+from dotenv import load_dotenv
+
+# Before any module reads its settings; most of them load lazily now
+load_dotenv()
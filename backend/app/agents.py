@@ -1,25 +1,73 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
 from strands import Agent
+from strands.agent.state import AgentState
+from strands.telemetry.metrics import EventLoopMetrics
 
-from .models import bedrock_model
+from .models import get_default_model
 from .prompts import architect_prompt, planner_prompt
 
-# Planner Agent
-# ===========================
-planner_agent = Agent(
-    name="WorkflowPlanner",
-    system_prompt=planner_prompt(),
-    model=bedrock_model,
-    # callback_handler=None,
-)
+GENERATION_CONCURRENCY = int(os.getenv("GENERATION_CONCURRENCY", "4"))
+
+
+def create_planner_agent() -> Agent:
+    return Agent(
+        name="WorkflowPlanner",
+        system_prompt=planner_prompt(),
+        model=get_default_model(),
+        # callback_handler=None,
+    )
+
+
+def create_architect_agent() -> Agent:
+    return Agent(
+        name="WorkflowArchitect",
+        system_prompt=architect_prompt(),
+        model=get_default_model(),
+        # callback_handler=None,
+    )
+
+
+class AgentPool:
+    """
+    Bounded pool of identically configured agents.
+
+    Each caller gets an agent to itself with an empty conversation, so
+    prompts never grow with the number of earlier generations and parallel
+    requests never share message history. At most `size` agents are in use
+    at once; further callers block until one is returned.
+    """
+
+    def __init__(self, factory: Callable[[], Agent], size: int = GENERATION_CONCURRENCY):
+        self._factory = factory
+        self._idle: "queue.LifoQueue[Agent]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def acquire(self) -> Iterator[Agent]:
+        with self._slots:
+            try:
+                agent = self._idle.get_nowait()
+            except queue.Empty:
+                agent = self._factory()
+            try:
+                yield agent
+            finally:
+                agent.messages = []
+                agent.state = AgentState()
+                agent.event_loop_metrics = EventLoopMetrics()
+                self._idle.put(agent)
 
 
 # Planner Agent
 # ===========================
-architect_agent = Agent(
-    name="WorkflowArchitect",
-    system_prompt=architect_prompt(),
-    model=bedrock_model,
-    # callback_handler=None,
-)
+planner_pool = AgentPool(create_planner_agent)
 
 
+# Architect Agent
+# ===========================
+architect_pool = AgentPool(create_architect_agent)
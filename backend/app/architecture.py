@@ -0,0 +1,102 @@
+import json
+import re
+from typing import Any, Dict, Union
+
+# Version of the stored architecture format. Rows written before this
+# module existed are version 0: the architect's raw text, JSON-encoded
+# a second time as a string.
+SCHEMA_VERSION = 1
+
+_FENCE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*```\s*$", re.DOTALL)
+
+
+class InvalidArchitectureError(ValueError):
+    """The architect produced something that cannot be executed as a graph."""
+
+
+def canonical_json(architecture: Dict[str, Any]) -> str:
+    """Compact, key-sorted encoding: equal architectures give equal strings."""
+    return json.dumps(architecture, sort_keys=True, separators=(",", ":"))
+
+
+def _decode(raw: str) -> Any:
+    fenced = _FENCE.match(raw)
+    if fenced:
+        raw = fenced.group(1)
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        # Tolerate prose around the object
+        start, end = raw.find("{"), raw.rfind("}")
+        if start == -1 or end <= start:
+            raise InvalidArchitectureError("Architecture is not valid JSON")
+        try:
+            return json.loads(raw[start : end + 1])
+        except json.JSONDecodeError as e:
+            raise InvalidArchitectureError(f"Architecture is not valid JSON: {e}")
+
+
+def parse_architecture(raw: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Decode architect output (or a legacy stored value) into a dict and check
+    that it describes a buildable graph. Raises InvalidArchitectureError.
+    """
+    data = raw
+    # Unwrap code fences and any number of string encodings
+    while isinstance(data, str):
+        data = _decode(data)
+    if not isinstance(data, dict):
+        raise InvalidArchitectureError("Architecture must be a JSON object")
+    validate_architecture(data)
+    return data
+
+
+def validate_architecture(data: Dict[str, Any]) -> None:
+    nodes = data.get("nodes")
+    if not isinstance(nodes, list) or not nodes:
+        raise InvalidArchitectureError("Architecture has no nodes")
+
+    node_ids = set()
+    for node in nodes:
+        for key in ("node_id", "agent_name", "agent_system_prompt"):
+            if not isinstance(node, dict) or not node.get(key):
+                raise InvalidArchitectureError(f"Node is missing '{key}': {node}")
+        tools = node.get("tools")
+        if tools is not None and (
+            not isinstance(tools, list) or not all(isinstance(t, str) for t in tools)
+        ):
+            raise InvalidArchitectureError(
+                f"Node '{node['node_id']}' tools must be a list of tool names"
+            )
+        if node["node_id"] in node_ids:
+            raise InvalidArchitectureError(f"Duplicate node_id '{node['node_id']}'")
+        node_ids.add(node["node_id"])
+
+    def check(node_id: Any, where: str) -> None:
+        if node_id not in node_ids:
+            raise InvalidArchitectureError(f"{where} references unknown node '{node_id}'")
+
+    for edge in data.get("edges", []):
+        check(edge.get("from"), "Edge")
+        check(edge.get("to"), "Edge")
+
+    # Imported here: these modules build on this module's error type
+    from .budget import Budget
+    from .conditions import compile_condition
+
+    for cond_edge in data.get("conditional_edges", []):
+        check(cond_edge.get("from"), "Conditional edge")
+        targets = [b.get("to") for b in cond_edge.get("branches", [])]
+        if "to" in cond_edge:
+            targets.append(cond_edge["to"])
+        if not targets:
+            raise InvalidArchitectureError("Conditional edge has no target")
+        for target in targets:
+            check(target, "Conditional edge")
+        if not isinstance(cond_edge.get("condition"), str):
+            raise InvalidArchitectureError("Conditional edge has no condition expression")
+        for node_id in compile_condition(cond_edge["condition"]).references:
+            check(node_id, "Condition")
+
+    check(data.get("entry_point"), "entry_point")
+    Budget.from_architecture(data)
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List
+
+from fastapi import HTTPException
+
+from .executor import run_on_graph
+from .graph_cache import graph_cache, reset_graph
+
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "16"))
+BATCH_DEFAULT_CONCURRENCY = int(os.getenv("BATCH_DEFAULT_CONCURRENCY", "4"))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "10000"))
+
+
+def _batch_item(index: int, value: Any) -> Dict[str, Any]:
+    """Accept either a bare input string or {"input": ..., "id": ...}."""
+    if isinstance(value, dict) and isinstance(value.get("input"), str):
+        return {"index": index, "id": value.get("id"), "input": value["input"]}
+    if isinstance(value, str):
+        return {"index": index, "id": None, "input": value}
+    raise HTTPException(
+        status_code=422,
+        detail=f"Batch item {index} must be a string or an object with an 'input' string",
+    )
+
+
+def parse_batch_inputs(values: List[Any]) -> List[Dict[str, Any]]:
+    if not isinstance(values, list) or not values:
+        raise HTTPException(status_code=422, detail="Batch inputs must be a non-empty list")
+    if len(values) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413, detail=f"Batch exceeds {BATCH_MAX_ITEMS} inputs"
+        )
+    return [_batch_item(index, value) for index, value in enumerate(values)]
+
+
+def parse_ndjson(data: bytes) -> List[Dict[str, Any]]:
+    """One JSON value per line; blank lines are skipped."""
+    values = []
+    for number, line in enumerate(data.decode("utf-8").splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            values.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            raise HTTPException(
+                status_code=422, detail=f"Invalid JSON on NDJSON line {number}: {e}"
+            )
+    return parse_batch_inputs(values)
+
+
+def _ndjson(payload: Dict[str, Any]) -> str:
+    return json.dumps(payload, default=str) + "\n"
+
+
+async def batch_result_stream(
+    workflow_id: str,
+    workflow_json: Dict[str, Any],
+    items: List[Dict[str, Any]],
+    concurrency: int,
+) -> AsyncIterator[str]:
+    """
+    Run every item through the workflow and yield one NDJSON line per item
+    as it finishes (so in completion order, tagged with its index), then a
+    summary line.
+
+    Each of the `concurrency` workers checks one graph out of the graph
+    cache for the whole batch and resets it between items, so the graph is
+    built at most once per worker rather than once per item. If the client
+    disconnects, workers finish their current item and stop.
+    """
+    loop = asyncio.get_running_loop()
+    results: asyncio.Queue = asyncio.Queue()
+    pending: "queue.SimpleQueue[Dict[str, Any]]" = queue.SimpleQueue()
+    for item in items:
+        pending.put(item)
+    stop = threading.Event()
+    workers = min(concurrency, len(items))
+
+    def publish(payload: Dict[str, Any]) -> None:
+        loop.call_soon_threadsafe(results.put_nowait, payload)
+
+    def worker() -> None:
+        from .tools import available_tools
+
+        try:
+            with graph_cache.acquire(workflow_id, workflow_json, available_tools) as graph:
+                while not stop.is_set():
+                    try:
+                        item = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    started = time.perf_counter()
+                    outcome = {"index": item["index"], "id": item["id"]}
+                    try:
+                        result = run_on_graph(
+                            graph, workflow_id, workflow_json, item["input"]
+                        )
+                        outcome.update(status="succeeded", result=result["result"])
+                        if "budget_exceeded" in result:
+                            outcome["budget_exceeded"] = result["budget_exceeded"]
+                    except Exception as e:
+                        outcome.update(status="failed", error=str(e))
+                    finally:
+                        reset_graph(graph)
+                    outcome["latency_ms"] = round((time.perf_counter() - started) * 1000)
+                    publish(outcome)
+        except Exception as e:
+            # The graph could not be built: fail whatever this worker would have run
+            while True:
+                try:
+                    item = pending.get_nowait()
+                except queue.Empty:
+                    break
+                publish(
+                    {
+                        "index": item["index"],
+                        "id": item["id"],
+                        "status": "failed",
+                        "error": str(e),
+                    }
+                )
+        finally:
+            publish(None)
+
+    started = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="workflow-batch")
+    for _ in range(workers):
+        executor.submit(worker)
+
+    counts = {"succeeded": 0, "failed": 0}
+    try:
+        running = workers
+        while running:
+            payload = await results.get()
+            if payload is None:
+                running -= 1
+                continue
+            counts[payload["status"]] += 1
+            yield _ndjson(payload)
+        yield _ndjson(
+            {
+                "summary": True,
+                "workflow_id": workflow_id,
+                "total": len(items),
+                **counts,
+                "concurrency": workers,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000),
+            }
+        )
+    finally:
+        stop.set()
+        executor.shutdown(wait=False)
@@ -0,0 +1,181 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+from .architecture import InvalidArchitectureError
+
+# USD per million tokens; defaults are Claude 3.7 Sonnet on Bedrock
+PRICE_INPUT_PER_MTOK = float(os.getenv("MODEL_PRICE_INPUT_PER_MTOK", "3.0"))
+PRICE_OUTPUT_PER_MTOK = float(os.getenv("MODEL_PRICE_OUTPUT_PER_MTOK", "15.0"))
+PRICE_CACHE_READ_PER_MTOK = float(os.getenv("MODEL_PRICE_CACHE_READ_PER_MTOK", "0.3"))
+PRICE_CACHE_WRITE_PER_MTOK = float(os.getenv("MODEL_PRICE_CACHE_WRITE_PER_MTOK", "3.75"))
+
+USAGE_KEYS = (
+    "inputTokens",
+    "outputTokens",
+    "totalTokens",
+    "cacheReadInputTokens",
+    "cacheWriteInputTokens",
+)
+ON_EXCEED = ("abort", "degrade")
+
+_meter: ContextVar[Optional["RunMeter"]] = ContextVar("run_meter", default=None)
+
+
+def usage_cost(usage: Dict[str, int]) -> float:
+    """Model cost in USD of a Strands usage dict."""
+    return (
+        usage.get("inputTokens", 0) * PRICE_INPUT_PER_MTOK
+        + usage.get("outputTokens", 0) * PRICE_OUTPUT_PER_MTOK
+        + usage.get("cacheReadInputTokens", 0) * PRICE_CACHE_READ_PER_MTOK
+        + usage.get("cacheWriteInputTokens", 0) * PRICE_CACHE_WRITE_PER_MTOK
+    ) / 1_000_000
+
+
+class BudgetExceededError(Exception):
+    """A run went over its workflow's budget with on_exceed="abort"."""
+
+
+class Budget:
+    """
+    Optional per-run limits, stored as the architecture's "budget" object:
+
+        {"max_tokens": 50000, "max_cost_usd": 0.25, "max_latency_ms": 60000,
+         "on_exceed": "abort" | "degrade"}
+
+    "abort" fails the run at the next model call or node start once a limit
+    is crossed. "degrade" lets running nodes finish but starts no new ones,
+    and the run completes with the outputs it has.
+    """
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        max_cost_usd: Optional[float] = None,
+        max_latency_ms: Optional[int] = None,
+        on_exceed: str = "abort",
+    ):
+        self.max_tokens = max_tokens
+        self.max_cost_usd = max_cost_usd
+        self.max_latency_ms = max_latency_ms
+        self.on_exceed = on_exceed
+
+    @classmethod
+    def from_architecture(cls, data: Dict[str, Any]) -> Optional["Budget"]:
+        """Parse and check the architecture's budget. Raises InvalidArchitectureError."""
+        raw = data.get("budget")
+        if raw is None:
+            return None
+        if not isinstance(raw, dict):
+            raise InvalidArchitectureError("budget must be an object")
+        unknown = set(raw) - {"max_tokens", "max_cost_usd", "max_latency_ms", "on_exceed"}
+        if unknown:
+            raise InvalidArchitectureError(
+                f"Unknown budget fields: {', '.join(sorted(unknown))}"
+            )
+        for key in ("max_tokens", "max_cost_usd", "max_latency_ms"):
+            value = raw.get(key)
+            if value is not None and (
+                isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0
+            ):
+                raise InvalidArchitectureError(f"budget.{key} must be a positive number")
+        on_exceed = raw.get("on_exceed", "abort")
+        if on_exceed not in ON_EXCEED:
+            raise InvalidArchitectureError(
+                f"budget.on_exceed must be one of: {', '.join(ON_EXCEED)}"
+            )
+        return cls(
+            max_tokens=raw.get("max_tokens"),
+            max_cost_usd=raw.get("max_cost_usd"),
+            max_latency_ms=raw.get("max_latency_ms"),
+            on_exceed=on_exceed,
+        )
+
+
+class RunMeter:
+    """
+    Token usage of one run, per node, fed by UsageHooks and checked against
+    the workflow's budget (if any). Counts every model call, including those
+    of nodes that later fail, which Strands' own run totals leave out.
+    """
+
+    def __init__(self, budget: Optional[Budget] = None):
+        self.budget = budget
+        self.nodes: Dict[str, Dict[str, int]] = {}
+        self.exceeded: Optional[str] = None  # reason, once a limit was crossed
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def charge(self, node_id: str, usage: Dict[str, int]) -> None:
+        with self._lock:
+            node = self.nodes.setdefault(node_id, dict.fromkeys(USAGE_KEYS, 0))
+            for key in USAGE_KEYS:
+                node[key] += usage.get(key, 0)
+
+    def usage(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                key: sum(node[key] for node in self.nodes.values()) for key in USAGE_KEYS
+            }
+
+    def cost_usd(self) -> float:
+        return usage_cost(self.usage())
+
+    def _check_limits(self) -> Optional[str]:
+        budget = self.budget
+        if budget.max_latency_ms is not None:
+            elapsed_ms = (time.perf_counter() - self._start) * 1000
+            if elapsed_ms > budget.max_latency_ms:
+                return (
+                    f"latency {elapsed_ms:.0f}ms over budget of {budget.max_latency_ms}ms"
+                )
+        if budget.max_tokens is None and budget.max_cost_usd is None:
+            return None
+        usage = self.usage()
+        if budget.max_tokens is not None and usage["totalTokens"] > budget.max_tokens:
+            return f"{usage['totalTokens']} tokens over budget of {budget.max_tokens}"
+        cost = usage_cost(usage)
+        if budget.max_cost_usd is not None and cost > budget.max_cost_usd:
+            return f"${cost:.4f} over budget of ${budget.max_cost_usd}"
+        return None
+
+    def within_budget(self) -> bool:
+        """
+        False once a limit has been crossed and the budget degrades; raises
+        BudgetExceededError when it aborts.
+        """
+        if self.budget is None:
+            return True
+        if self.exceeded is None:
+            self.exceeded = self._check_limits()
+        if self.exceeded is None:
+            return True
+        if self.budget.on_exceed == "abort":
+            raise BudgetExceededError(f"Budget exceeded: {self.exceeded}")
+        return False
+
+
+@contextmanager
+def meter_scope(meter: RunMeter) -> Iterator[RunMeter]:
+    """Meter the nodes of the run executing inside the block."""
+    token = _meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _meter.reset(token)
+
+
+def current_meter() -> Optional[RunMeter]:
+    return _meter.get()
+
+
+def budget_error(error: BaseException) -> Optional[BudgetExceededError]:
+    """The BudgetExceededError behind an error Strands wrapped, if any."""
+    while error is not None:
+        if isinstance(error, BudgetExceededError):
+            return error
+        error = error.__cause__ or error.__context__
+    return None
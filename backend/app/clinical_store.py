@@ -0,0 +1,373 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import (
+    Any,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .db import ConnectionPool
+
+CLINICAL_DB_FILE = os.getenv("CLINICAL_DB_FILE", "clinical.db")
+CLINICAL_DB_POOL_SIZE = int(os.getenv("CLINICAL_DB_POOL_SIZE", "8"))
+# Size of the synthetic population generated when CLINICAL_DB_FILE is missing
+CLINICAL_SYNTHETIC_PATIENTS = int(os.getenv("CLINICAL_SYNTHETIC_PATIENTS", "10000"))
+# Wall-clock limit for one ad hoc query, including fetching its rows
+CLINICAL_QUERY_TIMEOUT_MS = int(os.getenv("CLINICAL_QUERY_TIMEOUT_MS", "5000"))
+
+# Every per-patient table is clustered on (patient_id, seq): WITHOUT ROWID
+# stores rows in primary key order, so one patient's records are adjacent
+# pages and a lookup is a single index seek plus a short range scan.
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS patients (
+        patient_id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        dob TEXT NOT NULL,
+        gender TEXT NOT NULL,
+        blood_group TEXT NOT NULL,
+        phone TEXT NOT NULL,
+        email TEXT NOT NULL,
+        status TEXT NOT NULL,
+        height_cm REAL NOT NULL
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS conditions (
+        patient_id TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        condition TEXT NOT NULL,
+        diagnosed_on TEXT NOT NULL,
+        status TEXT NOT NULL,
+        PRIMARY KEY (patient_id, seq)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS medications (
+        patient_id TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        drug TEXT NOT NULL,
+        dosage TEXT NOT NULL,
+        frequency TEXT NOT NULL,
+        active INTEGER NOT NULL,
+        started_on TEXT NOT NULL,
+        last_updated TEXT NOT NULL,
+        PRIMARY KEY (patient_id, seq)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS labs (
+        patient_id TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        test TEXT NOT NULL,
+        value REAL NOT NULL,
+        unit TEXT NOT NULL,
+        reference_range TEXT NOT NULL,
+        date TEXT NOT NULL,
+        PRIMARY KEY (patient_id, seq)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS procedures (
+        patient_id TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        date TEXT NOT NULL,
+        performed_by TEXT NOT NULL,
+        PRIMARY KEY (patient_id, seq)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS allergies (
+        patient_id TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        substance TEXT NOT NULL,
+        reaction TEXT NOT NULL,
+        severity TEXT NOT NULL,
+        PRIMARY KEY (patient_id, seq)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS appointments (
+        patient_id TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        date TEXT NOT NULL,
+        department TEXT NOT NULL,
+        doctor TEXT NOT NULL,
+        status TEXT NOT NULL,
+        cost_usd REAL NOT NULL,
+        PRIMARY KEY (patient_id, seq)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS vitals (
+        patient_id TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        recorded_at TEXT NOT NULL,
+        systolic INTEGER NOT NULL,
+        diastolic INTEGER NOT NULL,
+        pulse INTEGER NOT NULL,
+        temp_f REAL NOT NULL,
+        spo2 INTEGER NOT NULL,
+        weight_kg REAL NOT NULL,
+        PRIMARY KEY (patient_id, seq)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS diets (
+        patient_id TEXT PRIMARY KEY,
+        breakfast TEXT NOT NULL,
+        lunch TEXT NOT NULL,
+        dinner TEXT NOT NULL,
+        calories_per_day INTEGER NOT NULL,
+        carbs_pct INTEGER NOT NULL,
+        proteins_pct INTEGER NOT NULL,
+        fats_pct INTEGER NOT NULL,
+        restrictions TEXT NOT NULL
+    ) WITHOUT ROWID
+    """,
+)
+
+# Secondary indexes for cohort and analytic queries; built after a bulk load
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_conditions_condition ON conditions (condition)",
+    "CREATE INDEX IF NOT EXISTS idx_labs_test_date ON labs (test, date)",
+    "CREATE INDEX IF NOT EXISTS idx_appointments_date ON appointments (date, status)",
+    "CREATE INDEX IF NOT EXISTS idx_appointments_department "
+    "ON appointments (department, status)",
+    "CREATE INDEX IF NOT EXISTS idx_medications_drug ON medications (drug)",
+)
+
+# Per-patient record kinds and the order tools expect them in. SQL is only
+# ever built from these constants, never from tool arguments.
+RECORD_ORDER = {
+    "conditions": "seq",
+    "medications": "active DESC, seq",
+    "labs": "date DESC, seq",
+    "procedures": "date DESC, seq",
+    "allergies": "seq",
+    "appointments": "date, seq",
+    "vitals": "recorded_at DESC, seq",
+    "diets": "patient_id",
+}
+
+
+class ClinicalDataSource:
+    """
+    Where the patient and Epic tools read clinical data. A connection_id (or
+    Epic organization) names a source; see `register_data_source`.
+    """
+
+    name = ""
+
+    def patient(self, patient_id: str) -> Optional[Dict[str, Any]]:
+        """Demographics of one patient, or None if the source has no such patient."""
+        raise NotImplementedError
+
+    def records(self, kind: str, patient_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        One patient's records of a kind in RECORD_ORDER, or None if the
+        source has no such patient.
+        """
+        raise NotImplementedError
+
+    def records_many(
+        self, kind: str, patient_ids: Sequence[str], columns: Sequence[str]
+    ) -> Tuple[List[tuple], List[str]]:
+        """
+        Records of a kind for many patients as (patient_id, *columns) tuples,
+        grouped by patient in the order given and then in RECORD_ORDER, plus
+        the ids the source has no patient for.
+        """
+        rows: List[tuple] = []
+        unknown: List[str] = []
+        for patient_id in patient_ids:
+            records = self.records(kind, patient_id)
+            if records is None:
+                unknown.append(patient_id)
+                continue
+            rows.extend(
+                (patient_id, *(record[column] for column in columns))
+                for record in records
+            )
+        return rows, unknown
+
+    def query(
+        self, sql: str, params: Union[Sequence[Any], Dict[str, Any]] = ()
+    ) -> ContextManager[sqlite3.Cursor]:
+        """
+        Run one read-only SELECT over the source's tables and yield its
+        cursor, so the caller can stream rows with fetchmany().
+        """
+        raise NotImplementedError
+
+
+# Authorizer actions an ad hoc query may use; anything else (writes, PRAGMA,
+# ATTACH) is refused when the statement is compiled
+_READ_ONLY_ACTIONS = {
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    getattr(sqlite3, "SQLITE_RECURSIVE", 33),
+}
+
+
+def _read_only(action: int, *args) -> int:
+    return sqlite3.SQLITE_OK if action in _READ_ONLY_ACTIONS else sqlite3.SQLITE_DENY
+
+
+class SQLiteClinicalStore(ClinicalDataSource):
+    """
+    Clinical data in a local SQLite file, read over pooled connections.
+    Lookups by patient_id are primary key range scans, so they stay well
+    under a millisecond however many patients the file holds.
+    """
+
+    def __init__(self, db_file: str, pool_size: int = CLINICAL_DB_POOL_SIZE):
+        self.name = f"sqlite:{db_file}"
+        self.db_file = db_file
+        self._pool = ConnectionPool(db_file, pool_size)
+        # Stores generated by older versions may lack newer indexes
+        with self._pool.connection() as conn:
+            for statement in INDEXES:
+                conn.execute(statement)
+
+    def patient(self, patient_id: str) -> Optional[Dict[str, Any]]:
+        with self._pool.connection() as conn:
+            cursor = conn.execute(
+                "SELECT * FROM patients WHERE patient_id = ?", (patient_id,)
+            )
+            row = cursor.fetchone()
+            return _as_dict(cursor, row) if row else None
+
+    def records(self, kind: str, patient_id: str) -> Optional[List[Dict[str, Any]]]:
+        order = RECORD_ORDER.get(kind)
+        if order is None:
+            raise ValueError(f"Unknown clinical record kind '{kind}'")
+        with self._pool.connection() as conn:
+            cursor = conn.execute(
+                f"SELECT * FROM {kind} WHERE patient_id = ? ORDER BY {order}",
+                (patient_id,),
+            )
+            rows = [_as_dict(cursor, row) for row in cursor]
+            if not rows and not conn.execute(
+                "SELECT 1 FROM patients WHERE patient_id = ?", (patient_id,)
+            ).fetchone():
+                return None
+            return rows
+
+    def records_many(
+        self, kind: str, patient_ids: Sequence[str], columns: Sequence[str]
+    ) -> Tuple[List[tuple], List[str]]:
+        order = RECORD_ORDER.get(kind)
+        if order is None:
+            raise ValueError(f"Unknown clinical record kind '{kind}'")
+        selected = ", ".join(f"r.{column}" for column in columns)
+        # The ids travel as one JSON parameter, so any number of them is a
+        # single statement: a primary key range scan per id, in id order
+        ids = json.dumps(list(patient_ids))
+        with self._pool.connection() as conn:
+            rows = conn.execute(
+                f"SELECT ids.value, {selected} FROM json_each(?) AS ids "
+                f"JOIN {kind} AS r ON r.patient_id = ids.value "
+                f"ORDER BY ids.key, {order}",
+                (ids,),
+            ).fetchall()
+            unknown = [
+                patient_id
+                for (patient_id,) in conn.execute(
+                    "SELECT ids.value FROM json_each(?) AS ids WHERE NOT EXISTS "
+                    "(SELECT 1 FROM patients WHERE patient_id = ids.value)",
+                    (ids,),
+                )
+            ]
+        return rows, unknown
+
+    @contextmanager
+    def query(
+        self,
+        sql: str,
+        params: Union[Sequence[Any], Dict[str, Any]] = (),
+        timeout_ms: int = CLINICAL_QUERY_TIMEOUT_MS,
+    ) -> Iterator[sqlite3.Cursor]:
+        deadline = time.perf_counter() + timeout_ms / 1000
+        with self._pool.connection() as conn:
+            conn.set_authorizer(_read_only)
+            # Called every few thousand VM steps; a non-zero return interrupts
+            conn.set_progress_handler(lambda: time.perf_counter() > deadline, 10000)
+            try:
+                cursor = conn.execute(sql, params)
+                try:
+                    yield cursor
+                finally:
+                    cursor.close()
+            finally:
+                conn.set_authorizer(None)
+                conn.set_progress_handler(None, 0)
+
+    def close(self) -> None:
+        self._pool.close()
+
+
+def _as_dict(cursor: sqlite3.Cursor, row: tuple) -> Dict[str, Any]:
+    return {
+        column[0]: value
+        for column, value in zip(cursor.description, row)
+        if column[0] not in ("patient_id", "seq")
+    }
+
+
+def create_schema(conn: sqlite3.Connection) -> None:
+    for statement in SCHEMA:
+        conn.execute(statement)
+
+
+_sources: Dict[str, ClinicalDataSource] = {}
+_default_source: Optional[SQLiteClinicalStore] = None
+_sources_lock = threading.Lock()
+
+
+def register_data_source(source_id: str, source: ClinicalDataSource) -> None:
+    """Serve tool calls naming `source_id` as connection_id or organization."""
+    with _sources_lock:
+        _sources[source_id] = source
+
+
+def configure_data_source(db_file: str) -> None:
+    """Point the default source at another store file (benchmarks, scripts)."""
+    global _default_source
+    with _sources_lock:
+        if _default_source is not None:
+            _default_source.close()
+        _default_source = SQLiteClinicalStore(db_file)
+
+
+def get_data_source(source_id: Optional[str] = None) -> ClinicalDataSource:
+    """
+    The source registered for `source_id`, else the local store at
+    CLINICAL_DB_FILE. A missing store file is first filled with a
+    synthetic population of CLINICAL_SYNTHETIC_PATIENTS patients.
+    """
+    global _default_source
+    source = _sources.get(source_id) if source_id else None
+    if source is not None:
+        return source
+    if _default_source is None:
+        with _sources_lock:
+            if _default_source is None:
+                if not os.path.exists(CLINICAL_DB_FILE):
+                    from .synthetic_data import generate
+
+                    generate(CLINICAL_DB_FILE, CLINICAL_SYNTHETIC_PATIENTS)
+                _default_source = SQLiteClinicalStore(CLINICAL_DB_FILE)
+    return _default_source
@@ -0,0 +1,314 @@
+import json
+import re
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+from .architecture import InvalidArchitectureError
+
+# Condition language emitted by the architect, e.g.
+#   {{nodes.step_1.outputs.is_valid}} == true
+#   {{nodes.triage.outputs.risk}} >= 0.7 and not {{nodes.triage.outputs.stable}}
+# Operands are {{references}}, quoted strings, numbers, true/false/null and
+# bare words (read as strings). Operators: == != < <= > >=, in, contains,
+# and/&&, or/||, not/!, parentheses.
+
+_TOKEN = re.compile(
+    r"""
+    \s*(?:
+        (?P<ref>\{\{\s*(?P<path>[^{}]+?)\s*\}\})
+      | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<number>-?\d+(?:\.\d+)?)
+      | (?P<op>==|!=|<=|>=|&&|\|\||[<>!()])
+      | (?P<word>[A-Za-z_][\w\-]*(?:\.[\w\-]+)*)
+    )
+    """,
+    re.VERBOSE,
+)
+_UNESCAPE = re.compile(r"\\(.)")
+_FENCE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*```\s*$", re.DOTALL)
+
+_KEYWORDS = {"and": "&&", "or": "||", "not": "!", "in": "in", "contains": "contains"}
+_LITERALS = {"true": True, "false": False, "null": None, "none": None}
+
+Resolver = Callable[[str], Any]
+
+
+class InvalidConditionError(InvalidArchitectureError):
+    """A conditional edge's expression cannot be parsed."""
+
+
+def _tokenize(expression: str) -> List[Tuple[str, Any]]:
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = _TOKEN.match(expression, position)
+        if not match or match.end() == position:
+            raise InvalidConditionError(
+                f"Unexpected text at {position} in condition '{expression}'"
+            )
+        position = match.end()
+        if match.group("ref"):
+            tokens.append(("ref", match.group("path")))
+        elif match.group("string"):
+            tokens.append(("value", _UNESCAPE.sub(r"\1", match.group("string")[1:-1])))
+        elif match.group("number"):
+            number = match.group("number")
+            tokens.append(("value", float(number) if "." in number else int(number)))
+        elif match.group("op"):
+            tokens.append(("op", match.group("op")))
+        else:
+            word = match.group("word")
+            lowered = word.lower()
+            if lowered in _KEYWORDS:
+                tokens.append(("op", _KEYWORDS[lowered]))
+            elif lowered in _LITERALS:
+                tokens.append(("value", _LITERALS[lowered]))
+            elif lowered.startswith(("nodes.", "workflow.")):
+                tokens.append(("ref", word))
+            else:
+                tokens.append(("value", word))
+    return tokens
+
+
+def _from_text(value: str) -> Any:
+    text = value.strip()
+    if text.lower() in _LITERALS:
+        return _LITERALS[text.lower()]
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def _coerce(left: Any, right: Any) -> Tuple[Any, Any]:
+    """Model outputs are text; read "true" or "0.8" as the literal they are compared to."""
+    if isinstance(left, str) and right is not None and not isinstance(right, str):
+        left = _from_text(left)
+    elif isinstance(right, str) and left is not None and not isinstance(left, str):
+        right = _from_text(right)
+    if isinstance(left, str) and isinstance(right, str):
+        return left.strip().casefold(), right.strip().casefold()
+    return left, right
+
+
+def _compare(op: str, left: Any, right: Any) -> bool:
+    if op in ("<", "<=", ">", ">=") and isinstance(left, str) and isinstance(right, str):
+        # "0.8" > "0.75" is a numeric comparison when both sides are numbers
+        left, right = _from_text(left), _from_text(right)
+    left, right = _coerce(left, right)
+    try:
+        if op == "==":
+            return left == right
+        if op == "!=":
+            return left != right
+        if op == "<":
+            return left < right
+        if op == "<=":
+            return left <= right
+        if op == ">":
+            return left > right
+        if op == ">=":
+            return left >= right
+        if op == "in":
+            return left in right
+        if op == "contains":
+            return right in left
+    except TypeError:
+        return False
+    raise InvalidConditionError(f"Unknown operator '{op}'")
+
+
+class _Parser:
+    """Recursive descent over the token list, producing closures over a resolver."""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.tokens = _tokenize(expression)
+        self.position = 0
+        self.references: Set[str] = set()
+
+    def parse(self) -> Callable[[Resolver], Any]:
+        if not self.tokens:
+            raise InvalidConditionError("Condition is empty")
+        node = self._or()
+        if self.position != len(self.tokens):
+            raise InvalidConditionError(
+                f"Unexpected '{self.tokens[self.position][1]}' in condition '{self.expression}'"
+            )
+        return node
+
+    def _peek(self) -> Optional[Tuple[str, Any]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _accept(self, *ops: str) -> Optional[str]:
+        token = self._peek()
+        if token and token[0] == "op" and token[1] in ops:
+            self.position += 1
+            return token[1]
+        return None
+
+    def _or(self):
+        left = self._and()
+        while self._accept("||"):
+            right, first = self._and(), left
+            left = lambda resolve, a=first, b=right: _truthy(a(resolve)) or _truthy(b(resolve))
+        return left
+
+    def _and(self):
+        left = self._not()
+        while self._accept("&&"):
+            right, first = self._not(), left
+            left = lambda resolve, a=first, b=right: _truthy(a(resolve)) and _truthy(b(resolve))
+        return left
+
+    def _not(self):
+        if self._accept("!"):
+            operand = self._not()
+            return lambda resolve: not _truthy(operand(resolve))
+        return self._comparison()
+
+    def _comparison(self):
+        left = self._operand()
+        op = self._accept("==", "!=", "<", "<=", ">", ">=", "in", "contains")
+        if op is None:
+            return left
+        right = self._operand()
+        return lambda resolve: _compare(op, left(resolve), right(resolve))
+
+    def _operand(self):
+        token = self._peek()
+        if token is None:
+            raise InvalidConditionError(f"Condition '{self.expression}' ends unexpectedly")
+        self.position += 1
+        kind, value = token
+        if kind == "value":
+            return lambda resolve: value
+        if kind == "ref":
+            parts = value.split(".")
+            if parts[0] == "nodes" and len(parts) > 1:
+                self.references.add(parts[1])
+            return lambda resolve: resolve(value)
+        if value == "(":
+            inner = self._or()
+            if not self._accept(")"):
+                raise InvalidConditionError(f"Missing ')' in condition '{self.expression}'")
+            return inner
+        raise InvalidConditionError(f"Unexpected '{value}' in condition '{self.expression}'")
+
+
+def _truthy(value: Any) -> bool:
+    if isinstance(value, str):
+        value = _from_text(value)
+        if isinstance(value, str):
+            return bool(value.strip())
+    return bool(value)
+
+
+class Condition:
+    """A compiled condition; `evaluate` returns its value, calling it returns a bool."""
+
+    def __init__(self, expression: str):
+        parser = _Parser(expression)
+        self.expression = expression
+        self._evaluate = parser.parse()
+        self.references = frozenset(parser.references)
+
+    def evaluate(self, resolve: Resolver) -> Any:
+        return self._evaluate(resolve)
+
+    def __call__(self, resolve: Resolver) -> bool:
+        return _truthy(self._evaluate(resolve))
+
+    def __repr__(self) -> str:
+        return f"Condition({self.expression!r})"
+
+
+@lru_cache(maxsize=1024)
+def compile_condition(expression: str) -> Condition:
+    """Parse once; identical expressions share one compiled Condition."""
+    return Condition(expression)
+
+
+def decode_output(text: str) -> Any:
+    """Node output as JSON when it is (possibly fenced or wrapped in prose), else the text."""
+    fenced = _FENCE.match(text)
+    candidate = fenced.group(1) if fenced else text
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError:
+        start, end = candidate.find("{"), candidate.rfind("}")
+        if start != -1 and end > start:
+            try:
+                return json.loads(candidate[start : end + 1])
+            except json.JSONDecodeError:
+                pass
+    return text
+
+
+def lookup(value: Any, keys: List[str]) -> Any:
+    for key in keys:
+        if isinstance(value, dict):
+            value = value.get(key)
+        elif isinstance(value, list) and key.lstrip("-").isdigit():
+            index = int(key)
+            value = value[index] if -len(value) <= index < len(value) else None
+        else:
+            return None
+    return value
+
+
+def state_resolver(state: Any) -> Resolver:
+    """
+    Resolve references against a Strands GraphState. `nodes.<id>.outputs.<path>`
+    walks the node's output decoded as JSON (`nodes.<id>.output` is the whole
+    output); `workflow.input` is the task. Nodes that have not produced
+    output resolve to None.
+    """
+    decoded = {}
+
+    def node_output(node_id: str) -> Any:
+        if node_id not in decoded:
+            node_result = state.results.get(node_id)
+            agent_results = node_result.get_agent_results() if node_result else []
+            decoded[node_id] = (
+                decode_output(str(agent_results[-1]).strip()) if agent_results else None
+            )
+        return decoded[node_id]
+
+    def resolve(path: str) -> Any:
+        parts = path.split(".")
+        if parts[0] == "nodes" and len(parts) > 1:
+            rest = parts[2:]
+            if rest and rest[0] in ("outputs", "output", "result"):
+                rest = rest[1:]
+            return lookup(node_output(parts[1]), rest)
+        if parts[0] == "workflow":
+            task = state.task if isinstance(state.task, str) else None
+            rest = parts[1:]
+            if rest and rest[0] in ("inputs", "input"):
+                rest = rest[1:]
+            return lookup(decode_output(task), rest) if rest and task else task
+        return None
+
+    return resolve
+
+
+def edge_predicate(
+    condition: Condition, case: Any = None, other_cases: Tuple[Any, ...] = ()
+) -> Callable[[Any], bool]:
+    """
+    Edge condition for GraphBuilder.add_edge. Without a case the edge is taken
+    when the condition is truthy; with one, when the condition's value equals
+    it. A "default" case is taken when none of `other_cases` match.
+    """
+    if case is None:
+        return lambda state: condition(state_resolver(state))
+    if isinstance(case, str) and case.lower() in ("default", "else", "otherwise"):
+
+        def otherwise(state: Any) -> bool:
+            value = condition.evaluate(state_resolver(state))
+            return not any(_compare("==", value, other) for other in other_cases)
+
+        return otherwise
+    return lambda state: _compare("==", condition.evaluate(state_resolver(state)), case)
@@ -0,0 +1,286 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from .architecture import (
+    SCHEMA_VERSION,
+    InvalidArchitectureError,
+    canonical_json,
+    parse_architecture,
+)
+from .metrics import SQLITE_SECONDS
+
+DB_FILE = os.getenv("WORKFLOW_DB_FILE", "workflows.db")
+DB_POOL_SIZE = int(os.getenv("WORKFLOW_DB_POOL_SIZE", "8"))
+
+# Applied to every pooled connection. WAL lets the FastAPI backend and the
+# Streamlit UI read while the other writes; synchronous=NORMAL is durable
+# across application crashes in WAL mode and avoids an fsync per commit.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",  # 16 MB page cache per connection
+    "PRAGMA mmap_size=268435456",  # 256 MB memory-mapped reads
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+# sqlite3 keeps a per-connection cache of compiled statements keyed by SQL
+# text; since pooled connections live for the whole process, every query
+# string below is prepared once per connection and then reused.
+STATEMENT_CACHE_SIZE = 256
+
+
+class ConnectionPool:
+    """Thread-safe pool of long-lived SQLite connections to one database file."""
+
+    def __init__(self, db_file: str, size: int = DB_POOL_SIZE):
+        self.db_file = db_file
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_file,
+            timeout=5.0,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a connection for the duration of the block. The transaction is
+        committed when the block exits normally and rolled back otherwise.
+        """
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                self._idle.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_FILE)
+    return _pool
+
+
+def configure_db(db_file: str, pool_size: int = DB_POOL_SIZE) -> None:
+    """Point the data-access layer at another database file (benchmarks, scripts)."""
+    global _pool, DB_FILE
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        DB_FILE = db_file
+        _pool = ConnectionPool(db_file, pool_size)
+
+
+@contextmanager
+def get_connection() -> Iterator[sqlite3.Connection]:
+    with SQLITE_SECONDS.time(), get_pool().connection() as conn:
+        yield conn
+
+
+# ------------------------------
+# Schema Migrations
+# ------------------------------
+# Append new migrations to MIGRATIONS; never edit or reorder applied ones.
+# The number of applied migrations is stored in PRAGMA user_version.
+
+
+def _add_listing_indexes(cursor: sqlite3.Cursor) -> None:
+    # Serves /workflow/list: equality on user_id, then keyset order
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_workflows_user_created
+        ON workflows (user_id, created_at DESC, id DESC)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_execution_history_workflow_executed
+        ON execution_history (workflow_id, executed_at DESC)
+    """)
+
+
+def _canonicalize_architectures(cursor: sqlite3.Cursor) -> None:
+    # Re-encode double-encoded architect output as canonical JSON. Rows that
+    # do not parse keep schema_version 0 and the legacy read path.
+    cursor.execute(
+        "ALTER TABLE workflows ADD COLUMN schema_version INTEGER NOT NULL DEFAULT 0"
+    )
+    rows = cursor.execute("SELECT id, architecture FROM workflows").fetchall()
+    for workflow_id, architecture in rows:
+        try:
+            parsed = parse_architecture(architecture)
+        except InvalidArchitectureError:
+            continue
+        cursor.execute(
+            "UPDATE workflows SET architecture = ?, schema_version = ? WHERE id = ?",
+            (canonical_json(parsed), SCHEMA_VERSION, workflow_id),
+        )
+
+
+def _add_execution_metrics(cursor: sqlite3.Cursor) -> None:
+    # Run outcome and metrics recorded by the backend executor
+    for column in (
+        "status TEXT",
+        "error TEXT",
+        "latency_ms INTEGER",
+        "input_tokens INTEGER",
+        "output_tokens INTEGER",
+        "total_tokens INTEGER",
+        "node_metrics TEXT",  # JSON list, one entry per node
+        "tool_calls TEXT",  # JSON list, one entry per tool invocation
+    ):
+        cursor.execute(f"ALTER TABLE execution_history ADD COLUMN {column}")
+
+
+def _add_critical_path(cursor: sqlite3.Cursor) -> None:
+    # JSON list of node ids on the run's critical path, in execution order
+    cursor.execute("ALTER TABLE execution_history ADD COLUMN critical_path TEXT")
+
+
+def _add_cost_accounting(cursor: sqlite3.Cursor) -> None:
+    # Prompt-cache tokens and model cost per run, plus running totals per
+    # workflow so /workflow/list can show the average cost without a scan
+    for column in (
+        "cache_read_tokens INTEGER",
+        "cache_write_tokens INTEGER",
+        "cost_usd REAL",
+    ):
+        cursor.execute(f"ALTER TABLE execution_history ADD COLUMN {column}")
+    cursor.execute(
+        "ALTER TABLE workflows ADD COLUMN costed_runs INTEGER NOT NULL DEFAULT 0"
+    )
+    cursor.execute(
+        "ALTER TABLE workflows ADD COLUMN total_cost_usd REAL NOT NULL DEFAULT 0"
+    )
+
+
+MIGRATIONS = [
+    _add_listing_indexes,
+    _canonicalize_architectures,
+    _add_execution_metrics,
+    _add_critical_path,
+    _add_cost_accounting,
+]
+
+
+def migrate(conn: sqlite3.Connection) -> None:
+    """Apply pending migrations; safe to call from several processes at once."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        cursor = conn.cursor()
+        for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            migration(cursor)
+            cursor.execute(f"PRAGMA user_version = {number}")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+# Initialize Database
+def init_db():
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        # Users table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                password TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # Workflows table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS workflows (
+                id TEXT PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                description TEXT NOT NULL,
+                architecture TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            )
+        """)
+
+        # Execution history table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS execution_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                workflow_id TEXT NOT NULL,
+                user_id INTEGER NOT NULL,
+                input TEXT NOT NULL,
+                output TEXT NOT NULL,
+                executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (workflow_id) REFERENCES workflows(id),
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            )
+        """)
+
+        # Background execution jobs
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                workflow_id TEXT NOT NULL,
+                input TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                started_at TIMESTAMP,
+                finished_at TIMESTAMP,
+                FOREIGN KEY (workflow_id) REFERENCES workflows(id)
+            )
+        """)
+
+        # Planner/architect output keyed by normalized description
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS generation_cache (
+                cache_key TEXT PRIMARY KEY,
+                registry_version TEXT NOT NULL,
+                plan TEXT NOT NULL,
+                architecture TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_generation_cache_last_used
+            ON generation_cache (last_used_at)
+        """)
+        conn.commit()
+
+        migrate(conn)
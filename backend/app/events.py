@@ -0,0 +1,30 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator
+
+Listener = Callable[[Dict[str, Any]], None]
+
+# Listeners for the run executing in the current context. Strands copies the
+# context into every task/thread it spawns for nodes, model calls and tools,
+# so hooks fired anywhere inside a run see the listeners of that run only.
+_listeners: ContextVar[tuple] = ContextVar("workflow_event_listeners", default=())
+
+
+@contextmanager
+def listen(listener: Listener) -> Iterator[None]:
+    """Deliver every event emitted inside the block to `listener`."""
+    token = _listeners.set(_listeners.get() + (listener,))
+    try:
+        yield
+    finally:
+        _listeners.reset(token)
+
+
+def emit(event: str, **data: Any) -> None:
+    listeners = _listeners.get()
+    if not listeners:
+        return
+    payload = {"event": event, "timestamp": time.time(), **data}
+    for listener in listeners:
+        listener(payload)
@@ -0,0 +1,159 @@
+import asyncio
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .budget import Budget, RunMeter, budget_error, meter_scope, usage_cost
+from .events import Listener, emit, listen
+from .graph_cache import graph_cache
+from .history import RunRecorder, history_writer
+from .metrics import WORKFLOW_RUN_SECONDS, WORKFLOW_RUNS_IN_FLIGHT
+from .telemetry import span, workflow_context
+from .tool_cache import tool_cache
+from .utils import get_workflow_from_db
+
+if TYPE_CHECKING:
+    from strands.multiagent.base import NodeResult
+    from strands.multiagent.graph import Graph
+
+
+def _schedule(graph: "Graph") -> Dict[str, Any]:
+    """Scheduler report of the graph's last run (empty for plain Strands graphs)."""
+    return getattr(graph, "schedule", {})
+
+
+def _node_metrics(
+    results: Dict[str, "NodeResult"],
+    recorder: RunRecorder,
+    meter: RunMeter,
+    schedule: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    """
+    Merge hook timings with each node's metered token usage and cost and the
+    scheduler's wait/run split.
+    """
+    scheduled = schedule.get("nodes", {})
+    critical = set(schedule.get("critical_path", []))
+    metrics = []
+    for node_id, timing in recorder.nodes.items():
+        entry = {"node_id": node_id, **timing}
+        node_result = results.get(node_id)
+        if node_result is not None:
+            entry["status"] = node_result.status.value
+        usage = meter.nodes.get(node_id, {})
+        entry["input_tokens"] = usage.get("inputTokens", 0)
+        entry["output_tokens"] = usage.get("outputTokens", 0)
+        entry["cache_read_tokens"] = usage.get("cacheReadInputTokens", 0)
+        entry["cache_write_tokens"] = usage.get("cacheWriteInputTokens", 0)
+        entry["cost_usd"] = round(usage_cost(usage), 6)
+        for key in ("ready_ms", "wait_ms", "run_ms"):
+            if key in scheduled.get(node_id, {}):
+                entry[key] = scheduled[node_id][key]
+        entry["critical"] = node_id in critical
+        metrics.append(entry)
+    return metrics
+
+
+def run_workflow(
+    workflow_id: str, input: str, listener: Optional[Listener] = None
+) -> Dict[str, Any]:
+    """
+    Run the stored workflow on the given input and return the text produced
+    by the last node. The compiled graph comes from the graph cache, so only
+    the first run of a workflow pays for building agents, and repeated tool
+    calls are answered from the tool result cache.
+
+    This is blocking (the Strands graph waits on Bedrock), so callers on the
+    event loop must hand it to a worker thread. If `listener` is given it
+    receives the progress events of this run as they happen. Every run,
+    successful or not, is queued for the execution_history table.
+    """
+    from .tools import available_tools  # loads Strands on the first run
+
+    workflow_json = get_workflow_from_db(workflow_id)
+    with graph_cache.acquire(workflow_id, workflow_json, available_tools) as graph:
+        return run_on_graph(graph, workflow_id, workflow_json, input, listener)
+
+
+def run_on_graph(
+    graph: "Graph",
+    workflow_id: str,
+    workflow_json: Dict[str, Any],
+    input: str,
+    listener: Optional[Listener] = None,
+) -> Dict[str, Any]:
+    """
+    Run one input on a graph already checked out of the graph cache. The
+    caller owns the graph and must reset it before running it again.
+
+    Token usage is metered per node and checked against the workflow's
+    budget. A degraded run returns the last output produced before the
+    budget ran out; an aborted one raises BudgetExceededError.
+    """
+    recorder = RunRecorder()
+    meter = RunMeter(Budget.from_architecture(workflow_json))
+    try:
+        with (
+            span("workflow.run", workflow_id=workflow_id),
+            workflow_context(workflow_id),
+            WORKFLOW_RUNS_IN_FLIGHT.track(),
+            tool_cache.run_scope(),
+            meter_scope(meter),
+            listen(recorder),
+            listen(listener) if listener else nullcontext(),
+        ):
+            emit(
+                "workflow_start",
+                workflow_id=workflow_id,
+                nodes=[node["node_id"] for node in workflow_json["nodes"]],
+            )
+            response = asyncio.run(graph.invoke_async(input))
+
+        last_key = list(response.results.keys())[-1]
+        final_result = response.results[last_key].result.message["content"][0]["text"]
+    except Exception as e:
+        exceeded = budget_error(e)
+        status = "aborted" if exceeded else "failed"
+        WORKFLOW_RUN_SECONDS.observe(
+            recorder.elapsed_ms() / 1000, workflow_id=workflow_id, status=status
+        )
+        # The graph's state still holds whatever the failed run produced
+        history_writer.record(
+            workflow_id,
+            input,
+            output="",
+            status=status,
+            error=str(exceeded or e),
+            latency_ms=recorder.elapsed_ms(),
+            usage=meter.usage(),
+            cost_usd=meter.cost_usd(),
+            node_metrics=_node_metrics(
+                graph.state.results, recorder, meter, _schedule(graph)
+            ),
+            tool_calls=recorder.tool_calls,
+            critical_path=_schedule(graph).get("critical_path"),
+        )
+        if exceeded:
+            raise exceeded from None
+        raise
+
+    status = "degraded" if meter.exceeded else "completed"
+    WORKFLOW_RUN_SECONDS.observe(
+        recorder.elapsed_ms() / 1000, workflow_id=workflow_id, status=status
+    )
+    history_writer.record(
+        workflow_id,
+        input,
+        output=final_result,
+        status=status,
+        error=meter.exceeded,
+        latency_ms=recorder.elapsed_ms(),
+        usage=meter.usage(),
+        cost_usd=meter.cost_usd(),
+        node_metrics=_node_metrics(response.results, recorder, meter, _schedule(graph)),
+        tool_calls=recorder.tool_calls,
+        critical_path=_schedule(graph).get("critical_path"),
+    )
+    result = {"workflow_id": workflow_id, "result": final_result, "status": status}
+    if meter.exceeded:
+        result["budget_exceeded"] = meter.exceeded
+    return result
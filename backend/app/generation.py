@@ -0,0 +1,120 @@
+import hashlib
+import os
+import re
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Optional, Tuple
+
+from .architecture import canonical_json, parse_architecture
+from .db import get_connection
+from .prompts import planner_prompt, registry_version
+
+GENERATION_CACHE_TTL = int(os.getenv("GENERATION_CACHE_TTL", str(24 * 60 * 60)))
+GENERATION_CACHE_MAX_ENTRIES = int(os.getenv("GENERATION_CACHE_MAX_ENTRIES", "1000"))
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def normalize_description(description: str) -> str:
+    """Fold case, unicode forms, whitespace and trailing punctuation."""
+    text = unicodedata.normalize("NFKC", description).casefold()
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip(".!?;, ")
+
+
+def generation_cache_key(description: str) -> str:
+    payload = f"{registry_version()}\n{normalize_description(description)}"
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _cache_get(cache_key: str) -> Optional[Tuple[str, str]]:
+    now = time.time()
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT plan, architecture FROM generation_cache WHERE cache_key = ? AND created_at >= ?",
+            (cache_key, now - GENERATION_CACHE_TTL),
+        ).fetchone()
+        if row:
+            conn.execute(
+                "UPDATE generation_cache SET last_used_at = ?, hits = hits + 1 WHERE cache_key = ?",
+                (now, cache_key),
+            )
+    return row
+
+
+def _cache_put(cache_key: str, plan: str, architecture: str) -> None:
+    now = time.time()
+    with get_connection() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO generation_cache
+                (cache_key, registry_version, plan, architecture, created_at, last_used_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """,
+            (cache_key, registry_version(), plan, architecture, now, now),
+        )
+        # Expire by TTL, then evict least recently used entries over the cap
+        conn.execute(
+            "DELETE FROM generation_cache WHERE created_at < ?",
+            (now - GENERATION_CACHE_TTL,),
+        )
+        conn.execute(
+            """
+            DELETE FROM generation_cache WHERE cache_key IN (
+                SELECT cache_key FROM generation_cache
+                ORDER BY last_used_at DESC
+                LIMIT -1 OFFSET ?
+            )
+        """,
+            (GENERATION_CACHE_MAX_ENTRIES,),
+        )
+
+
+def generate_workflow(
+    description: str, force_regenerate: bool = False
+) -> Tuple[str, str, bool]:
+    """
+    Turn a workflow description into a plan and an architecture.
+
+    Results are cached by normalized description and tool-registry version,
+    so a repeated description returns without calling the model; pass
+    `force_regenerate` to bypass the cache and overwrite its entry. Returns
+    (plan, architecture, cached); the architecture is validated canonical
+    JSON, and InvalidArchitectureError is raised if the architect's output
+    does not describe a buildable graph.
+
+    Blocking: each step is a full Bedrock call on an agent checked out of
+    its pool, so callers on the event loop must use a worker thread.
+    """
+    cache_key = generation_cache_key(description)
+    if not force_regenerate:
+        cached = _cache_get(cache_key)
+        if cached:
+            with _stats_lock:
+                _stats["hits"] += 1
+            return cached[0], cached[1], True
+
+    with _stats_lock:
+        _stats["misses"] += 1
+    # The agent pools (and Strands) load on the first uncached generation
+    from .agents import architect_pool, planner_pool
+
+    with planner_pool.acquire() as planner:
+        # Pooled planners are shared across requests; the tool catalog is not
+        planner.system_prompt = planner_prompt(description)
+        plan = planner(description).message["content"][0]["text"]
+    with architect_pool.acquire() as architect:
+        raw_architecture = architect(plan).message["content"][0]["text"]
+    # Reject unusable output now rather than when the workflow is executed
+    architecture = canonical_json(parse_architecture(raw_architecture))
+    _cache_put(cache_key, plan, architecture)
+    return plan, architecture, False
+
+
+def generation_cache_stats() -> Dict[str, Any]:
+    with get_connection() as conn:
+        entries = conn.execute("SELECT COUNT(*) FROM generation_cache").fetchone()[0]
+    with _stats_lock:
+        return {**_stats, "entries": entries}
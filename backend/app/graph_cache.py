@@ -0,0 +1,121 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Tuple
+
+from .architecture import canonical_json
+from .metrics import GRAPH_BUILD_SECONDS
+from .telemetry import span
+from .utils import json_to_strands_graph
+
+if TYPE_CHECKING:
+    from strands.multiagent.graph import Graph
+
+GRAPH_CACHE_SIZE = int(os.getenv("GRAPH_CACHE_SIZE", "64"))
+GRAPH_CACHE_IDLE_PER_WORKFLOW = int(os.getenv("GRAPH_CACHE_IDLE_PER_WORKFLOW", "4"))
+
+
+def architecture_hash(workflow_json: Dict[str, Any]) -> str:
+    """Content hash of an architecture, independent of key order and whitespace."""
+    return hashlib.sha256(canonical_json(workflow_json).encode()).hexdigest()
+
+
+def reset_graph(graph: "Graph") -> None:
+    """Return every node agent to the blank conversation it was built with."""
+    from strands.multiagent.graph import GraphState
+    from strands.telemetry.metrics import EventLoopMetrics
+
+    for node in graph.nodes.values():
+        node.reset_executor_state()
+        if hasattr(node.executor, "event_loop_metrics"):
+            node.executor.event_loop_metrics = EventLoopMetrics()
+    graph.state = GraphState()
+
+
+class GraphCache:
+    """
+    LRU cache of compiled Strands graphs keyed by workflow id and architecture
+    hash, so editing a workflow never serves a stale graph.
+
+    A Graph holds live agents with conversation state, so one instance can
+    only serve one run at a time. Each key keeps a small stack of idle
+    instances: a run checks one out (or builds a new one if all are busy),
+    and on return its agents are reset to their initial state before the
+    instance is made available again.
+    """
+
+    def __init__(
+        self,
+        max_workflows: int = GRAPH_CACHE_SIZE,
+        max_idle_per_workflow: int = GRAPH_CACHE_IDLE_PER_WORKFLOW,
+    ):
+        self._max_workflows = max_workflows
+        self._max_idle = max_idle_per_workflow
+        self._entries: "OrderedDict[Tuple[str, str], List[Graph]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @contextmanager
+    def acquire(
+        self, workflow_id: str, workflow_json: Dict[str, Any], available_tools: list
+    ) -> Iterator["Graph"]:
+        """Check out a ready-to-run graph for the workflow for the duration of the block."""
+        key = (workflow_id, architecture_hash(workflow_json))
+
+        with self._lock:
+            idle = self._entries.get(key)
+            if idle:
+                self._entries.move_to_end(key)
+                graph = idle.pop()
+                self.hits += 1
+            else:
+                graph = None
+                self.misses += 1
+
+        if graph is None:
+            with (
+                span("workflow.graph_build", workflow_id=workflow_id),
+                GRAPH_BUILD_SECONDS.time(),
+            ):
+                graph = json_to_strands_graph(workflow_json, available_tools)
+            if graph is None:
+                raise ValueError(f"Could not build graph for workflow {workflow_id}")
+
+        try:
+            yield graph
+        finally:
+            reset_graph(graph)
+            self._release(key, graph)
+
+    def _release(self, key: Tuple[str, str], graph: "Graph") -> None:
+        with self._lock:
+            idle = self._entries.setdefault(key, [])
+            self._entries.move_to_end(key)
+            if len(idle) < self._max_idle:
+                idle.append(graph)
+            while len(self._entries) > self._max_workflows:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "workflows": len(self._entries),
+                "idle_graphs": sum(len(idle) for idle in self._entries.values()),
+            }
+
+
+graph_cache = GraphCache()
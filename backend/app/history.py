@@ -0,0 +1,215 @@
+import json
+import os
+import queue
+import threading
+import time
+import traceback
+from typing import Any, Dict, List, Optional
+
+from .db import get_connection
+
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "50"))
+HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", "1.0"))
+
+# Rows for unknown workflows are dropped: user_id comes from the workflow
+_INSERT_RUN = """
+    INSERT INTO execution_history (
+        workflow_id, user_id, input, output, status, error, latency_ms,
+        input_tokens, output_tokens, total_tokens, node_metrics, tool_calls,
+        critical_path, cache_read_tokens, cache_write_tokens, cost_usd
+    )
+    SELECT id, user_id, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+    FROM workflows
+    WHERE id = ?
+"""
+_ADD_RUN_COST = """
+    UPDATE workflows
+    SET costed_runs = costed_runs + 1, total_cost_usd = total_cost_usd + ?
+    WHERE id = ?
+"""
+
+
+class RunRecorder:
+    """
+    Event listener that collects per-node timings and tool calls for one run.
+    Offsets are milliseconds since the recorder was created.
+    """
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.tool_calls: List[Dict[str, Any]] = []
+        self._open_tools: Dict[str, Dict[str, Any]] = {}
+
+    def _offset(self) -> int:
+        return round((time.perf_counter() - self._start) * 1000)
+
+    def elapsed_ms(self) -> int:
+        return self._offset()
+
+    def __call__(self, payload: Dict[str, Any]) -> None:
+        event = payload["event"]
+        if event == "node_start":
+            self.nodes[payload["node_id"]] = {"start_ms": self._offset()}
+        elif event == "node_end":
+            node = self.nodes.setdefault(payload["node_id"], {"start_ms": 0})
+            node["end_ms"] = self._offset()
+            node["duration_ms"] = node["end_ms"] - node["start_ms"]
+        elif event == "tool_call":
+            call = {
+                "node_id": payload["node_id"],
+                "tool_name": payload["tool_name"],
+                "start_ms": self._offset(),
+            }
+            self._open_tools[payload["tool_use_id"]] = call
+            self.tool_calls.append(call)
+        elif event == "tool_result":
+            call = self._open_tools.pop(payload["tool_use_id"], None)
+            if call:
+                call["duration_ms"] = self._offset() - call["start_ms"]
+                call["status"] = payload["status"]
+
+
+class HistoryWriter:
+    """
+    Background writer for execution_history. Runs are queued from the
+    request path and inserted in batches by a single daemon thread, so a
+    workflow execution never waits on a SQLite write.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = HISTORY_BATCH_SIZE,
+        flush_interval: float = HISTORY_FLUSH_INTERVAL,
+    ):
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        workflow_id: str,
+        input: str,
+        output: str,
+        status: str,
+        latency_ms: int,
+        usage: Dict[str, int],
+        node_metrics: List[Dict[str, Any]],
+        tool_calls: List[Dict[str, Any]],
+        error: Optional[str] = None,
+        critical_path: Optional[List[str]] = None,
+        cost_usd: float = 0.0,
+    ) -> None:
+        self._ensure_started()
+        self._queue.put(
+            (
+                input,
+                output,
+                status,
+                error,
+                latency_ms,
+                usage.get("inputTokens", 0),
+                usage.get("outputTokens", 0),
+                usage.get("totalTokens", 0),
+                json.dumps(node_metrics),
+                json.dumps(tool_calls),
+                json.dumps(critical_path or []),
+                usage.get("cacheReadInputTokens", 0),
+                usage.get("cacheWriteInputTokens", 0),
+                cost_usd,
+                workflow_id,
+            )
+        )
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush queued rows and stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="history-writer", daemon=True
+                    )
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                row = self._queue.get(timeout=self._flush_interval)
+            except queue.Empty:
+                continue
+            batch = []
+            stop = row is None
+            if not stop:
+                batch.append(row)
+            # Drain whatever else is already queued, up to one batch
+            while not stop and len(batch) < self._batch_size:
+                try:
+                    row = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if row is None:
+                    stop = True
+                else:
+                    batch.append(row)
+            if batch:
+                self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch: List[tuple]) -> None:
+        try:
+            with get_connection() as conn:
+                conn.executemany(_INSERT_RUN, batch)
+                conn.executemany(_ADD_RUN_COST, [(row[-2], row[-1]) for row in batch])
+        except Exception:
+            traceback.print_exc()
+
+
+def list_execution_history(workflow_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+    with get_connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT id, input, output, status, error, latency_ms, input_tokens,
+                   output_tokens, total_tokens, node_metrics, tool_calls, critical_path,
+                   executed_at, cache_read_tokens, cache_write_tokens, cost_usd
+            FROM execution_history
+            WHERE workflow_id = ?
+            ORDER BY executed_at DESC
+            LIMIT ?
+        """,
+            (workflow_id, limit),
+        ).fetchall()
+
+    return [
+        {
+            "id": row[0],
+            "input": row[1],
+            "output": row[2],
+            "status": row[3],
+            "error": row[4],
+            "latency_ms": row[5],
+            "input_tokens": row[6],
+            "output_tokens": row[7],
+            "total_tokens": row[8],
+            "cache_read_tokens": row[13],
+            "cache_write_tokens": row[14],
+            "cost_usd": row[15],
+            "node_metrics": json.loads(row[9]) if row[9] else [],
+            "tool_calls": json.loads(row[10]) if row[10] else [],
+            "critical_path": json.loads(row[11]) if row[11] else [],
+            "executed_at": row[12],
+        }
+        for row in rows
+    ]
+
+
+history_writer = HistoryWriter()
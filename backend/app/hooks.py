@@ -0,0 +1,177 @@
+import time
+from typing import Any, Dict, Optional
+
+from strands.hooks import (
+    AfterInvocationEvent,
+    AfterModelCallEvent,
+    AfterToolCallEvent,
+    BeforeInvocationEvent,
+    BeforeModelCallEvent,
+    BeforeToolCallEvent,
+    HookProvider,
+    HookRegistry,
+)
+
+from .budget import USAGE_KEYS, current_meter
+from .events import emit
+from .metrics import (
+    MODEL_CALL_SECONDS,
+    MODEL_CALLS_IN_FLIGHT,
+    NODE_SECONDS,
+    NODES_IN_FLIGHT,
+    TOOL_SECONDS,
+    TOOLS_IN_FLIGHT,
+)
+from .telemetry import current_workflow_id
+
+# Strands hook providers attached to every workflow node agent. They live
+# here so that events, telemetry and budget stay importable without Strands.
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    return "".join(
+        block["text"] for block in message.get("content", []) if "text" in block
+    )
+
+
+class ProgressHooks(HookProvider):
+    """Emits node start/end and tool call events for one graph node."""
+
+    def __init__(self, node_id: str):
+        self.node_id = node_id
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeInvocationEvent, self._node_start)
+        registry.add_callback(BeforeToolCallEvent, self._tool_call)
+        registry.add_callback(AfterToolCallEvent, self._tool_result)
+        registry.add_callback(AfterInvocationEvent, self._node_end)
+
+    def _node_start(self, event: BeforeInvocationEvent) -> None:
+        emit("node_start", node_id=self.node_id, agent_name=event.agent.name)
+
+    def _tool_call(self, event: BeforeToolCallEvent) -> None:
+        emit(
+            "tool_call",
+            node_id=self.node_id,
+            tool_name=event.tool_use["name"],
+            tool_use_id=event.tool_use["toolUseId"],
+            input=event.tool_use["input"],
+        )
+
+    def _tool_result(self, event: AfterToolCallEvent) -> None:
+        emit(
+            "tool_result",
+            node_id=self.node_id,
+            tool_name=event.tool_use["name"],
+            tool_use_id=event.tool_use["toolUseId"],
+            status=event.result["status"],
+        )
+
+    def _node_end(self, event: AfterInvocationEvent) -> None:
+        messages = event.agent.messages
+        output = ""
+        if messages and messages[-1]["role"] == "assistant":
+            output = _message_text(messages[-1])
+        emit("node_end", node_id=self.node_id, output=output)
+
+
+class TelemetryHooks(HookProvider):
+    """
+    Feeds node, model-call and tool-call latency histograms and in-flight
+    gauges for one graph node. Spans for the same steps come from Strands.
+    """
+
+    def __init__(self, node_id: str):
+        self.node_id = node_id
+        self._node_started: Optional[float] = None
+        self._model_started: Optional[float] = None
+        self._tools_started: Dict[str, float] = {}
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeInvocationEvent, self._node_start)
+        registry.add_callback(AfterInvocationEvent, self._node_end)
+        registry.add_callback(BeforeModelCallEvent, self._model_start)
+        registry.add_callback(AfterModelCallEvent, self._model_end)
+        registry.add_callback(BeforeToolCallEvent, self._tool_start)
+        registry.add_callback(AfterToolCallEvent, self._tool_end)
+
+    def _node_start(self, event: BeforeInvocationEvent) -> None:
+        self._node_started = time.perf_counter()
+        NODES_IN_FLIGHT.inc()
+
+    def _node_end(self, event: AfterInvocationEvent) -> None:
+        if self._node_started is None:
+            return
+        NODES_IN_FLIGHT.dec()
+        NODE_SECONDS.observe(
+            time.perf_counter() - self._node_started,
+            workflow_id=current_workflow_id(),
+            node_id=self.node_id,
+        )
+        self._node_started = None
+
+    def _model_start(self, event: BeforeModelCallEvent) -> None:
+        self._model_started = time.perf_counter()
+        MODEL_CALLS_IN_FLIGHT.inc()
+
+    def _model_end(self, event: AfterModelCallEvent) -> None:
+        if self._model_started is None:
+            return
+        MODEL_CALLS_IN_FLIGHT.dec()
+        MODEL_CALL_SECONDS.observe(
+            time.perf_counter() - self._model_started,
+            workflow_id=current_workflow_id(),
+            node_id=self.node_id,
+        )
+        self._model_started = None
+
+    def _tool_start(self, event: BeforeToolCallEvent) -> None:
+        self._tools_started[event.tool_use["toolUseId"]] = time.perf_counter()
+        TOOLS_IN_FLIGHT.inc()
+
+    def _tool_end(self, event: AfterToolCallEvent) -> None:
+        started = self._tools_started.pop(event.tool_use["toolUseId"], None)
+        if started is None:
+            return
+        TOOLS_IN_FLIGHT.dec()
+        TOOL_SECONDS.observe(
+            time.perf_counter() - started,
+            tool=event.tool_use["name"],
+            status=event.result["status"],
+        )
+
+
+class UsageHooks(HookProvider):
+    """
+    Charges the current run's meter with one graph node's token usage and
+    enforces its budget before every model call.
+    """
+
+    def __init__(self, node_id: str):
+        self.node_id = node_id
+        self._seen: Dict[str, int] = {}
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeInvocationEvent, self._node_start)
+        registry.add_callback(BeforeModelCallEvent, self._model_call)
+        registry.add_callback(AfterInvocationEvent, self._charge)
+
+    def _node_start(self, event: BeforeInvocationEvent) -> None:
+        self._seen = dict(event.agent.event_loop_metrics.accumulated_usage)
+
+    def _charge(self, event: Any) -> None:
+        # Strands adds a call's usage to the agent after AfterModelCallEvent,
+        # so each call is charged at the next model call or at node end
+        meter = current_meter()
+        usage = dict(event.agent.event_loop_metrics.accumulated_usage)
+        delta = {key: usage.get(key, 0) - self._seen.get(key, 0) for key in USAGE_KEYS}
+        self._seen = usage
+        if meter is not None and any(delta.values()):
+            meter.charge(self.node_id, delta)
+
+    def _model_call(self, event: BeforeModelCallEvent) -> None:
+        self._charge(event)
+        meter = current_meter()
+        if meter is not None:
+            # A degraded run lets this node finish; DagGraph starts no new ones
+            meter.within_budget()
@@ -0,0 +1,127 @@
+import os
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException
+
+from .db import get_connection
+from .executor import run_workflow
+
+MAX_WORKERS = int(os.getenv("WORKFLOW_MAX_WORKERS", "4"))
+MAX_PENDING_JOBS = int(os.getenv("WORKFLOW_MAX_PENDING_JOBS", "100"))
+
+# Job lifecycle: queued -> running -> succeeded | failed
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobManager:
+    """
+    Runs workflow executions on a bounded thread pool so the FastAPI event
+    loop is never blocked by a Strands graph. Job state lives in the `jobs`
+    table, so status survives a restart of the API process.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS, max_pending: int = MAX_PENDING_JOBS):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="workflow-job"
+        )
+        self._max_pending = max_pending
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, workflow_id: str, input: str) -> str:
+        """Persist a new job and schedule it. Returns the job id immediately."""
+        with self._lock:
+            if self._pending >= self._max_pending:
+                raise HTTPException(
+                    status_code=503, detail="Too many pending jobs, retry later"
+                )
+            self._pending += 1
+
+        job_id = str(uuid.uuid4())
+        try:
+            with get_connection() as conn:
+                conn.execute(
+                    "INSERT INTO jobs (id, workflow_id, input, status) VALUES (?, ?, ?, ?)",
+                    (job_id, workflow_id, input, QUEUED),
+                )
+            self._executor.submit(self._run, job_id, workflow_id, input)
+        except Exception as e:
+            with self._lock:
+                self._pending -= 1
+            raise HTTPException(status_code=500, detail=f"Error creating job: {str(e)}")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with get_connection() as conn:
+            row = conn.execute(
+                """
+                SELECT id, workflow_id, status, result, error, created_at, started_at, finished_at
+                FROM jobs
+                WHERE id = ?
+            """,
+                (job_id,),
+            ).fetchone()
+
+        if not row:
+            return None
+        return {
+            "job_id": row[0],
+            "workflow_id": row[1],
+            "status": row[2],
+            "result": row[3],
+            "error": row[4],
+            "created_at": row[5],
+            "started_at": row[6],
+            "finished_at": row[7],
+        }
+
+    def recover(self) -> None:
+        """Fail jobs left queued/running by a previous process; their workers are gone."""
+        with get_connection() as conn:
+            conn.execute(
+                """
+                UPDATE jobs
+                SET status = ?, error = ?, finished_at = CURRENT_TIMESTAMP
+                WHERE status IN (?, ?)
+            """,
+                (FAILED, "Interrupted by server restart", QUEUED, RUNNING),
+            )
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job_id: str, workflow_id: str, input: str) -> None:
+        self._update(
+            "UPDATE jobs SET status = ?, started_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (RUNNING, job_id),
+        )
+        try:
+            output = run_workflow(workflow_id, input)
+            self._update(
+                "UPDATE jobs SET status = ?, result = ?, finished_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (SUCCEEDED, output["result"], job_id),
+            )
+        except Exception as e:
+            traceback.print_exc()
+            detail = getattr(e, "detail", None) or str(e)
+            self._update(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (FAILED, str(detail), job_id),
+            )
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _update(self, query: str, params: tuple) -> None:
+        with get_connection() as conn:
+            conn.execute(query, params)
+
+
+job_manager = JobManager()
@@ -1,29 +1,144 @@
 # app/core/mcp_client.py
+import logging
 import os
+import threading
+import time
+from typing import List, Optional, Tuple
 
 import requests
 from dotenv import load_dotenv
 from mcp.client.streamable_http import streamablehttp_client
-from strands.tools.mcp.mcp_client import MCPClient
+from requests.adapters import HTTPAdapter
 
-# from functools import lru_cache
+from .mcp_sessions import MCPSessionManager
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 token_url = os.getenv("TOKEN_URL")
 client_id = os.getenv("CLIENT_ID")
 client_secret = os.getenv("CLIENT_SECRET")
 gateway_url = os.getenv("GATEWAY_URL")
 
+# Refresh this many seconds before the token expires (at most half its lifetime)
+TOKEN_REFRESH_MARGIN = float(os.getenv("MCP_TOKEN_REFRESH_MARGIN", "60"))
+# Lifetime assumed when the token response has no expires_in
+TOKEN_DEFAULT_TTL = float(os.getenv("MCP_TOKEN_DEFAULT_TTL", "300"))
+TOKEN_REQUEST_TIMEOUT = float(os.getenv("MCP_TOKEN_REQUEST_TIMEOUT", "10"))
+
+
+class TokenProvider:
+    """
+    OAuth client-credentials token cache with refresh-ahead.
+
+    A token is served from memory until `refresh_margin` seconds before it
+    expires. Inside that window callers still get the cached token while one
+    background thread fetches the next; only an expired (or missing) token
+    makes callers wait. Fetches are single-flight: concurrent callers share
+    one request to the token endpoint, made over a pooled keep-alive session.
+    """
+
+    def __init__(
+        self,
+        token_url: str,
+        client_id: str,
+        client_secret: str,
+        refresh_margin: float = TOKEN_REFRESH_MARGIN,
+        default_ttl: float = TOKEN_DEFAULT_TTL,
+        timeout: float = TOKEN_REQUEST_TIMEOUT,
+        session: Optional[requests.Session] = None,
+    ):
+        self.token_url = token_url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.refresh_margin = refresh_margin
+        self.default_ttl = default_ttl
+        self.timeout = timeout
+        if session is None:
+            session = requests.Session()
+            session.mount("http://", HTTPAdapter(pool_maxsize=4))
+            session.mount("https://", HTTPAdapter(pool_maxsize=4))
+        self._session = session
+        self._lock = threading.Lock()  # guards the cached token and refresh flag
+        self._fetch_lock = threading.Lock()  # single-flight token requests
+        # (access_token, refresh_at, expires_at) on the monotonic clock
+        self._token: Optional[Tuple[str, float, float]] = None
+        self._refreshing = False
+        self.fetches = 0
+
+    def token(self) -> str:
+        """A valid access token, fetching one only if none is usable."""
+        with self._lock:
+            if self._token:
+                access_token, refresh_at, expires_at = self._token
+                now = time.monotonic()
+                if now < refresh_at:
+                    return access_token
+                if now < expires_at:
+                    self._refresh_in_background()
+                    return access_token
+        return self._fetch_once()
+
+    def invalidate(self) -> None:
+        """Drop the cached token, e.g. after the gateway rejected it."""
+        with self._lock:
+            self._token = None
+
+    def _fetch_once(self) -> str:
+        with self._fetch_lock:
+            # Another caller may have fetched while this one waited
+            with self._lock:
+                if self._token and time.monotonic() < self._token[1]:
+                    return self._token[0]
+            return self._fetch()
+
+    def _fetch(self) -> str:
+        response = self._session.post(
+            self.token_url,
+            data={
+                "grant_type": "client_credentials",
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+            },
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        body = response.json()
+        ttl = float(body.get("expires_in") or self.default_ttl)
+        now = time.monotonic()
+        expires_at = now + ttl
+        refresh_at = expires_at - min(self.refresh_margin, ttl / 2)
+        with self._lock:
+            self._token = (body["access_token"], refresh_at, expires_at)
+            self.fetches += 1
+        return body["access_token"]
+
+    def _refresh_in_background(self) -> None:
+        # Called with self._lock held
+        if self._refreshing:
+            return
+        self._refreshing = True
+        threading.Thread(
+            target=self._background_refresh, name="mcp-token-refresh", daemon=True
+        ).start()
+
+    def _background_refresh(self) -> None:
+        try:
+            self._fetch_once()
+        except Exception:
+            # The cached token stays in use; callers fetch themselves once it expires
+            logger.exception("Background refresh of the MCP access token failed")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+
+token_provider = TokenProvider(token_url, client_id, client_secret)
+
 
 def fetch_access_token():
-    response = requests.post(
-        token_url,
-        data=f"grant_type=client_credentials&client_id={client_id}&client_secret={client_secret}",
-        headers={"Content-Type": "application/x-www-form-urlencoded"},
-    )
-    response.raise_for_status()
-    return response.json()["access_token"]
+    return token_provider.token()
 
 
 def _create_streamable_http_transport(headers=None):
@@ -34,5 +149,13 @@ def _create_streamable_http_transport(headers=None):
     return streamablehttp_client(url, headers=headers)
 
 
-# ✅ Create reusable MCP client instance
-mcp_client = MCPClient(_create_streamable_http_transport)
+# ✅ Warm, reconnecting sessions to the gateway with cached tool discovery
+mcp_sessions = MCPSessionManager(_create_streamable_http_transport)
+
+
+def gateway_tools(names: List[str]) -> list:
+    """Gateway tools with the given names, in order; unknown names are left out."""
+    if not gateway_url:
+        return []
+    tools = mcp_sessions.tools()
+    return [tools[name] for name in names if name in tools]
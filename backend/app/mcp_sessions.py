@@ -0,0 +1,231 @@
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from strands.tools.mcp import MCPAgentTool, MCPClient
+
+logger = logging.getLogger(__name__)
+
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "2"))
+MCP_TOOL_SPEC_TTL = float(os.getenv("MCP_TOOL_SPEC_TTL", "300"))
+MCP_STARTUP_TIMEOUT = int(os.getenv("MCP_STARTUP_TIMEOUT", "30"))
+MCP_RECONNECT_ATTEMPTS = int(os.getenv("MCP_RECONNECT_ATTEMPTS", "5"))
+MCP_RECONNECT_BASE_DELAY = float(os.getenv("MCP_RECONNECT_BASE_DELAY", "0.5"))
+MCP_RECONNECT_MAX_DELAY = float(os.getenv("MCP_RECONNECT_MAX_DELAY", "30"))
+
+
+def specs_version(tools: List[MCPAgentTool]) -> str:
+    """Content hash of a tool list, used as its ETag."""
+    specs = sorted((tool.tool_spec for tool in tools), key=lambda spec: spec["name"])
+    return hashlib.sha256(json.dumps(specs, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class MCPSessionManager:
+    """
+    Keeps `pool_size` initialized MCP sessions to one server and hands them
+    out round-robin. An MCP session multiplexes requests, so sessions are
+    shared rather than checked out; the pool spreads load and keeps a warm
+    spare when one drops. Dead sessions are replaced on next use, retrying
+    the connect with exponential backoff and jitter.
+
+    Tool specs are discovered once and cached for `spec_ttl` seconds under a
+    content-hash version. A refresh that finds the same version keeps the
+    existing tool objects, so graphs built with them stay valid. The tools
+    route every call through the pool (this manager stands in for their
+    MCPClient), so they never hold on to a dead session.
+    """
+
+    def __init__(
+        self,
+        transport_factory: Callable[[], Any],
+        pool_size: int = MCP_POOL_SIZE,
+        spec_ttl: float = MCP_TOOL_SPEC_TTL,
+        startup_timeout: int = MCP_STARTUP_TIMEOUT,
+        reconnect_attempts: int = MCP_RECONNECT_ATTEMPTS,
+        reconnect_base_delay: float = MCP_RECONNECT_BASE_DELAY,
+        reconnect_max_delay: float = MCP_RECONNECT_MAX_DELAY,
+        client_factory: Callable[..., MCPClient] = MCPClient,
+    ):
+        self._transport_factory = transport_factory
+        self._client_factory = client_factory
+        self.spec_ttl = spec_ttl
+        self.startup_timeout = startup_timeout
+        self.reconnect_attempts = max(1, reconnect_attempts)
+        self.reconnect_base_delay = reconnect_base_delay
+        self.reconnect_max_delay = reconnect_max_delay
+
+        self._slots: List[Optional[MCPClient]] = [None] * max(1, pool_size)
+        self._slot_locks = [threading.Lock() for _ in self._slots]
+        self._next_slot = itertools.count()
+
+        self._specs_lock = threading.Lock()
+        self._tools: Dict[str, MCPAgentTool] = {}
+        self._fetched_at: Optional[float] = None
+        self.version: Optional[str] = None
+
+        self.connects = 0
+        self.reconnects = 0
+        self.connect_failures = 0
+        self.spec_fetches = 0
+
+    # ------------------------------
+    # Sessions
+    # ------------------------------
+    def session(self) -> MCPClient:
+        """A live session from the pool, (re)connecting its slot if needed."""
+        index = next(self._next_slot) % len(self._slots)
+        client = self._slots[index]
+        if client is not None and client._is_session_active():
+            return client
+        with self._slot_locks[index]:
+            client = self._slots[index]
+            if client is None or not client._is_session_active():
+                if client is not None:
+                    self.reconnects += 1
+                    self._stop(client)
+                client = self._slots[index] = self._connect()
+            return client
+
+    def _connect(self) -> MCPClient:
+        delay = self.reconnect_base_delay
+        for attempt in range(1, self.reconnect_attempts + 1):
+            client = self._client_factory(
+                self._transport_factory, startup_timeout=self.startup_timeout
+            )
+            try:
+                client.start()
+                self.connects += 1
+                return client
+            except Exception as e:
+                self.connect_failures += 1
+                if attempt == self.reconnect_attempts:
+                    raise
+                logger.warning(
+                    "MCP connect attempt %d/%d failed (%s); retrying in %.1fs",
+                    attempt,
+                    self.reconnect_attempts,
+                    e,
+                    delay,
+                )
+                time.sleep(delay * random.uniform(0.5, 1.0))
+                delay = min(delay * 2, self.reconnect_max_delay)
+
+    @staticmethod
+    def _stop(client: MCPClient) -> None:
+        try:
+            client.stop(None, None, None)
+        except Exception:
+            logger.exception("Error stopping MCP session")
+
+    def warm(self) -> None:
+        """Open every session in the pool now rather than on first use."""
+        for _ in self._slots:
+            try:
+                self.session()
+            except Exception:
+                logger.exception("Could not open a warm MCP session")
+                return
+
+    def warm_in_background(self) -> None:
+        threading.Thread(target=self.warm, name="mcp-warm", daemon=True).start()
+
+    def close(self) -> None:
+        for index, lock in enumerate(self._slot_locks):
+            with lock:
+                client, self._slots[index] = self._slots[index], None
+            if client is not None:
+                self._stop(client)
+
+    # ------------------------------
+    # Tool discovery
+    # ------------------------------
+    def tools(self, refresh: bool = False) -> Dict[str, MCPAgentTool]:
+        """
+        The server's tools by name, from the spec cache when fresh. If a
+        refresh fails, the cached tools keep being served until it succeeds.
+        """
+        if not refresh and self._fresh():
+            return self._tools
+        with self._specs_lock:
+            if not refresh and self._fresh():
+                return self._tools
+            try:
+                listed = self._list_tools()
+            except Exception:
+                if self._fetched_at is None:
+                    raise
+                logger.exception("MCP tool refresh failed; serving version %s", self.version)
+                self._fetched_at = time.monotonic()
+                return self._tools
+            version = specs_version(listed)
+            if version != self.version:
+                self._tools = {
+                    tool.tool_name: MCPAgentTool(tool.mcp_tool, self) for tool in listed
+                }
+                self.version = version
+            self._fetched_at = time.monotonic()
+            return self._tools
+
+    def _fresh(self) -> bool:
+        return (
+            self._fetched_at is not None
+            and time.monotonic() - self._fetched_at < self.spec_ttl
+        )
+
+    def _list_tools(self) -> List[MCPAgentTool]:
+        client = self.session()
+        tools: List[MCPAgentTool] = []
+        token = None
+        while True:
+            page = client.list_tools_sync(pagination_token=token)
+            tools.extend(page)
+            token = page.pagination_token
+            if not token:
+                break
+        self.spec_fetches += 1
+        return tools
+
+    # ------------------------------
+    # MCPClient interface used by MCPAgentTool
+    # ------------------------------
+    async def call_tool_async(
+        self,
+        tool_use_id: str,
+        name: str,
+        arguments: Optional[Dict[str, Any]] = None,
+        read_timeout_seconds: Optional[timedelta] = None,
+    ) -> Dict[str, Any]:
+        # Connecting can block for the startup timeout, so keep it off the loop
+        client = await asyncio.to_thread(self.session)
+        result = await client.call_tool_async(
+            tool_use_id, name, arguments, read_timeout_seconds
+        )
+        if result["status"] == "error" and not client._is_session_active():
+            # The session dropped mid-call: retry once on a fresh one
+            client = await asyncio.to_thread(self.session)
+            result = await client.call_tool_async(
+                tool_use_id, name, arguments, read_timeout_seconds
+            )
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": sum(
+                1 for client in self._slots if client and client._is_session_active()
+            ),
+            "pool_size": len(self._slots),
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "connect_failures": self.connect_failures,
+            "tools": len(self._tools),
+            "tools_version": self.version,
+            "spec_fetches": self.spec_fetches,
+        }
@@ -0,0 +1,216 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Seconds; spans sub-millisecond SQLite calls up to multi-minute workflow runs
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_labels(self.label_names, key)} {_number(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track(self, **labels: str) -> Iterator[None]:
+        """Count the block as in flight while it runs."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (non-cumulative) + overflow, sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = _labels(self.label_names, key, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            cumulative += counts[-1]
+            le = _labels(self.label_names, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_number(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics rendered in the Prometheus text exposition format (0.0.4)."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency until the response starts.",
+        ["method", "route", "status"],
+    )
+)
+HTTP_REQUESTS_IN_FLIGHT = registry.register(
+    Gauge("http_requests_in_flight", "HTTP requests being handled.")
+)
+WORKFLOW_RUN_SECONDS = registry.register(
+    Histogram(
+        "workflow_run_duration_seconds",
+        "End-to-end workflow run latency.",
+        ["workflow_id", "status"],
+    )
+)
+WORKFLOW_RUNS_IN_FLIGHT = registry.register(
+    Gauge("workflow_runs_in_flight", "Workflow runs executing.")
+)
+GRAPH_BUILD_SECONDS = registry.register(
+    Histogram(
+        "workflow_graph_build_duration_seconds",
+        "Time to build a Strands graph on a graph cache miss.",
+    )
+)
+NODE_SECONDS = registry.register(
+    Histogram(
+        "workflow_node_duration_seconds",
+        "Latency of one node agent invocation.",
+        ["workflow_id", "node_id"],
+    )
+)
+NODES_IN_FLIGHT = registry.register(
+    Gauge("workflow_nodes_in_flight", "Node agents executing.")
+)
+MODEL_CALL_SECONDS = registry.register(
+    Histogram(
+        "workflow_model_call_duration_seconds",
+        "Latency of one model call made by a node agent.",
+        ["workflow_id", "node_id"],
+    )
+)
+MODEL_CALLS_IN_FLIGHT = registry.register(
+    Gauge("workflow_model_calls_in_flight", "Model calls awaiting a response.")
+)
+TOOL_SECONDS = registry.register(
+    Histogram(
+        "workflow_tool_duration_seconds",
+        "Latency of one tool call.",
+        ["tool", "status"],
+    )
+)
+TOOLS_IN_FLIGHT = registry.register(
+    Gauge("workflow_tool_calls_in_flight", "Tool calls executing.")
+)
+SQLITE_SECONDS = registry.register(
+    Histogram(
+        "sqlite_connection_duration_seconds",
+        "Time a pooled SQLite connection is held, including the wait for one.",
+    )
+)
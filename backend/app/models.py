@@ -1,15 +1,50 @@
-import boto3
+import os
+import threading
+from typing import TYPE_CHECKING, Optional
+
 from dotenv import load_dotenv
-from strands.models import BedrockModel
+
+if TYPE_CHECKING:
+    from strands.models import Model
 
 load_dotenv()
 
+# "bedrock" (default) or "offline" for the deterministic local stand-in
+MODEL_PROVIDER = os.getenv("MODEL_PROVIDER", "bedrock").lower()
+
+
+def build_model(provider: str = MODEL_PROVIDER) -> "Model":
+    """Create the model every agent uses, for the configured provider."""
+    if provider == "offline":
+        from .offline_model import offline_model_from_env
+
+        return offline_model_from_env()
+    if provider == "bedrock":
+        import boto3
+        from strands.models import BedrockModel
+
+        _boto_session = boto3.Session(region_name="us-east-1")
+        return BedrockModel(
+            boto_session=_boto_session,
+            model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
+            # model_id="openai.gpt-oss-120b-1:0",
+            temperature=0.3,
+        )
+    raise ValueError(f"Unknown MODEL_PROVIDER '{provider}'")
+
+
+_default_model: Optional["Model"] = None
+_default_model_lock = threading.Lock()
 
-_boto_session = boto3.Session(region_name="us-east-1")
 
-bedrock_model = BedrockModel(
-    boto_session=_boto_session,
-    model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
-    # model_id="openai.gpt-oss-120b-1:0",
-    temperature=0.3,
-)
+def get_default_model() -> "Model":
+    """
+    The model shared by the planner, the architect and every workflow node
+    agent. Built on first use, since the Bedrock client pulls in boto3.
+    """
+    global _default_model
+    if _default_model is None:
+        with _default_model_lock:
+            if _default_model is None:
+                _default_model = build_model()
+    return _default_model
@@ -0,0 +1,381 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+from typing import Any, AsyncGenerator, AsyncIterable, Dict, List, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+from strands.models import Model
+from strands.types.content import Messages
+from strands.types.streaming import StreamEvent
+from strands.types.tools import ToolSpec
+
+T = TypeVar("T", bound=BaseModel)
+
+CHARS_PER_TOKEN = 4
+_PATIENT_ID = re.compile(r"\bP\d{3,}\b")
+_REQUIRED_TOOLS = re.compile(r"Required tools:\s*\[([^\]]*)\]", re.IGNORECASE)
+_CATALOG_ROW = re.compile(r"^[^|\n]*\|\s*([A-Za-z_][\w]*)\s*\|", re.MULTILINE)
+
+# Sample values for the argument names our tools take
+_ARGUMENT_DEFAULTS = {
+    "patient_id": "P1001",
+    "connection_id": "default",
+    "organization": "demo-org",
+}
+
+
+class _SafeDict(dict):
+    def __missing__(self, key: str) -> str:
+        return "{" + key + "}"
+
+
+def _text_of(message: Dict[str, Any]) -> str:
+    return "\n".join(
+        block["text"] for block in message.get("content", []) if "text" in block
+    )
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def _format(value: Any, values: _SafeDict) -> Any:
+    """Fill {input}/{patient_id} in every string of a scripted JSON value."""
+    if isinstance(value, str):
+        return value.format_map(values)
+    if isinstance(value, dict):
+        return {key: _format(item, values) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_format(item, values) for item in value]
+    return value
+
+
+def _json_object(text: str) -> Optional[Dict[str, Any]]:
+    """The first JSON object in text, which may be wrapped in prose or fences."""
+    start = text.find("{")
+    if start < 0:
+        return None
+    try:
+        value, _ = json.JSONDecoder().raw_decode(text[start:])
+    except json.JSONDecodeError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def _sample(schema: Dict[str, Any], defs: Dict[str, Any]) -> Any:
+    """A minimal value that satisfies a JSON schema from Pydantic."""
+    if "$ref" in schema:
+        return _sample(defs[schema["$ref"].rsplit("/", 1)[-1]], defs)
+    if "default" in schema:
+        return schema["default"]
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "const" in schema:
+        return schema["const"]
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            return _sample(schema[key][0], defs)
+    kind = schema.get("type")
+    if kind == "object":
+        return {
+            name: _sample(schema["properties"][name], defs)
+            for name in schema.get("required", [])
+        }
+    return {
+        "string": "",
+        "integer": 0,
+        "number": 0.0,
+        "boolean": False,
+        "array": [],
+        "null": None,
+    }.get(kind)
+
+
+class OfflineModel(Model):
+    """
+    Deterministic, network-free stand-in for Bedrock that implements the
+    Strands model interface, for load tests and benchmarks.
+
+    Responses come from the first scripted rule whose `match` regex finds
+    the system prompt or latest user text (see `load_script`), else from
+    built-in templates: a plan for the planner, a valid linear architecture
+    for the architect, and for workflow nodes one tool-use turn calling
+    every tool the node has followed by a JSON answer.
+
+    Latency is simulated as a first-token delay drawn from a normal
+    distribution (`latency_ms`, `latency_jitter_ms`) plus streaming at
+    `tokens_per_second`. The draw is seeded from `seed` and the request
+    content, so the same request always takes the same simulated time.
+    """
+
+    def __init__(self, **model_config: Any):
+        self.config: Dict[str, Any] = {
+            "model_id": "offline",
+            "latency_ms": 0.0,
+            "latency_jitter_ms": 0.0,
+            "tokens_per_second": 0.0,
+            "seed": 0,
+            "script": [],
+        }
+        self.update_config(**model_config)
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.config
+
+    async def structured_output(
+        self,
+        output_model: Type[T],
+        prompt: Messages,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Validate the scripted or template response for the prompt as
+        `output_model`. Fields the response leaves out are filled from the
+        model's defaults, or with empty values of the right type.
+        """
+        system_prompt = system_prompt or ""
+        user_text = next(
+            (_text_of(m) for m in reversed(prompt) if m["role"] == "user" and _text_of(m)),
+            "",
+        )
+        rule = self._rule(system_prompt, user_text)
+        if rule is not None and "output" in rule:
+            parsed = _format(rule["output"], self._values(user_text))
+        else:
+            text, _ = self._respond(system_prompt, user_text, [], after_tools=False)
+            parsed = _json_object(text)
+        prompt_text = system_prompt + "".join(json.dumps(m["content"]) for m in prompt)
+        await asyncio.sleep(self._first_token_ms(prompt_text) / 1000)
+
+        schema = output_model.model_json_schema()
+        data = _sample(schema, schema.get("$defs", {}))
+        if parsed is not None:
+            data.update(parsed)
+        yield {"output": output_model.model_validate(data)}
+
+    async def stream(
+        self,
+        messages: Messages,
+        tool_specs: Optional[List[ToolSpec]] = None,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncIterable[StreamEvent]:
+        system_prompt = system_prompt or ""
+        user_text = next(
+            (_text_of(m) for m in reversed(messages) if m["role"] == "user" and _text_of(m)),
+            "",
+        )
+        last = messages[-1] if messages else {"content": []}
+        after_tools = any("toolResult" in block for block in last.get("content", []))
+
+        text, tool_calls = self._respond(
+            system_prompt, user_text, tool_specs or [], after_tools
+        )
+
+        prompt_text = system_prompt + "".join(json.dumps(m["content"]) for m in messages)
+        first_token_ms = self._first_token_ms(prompt_text)
+        output_tokens = _tokens(text) + sum(
+            _tokens(json.dumps(call["input"])) for call in tool_calls
+        )
+        tokens_per_second = self.config["tokens_per_second"]
+        stream_ms = output_tokens / tokens_per_second * 1000 if tokens_per_second else 0.0
+
+        await asyncio.sleep(first_token_ms / 1000)
+        yield {"messageStart": {"role": "assistant"}}
+        if text:
+            yield {"contentBlockStart": {"start": {}}}
+            chunks = [text[i : i + 64] for i in range(0, len(text), 64)]
+            for chunk in chunks:
+                if stream_ms:
+                    await asyncio.sleep(stream_ms / 1000 / len(chunks))
+                yield {"contentBlockDelta": {"delta": {"text": chunk}}}
+            yield {"contentBlockStop": {}}
+        for index, call in enumerate(tool_calls):
+            tool_use_id = f"tooluse_{len(messages)}_{index}"
+            yield {
+                "contentBlockStart": {
+                    "start": {"toolUse": {"name": call["name"], "toolUseId": tool_use_id}}
+                }
+            }
+            arguments = json.dumps(call["input"])
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": arguments}}}}
+            yield {"contentBlockStop": {}}
+        yield {"messageStop": {"stopReason": "tool_use" if tool_calls else "end_turn"}}
+
+        input_tokens = _tokens(prompt_text)
+        yield {
+            "metadata": {
+                "usage": {
+                    "inputTokens": input_tokens,
+                    "outputTokens": output_tokens,
+                    "totalTokens": input_tokens + output_tokens,
+                },
+                "metrics": {"latencyMs": round(first_token_ms + stream_ms)},
+            }
+        }
+
+    def _first_token_ms(self, prompt_text: str) -> float:
+        rng = random.Random(
+            hashlib.sha256(f"{self.config['seed']}\n{prompt_text}".encode()).digest()
+        )
+        return max(
+            0.0, rng.gauss(self.config["latency_ms"], self.config["latency_jitter_ms"])
+        )
+
+    def _rule(self, system_prompt: str, user_text: str) -> Optional[Dict[str, Any]]:
+        """The first scripted rule matching this turn, if any."""
+        for rule in self.config["script"]:
+            if re.search(rule["match"], f"{system_prompt}\n{user_text}"):
+                return rule
+        return None
+
+    @staticmethod
+    def _values(user_text: str) -> _SafeDict:
+        patient_ids = _PATIENT_ID.findall(user_text)
+        patient_id = patient_ids[-1] if patient_ids else _ARGUMENT_DEFAULTS["patient_id"]
+        return _SafeDict(input=user_text, patient_id=patient_id)
+
+    def _respond(
+        self,
+        system_prompt: str,
+        user_text: str,
+        tool_specs: List[ToolSpec],
+        after_tools: bool,
+    ) -> tuple:
+        """Return (text, tool_calls) for this turn."""
+        values = self._values(user_text)
+        patient_id = values["patient_id"]
+
+        rule = self._rule(system_prompt, user_text)
+        if rule is not None:
+            if rule.get("tool_calls") and not after_tools:
+                calls = [
+                    {
+                        "name": call["name"],
+                        "input": _format(call.get("input", {}), values),
+                    }
+                    for call in rule["tool_calls"]
+                ]
+                return "", calls
+            return rule.get("text", "").format_map(values), []
+
+        if "workflow planning specialist" in system_prompt:
+            return self._plan(system_prompt, user_text), []
+        if "workflow architecture specialist" in system_prompt:
+            return self._architecture(user_text), []
+        if tool_specs and not after_tools:
+            return "", [
+                {"name": spec["name"], "input": self._arguments(spec, patient_id)}
+                for spec in tool_specs
+            ]
+        answer = {
+            "status": "completed",
+            "is_valid": True,
+            "patient_id": patient_id,
+            "tools_used": [spec["name"] for spec in tool_specs],
+        }
+        return json.dumps(answer), []
+
+    @staticmethod
+    def _arguments(spec: ToolSpec, patient_id: str) -> Dict[str, Any]:
+        schema = spec["inputSchema"]["json"]
+        arguments = {}
+        for name in schema.get("required", schema.get("properties", {}).keys()):
+            if name == "patient_id":
+                arguments[name] = patient_id
+            elif name == "patient_ids":
+                arguments[name] = [patient_id]
+            else:
+                arguments[name] = _ARGUMENT_DEFAULTS.get(name, "sample")
+        return arguments
+
+    @staticmethod
+    def _plan(system_prompt: str, description: str) -> str:
+        catalog = _CATALOG_ROW.findall(system_prompt)
+        tools = [name for name in catalog if name != "tool_name"][:3]
+        steps = "\n\n".join(
+            f"Step {i}: Retrieve data with {tool}\n"
+            f"- Required tools: [{tool}]\n"
+            f"- Inputs needed: [patient_id]\n"
+            f"- Expected output: {tool} results\n"
+            f"- Agent responsibility: Call {tool} and return its data as JSON"
+            for i, tool in enumerate(tools, 1)
+        )
+        return (
+            f"**Objective:** {description.strip()}\n\n"
+            f"**Complexity:** simple\n\n"
+            f"**Steps:**\n\n{steps}\n\n"
+            f"**Expected Workflow Inputs:** [patient_id]\n\n"
+            f"**Expected Workflow Outputs:** [final_result]"
+        )
+
+    @staticmethod
+    def _architecture(plan: str) -> str:
+        step_tools = [
+            [name.strip() for name in group.split(",") if name.strip()]
+            for group in _REQUIRED_TOOLS.findall(plan)
+        ]
+        nodes = [
+            {
+                "node_id": f"step_{i}",
+                "agent_name": f"Step{i}Agent",
+                "agent_system_prompt": (
+                    f"Call the tools for step {i}. "
+                    f"Tools: [{', '.join(tools)}]. Output: JSON."
+                ),
+                "tools": tools,
+            }
+            for i, tools in enumerate(step_tools, 1)
+        ]
+        nodes.append(
+            {
+                "node_id": "final_result",
+                "agent_name": "FinalResultAgent",
+                "agent_system_prompt": "Compile the previous outputs. Tools: []. Output: JSON.",
+                "tools": [],
+            }
+        )
+        edges = [
+            {"from": a["node_id"], "to": b["node_id"]} for a, b in zip(nodes, nodes[1:])
+        ]
+        return json.dumps(
+            {
+                "workflow_name": "offline_workflow",
+                "nodes": nodes,
+                "edges": edges,
+                "conditional_edges": [],
+                "entry_point": nodes[0]["node_id"],
+            }
+        )
+
+
+def load_script(path: str) -> List[Dict[str, Any]]:
+    """
+    Read scripted responses: a JSON list (or {"responses": [...]}) of rules
+    {"match": regex, "text": template} or {"match": regex, "tool_calls":
+    [{"name": ..., "input": {...}}], "text": template}. A rule may also give
+    {"output": {...}}, the object structured_output validates. Templates
+    and strings in inputs and outputs may use {input} (latest user text)
+    and {patient_id}.
+    """
+    with open(path, "r") as file:
+        script = json.load(file)
+    return script["responses"] if isinstance(script, dict) else script
+
+
+def offline_model_from_env() -> OfflineModel:
+    script_path = os.getenv("OFFLINE_MODEL_SCRIPT")
+    return OfflineModel(
+        latency_ms=float(os.getenv("OFFLINE_MODEL_LATENCY_MS", "0")),
+        latency_jitter_ms=float(os.getenv("OFFLINE_MODEL_LATENCY_JITTER_MS", "0")),
+        tokens_per_second=float(os.getenv("OFFLINE_MODEL_TOKENS_PER_SEC", "0")),
+        seed=int(os.getenv("OFFLINE_MODEL_SEED", "0")),
+        script=load_script(script_path) if script_path else [],
+    )
@@ -1,10 +1,51 @@
+import hashlib
 import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
 
-with open("app/tool_registery.json", "r") as file:
-    registery = json.load(file)
+from .tool_index import ToolIndex, render_tool_table
 
+# Tools shown to the planner per request; keeps the prompt bounded however
+# large the registry grows
+PLANNER_TOOL_TOP_K = int(os.getenv("PLANNER_TOOL_TOP_K", "12"))
 
-def planner_prompt():
+# Next to this module, so the server can start from any working directory
+REGISTRY_PATH = Path(__file__).with_name("tool_registery.json")
+
+
+@lru_cache(maxsize=1)
+def load_registry() -> Dict[str, Any]:
+    """The tool registry, read on first use."""
+    with open(REGISTRY_PATH, "r") as file:
+        return json.load(file)
+
+
+@lru_cache(maxsize=1)
+def get_tool_index() -> ToolIndex:
+    return ToolIndex.from_registry(load_registry())
+
+
+@lru_cache(maxsize=1)
+def registry_version() -> str:
+    """Short content hash of the tool registry; changes whenever a tool is added or edited."""
+    canonical = json.dumps(load_registry(), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+def planner_prompt(
+    description: str = "",
+    top_k: int = PLANNER_TOOL_TOP_K,
+    index: Optional[ToolIndex] = None,
+):
+    """
+    Planner system prompt listing only the registry tools most relevant to
+    `description`, ranked by the BM25 tool index.
+    """
+    index = index or get_tool_index()
+    tools = index.search(description, top_k) or index.tools[:top_k]
+    catalog = render_tool_table(tools)
     return f"""You are a workflow planning specialist.
 
 Your job is to analyze user requests and determine:
@@ -31,8 +72,8 @@ Your job is to analyze user requests and determine:
 - Each agent will only see its own inputs/outputs, not the entire workflow state
 - Design steps to be testable and debuggable independently
 
-Available tools:
-# {registery}
+Available tools (the most relevant subset of the registry):
+{catalog}
 
 Return a structured plan in the following format:
 
@@ -92,10 +133,12 @@ def architect_prompt():
 5. **Validate the graph** for cycles, orphaned nodes, and unreachable steps
 
 ## Important Rules:
-- Do NOT enclose tool names in double quotes
+- Do NOT enclose tool names in double quotes inside agent_system_prompt
+- List in each node's "tools" array exactly the registry tools that node calls, and nothing else (use [] if it calls none)
 - Ensure all node_ids follow kebab-case format and are globally unique
 - Every edge reference must point to existing nodes
 - Avoid circular dependencies
+- Write each conditional_edges "condition" as {{nodes.<node_id>.outputs.<key>}} compared with ==, !=, <, <=, >, >=, in or contains, combined with and/or/not; the referenced node's agent_system_prompt must ask for JSON output containing that key
 - Specify complete input/output mappings
 - Provide concise agent prompts focused on specific tasks
 - Include error handling paths only when critical to workflow success
@@ -120,6 +163,7 @@ def architect_prompt():
             "node_id": "step_1",
             "agent_name": "AgentName",
             "agent_system_prompt": "Concise instructions: [task]. Tools: [tool_name_1, tool_name_2]. Output: [format].",
+            "tools": ["tool_name_1", "tool_name_2"],
             "inputs": {
                 "param1": "{{workflow.inputs.param1}}",
                 "param2": "{{nodes.step_0.outputs.result}}"
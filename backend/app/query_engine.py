@@ -0,0 +1,792 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+from .clinical_store import SCHEMA, ClinicalDataSource
+
+logger = logging.getLogger(__name__)
+
+CUSTOM_QUERY_MAX_ROWS = int(os.getenv("CUSTOM_QUERY_MAX_ROWS", "200"))
+CUSTOM_QUERY_FETCH_SIZE = int(os.getenv("CUSTOM_QUERY_FETCH_SIZE", "100"))
+QUERY_PLAN_CACHE_SIZE = int(os.getenv("QUERY_PLAN_CACHE_SIZE", "1024"))
+# Ask the model for SQL when the rule translator cannot map a question
+CUSTOM_QUERY_MODEL_FALLBACK = (
+    os.getenv("CUSTOM_QUERY_MODEL_FALLBACK", "true").lower() == "true"
+)
+
+# Slot values that are not read from the store: (phrase, slot kind, value)
+ALIASES = (
+    ("missed", "status", "missed"),
+    ("no-show", "status", "missed"),
+    ("no-shows", "status", "missed"),
+    ("no show", "status", "missed"),
+    ("no shows", "status", "missed"),
+    ("kept", "status", "completed"),
+    ("attended", "status", "completed"),
+    ("completed", "status", "completed"),
+    ("cancelled", "status", "cancelled"),
+    ("canceled", "status", "cancelled"),
+    ("cancellation", "status", "cancelled"),
+    ("cancellations", "status", "cancelled"),
+    ("scheduled", "status", "scheduled"),
+    ("upcoming", "status", "scheduled"),
+    ("male", "gender", "Male"),
+    ("men", "gender", "Male"),
+    ("female", "gender", "Female"),
+    ("women", "gender", "Female"),
+    ("diabetes", "condition", "Type 2 Diabetes Mellitus"),
+    ("diabetic", "condition", "Type 2 Diabetes Mellitus"),
+    ("diabetics", "condition", "Type 2 Diabetes Mellitus"),
+    ("hypertensive", "condition", "Hypertension"),
+    ("high blood pressure", "condition", "Hypertension"),
+    ("high cholesterol", "condition", "Hyperlipidemia"),
+    ("heart disease", "condition", "Coronary Artery Disease"),
+    ("kidney disease", "condition", "Chronic Kidney Disease"),
+    ("ckd", "condition", "Chronic Kidney Disease"),
+    ("asthmatic", "condition", "Asthma"),
+)
+
+# Slot kinds read from the store: kind -> (table, column)
+VOCABULARY = {
+    "condition": ("conditions", "condition"),
+    "test": ("labs", "test"),
+    "drug": ("medications", "drug"),
+    "department": ("appointments", "department"),
+}
+
+# Where a slot kind filters, as (table, column)
+SLOT_COLUMNS = {
+    "status": ("appointments", "status"),
+    "department": ("appointments", "department"),
+    "condition": ("conditions", "condition"),
+    "test": ("labs", "test"),
+    "drug": ("medications", "drug"),
+    "gender": ("patients", "gender"),
+}
+
+# Checked in order; the first entity mentioned (or implied by a slot) wins.
+# Other slots filter patients by a subquery on their own table.
+ENTITIES = (
+    ("appointments", r"appointment|visit|encounter|\{status\}|\{department\}"),
+    ("labs", r"\blabs?\b|lab result|test result|\{test\}"),
+    ("medications", r"medication|(?<!\{)\bdrugs?\b|prescri"),
+    ("vitals", r"vital|blood pressure|\bbp\b|pulse|\bweight|spo2|temperature"),
+    ("procedures", r"procedure"),
+    ("allergies", r"allerg"),
+    ("conditions", r"(?<!\{)condition|diagnos|comorbid"),
+    ("patients", r"patient|people|cohort|\bage\b|\{\w+\}"),
+)
+
+DATE_COLUMNS = {
+    "appointments": "appointments.date",
+    "labs": "labs.date",
+    "medications": "medications.started_on",
+    "vitals": "vitals.recorded_at",
+    "procedures": "procedures.date",
+    "conditions": "conditions.diagnosed_on",
+}
+
+LIST_COLUMNS = {
+    "appointments": "patient_id, date, department, doctor, status, cost_usd",
+    "labs": "patient_id, test, value, unit, reference_range, date",
+    "medications": "patient_id, drug, dosage, frequency, active, started_on",
+    "vitals": "patient_id, recorded_at, systolic, diastolic, pulse, spo2, weight_kg",
+    "procedures": "patient_id, name, date, performed_by",
+    "allergies": "patient_id, substance, reaction, severity",
+    "conditions": "patient_id, condition, diagnosed_on, status",
+    "patients": "patient_id, name, dob, gender, blood_group, status",
+}
+
+AGE = "CAST((julianday('now') - julianday(patients.dob)) / 365.25 AS INTEGER)"
+
+# Group-by phrases: (pattern, expression, column name, table it needs).
+# "{date}" is the entity's date column.
+DIMENSIONS = (
+    (r"department|specialt", "appointments.department", "department", "appointments"),
+    (r"doctor|provider|physician", "appointments.doctor", "doctor", "appointments"),
+    (r"day of (?:the )?week|weekday", "WEEKDAY", "day_of_week", None),
+    (r"month", "strftime('%Y-%m', {date})", "month", None),
+    (r"year", "strftime('%Y', {date})", "year", None),
+    (r"status|outcome", "{entity}.status", "status", None),
+    (r"gender|\bsex\b", "patients.gender", "gender", "patients"),
+    (r"blood (?:group|type)", "patients.blood_group", "blood_group", "patients"),
+    (r"\bage\b", f"({AGE} / 10) * 10", "age_band", "patients"),
+    (r"condition|diagnos|disease", "conditions.condition", "condition", "conditions"),
+    (r"\btests?\b", "labs.test", "test", "labs"),
+    (r"drug|medication", "medications.drug", "drug", "medications"),
+    (r"patient", "{entity}.patient_id", "patient_id", None),
+)
+_DAY_NAMES = "substr('SunMonTueWedThuFriSat', 1 + 3 * strftime('%w', {date}), 3)"
+
+# Numeric columns compared by "above"/"below", per entity, and the words
+# that name them
+VALUE_COLUMNS = {
+    "appointments": ((r"\bcost|charge|billing|amount", "appointments.cost_usd"),),
+    "vitals": (
+        (r"pulse|heart rate", "vitals.pulse"),
+        (r"spo2|oxygen", "vitals.spo2"),
+        (r"weight", "vitals.weight_kg"),
+        (r"diastolic", "vitals.diastolic"),
+        (r"systolic|blood pressure|\bbp\b", "vitals.systolic"),
+        (r"temperature", "vitals.temp_f"),
+    ),
+}
+
+_GROUP_BY = re.compile(
+    r"\b(?:by|per|for each|across|broken down by)\s+(.+?)"
+    r"(?=\s+(?:since|after|before|from|between|in the|over the|during|for|with"
+    r"|where|who|that|last|on|above|below|over|under|more than|fewer than"
+    r"|less than|greater than|higher than|lower than|at least|at most|exceeding)\b"
+    r"|$)"
+)
+_UNITS = {"day": 1, "week": 7, "month": 30, "year": 365}
+
+# Words that ask for a measure; a question whose measure words the rules
+# cannot all answer is left to the model
+MEASURE_WORDS = {
+    "rate": r"\brate\b|percent|proportion|\bshare\b",
+    "cost": r"\bcost|revenue|spend|financial|\bloss|charge|billing|amount",
+    "average": r"average|\bmean\b|\bavg\b",
+    "count": r"how many|\bcount|number of|volume|\btotal\b",
+    "other": r"\b(?:max(?:imum)?|min(?:imum)?|median|highest|lowest|sum|trend)\b",
+}
+_COMPARISONS = (
+    (r"at least|>=", ">="),
+    (r"at most|<=", "<="),
+    (r"above|over|greater than|more than|higher than|exceeding|>", ">"),
+    (r"below|under|less than|fewer than|lower than|<", "<"),
+)
+_COMPARATOR = "(?:" + "|".join(pattern for pattern, _ in _COMPARISONS) + ")"
+_RANKED = re.compile(r"^\s*(?:top\s+|which\s+)?([a-z]+)\s+(?:ranked\s+)?by\b")
+
+CHRONOLOGICAL = ("month", "year", "day_of_week", "age_band")
+# Vitals averaged when the question names them; all of them otherwise
+VITAL_MEASURES = (
+    (r"blood pressure|\bbp\b|systolic|diastolic", ("systolic", "diastolic")),
+    (r"pulse|heart rate", ("pulse",)),
+    (r"spo2|oxygen", ("spo2",)),
+    (r"weight", ("weight_kg",)),
+    (r"temperature", ("temp_f",)),
+)
+_SLOT = re.compile(r"\{(\w+)\}")
+
+# Negation words. One that directly precedes a value slot ("not {status}",
+# "without {condition}") negates that filter; any other leaves the question
+# to the model.
+_NEGATION = re.compile(
+    r"\b(?:not|no|none|non|never|neither|nor|without|lacking|except|excluding"
+    r"|exclude|other than)\b|n['’]t\b"
+)
+_NEGATED = re.compile(
+    r"(\bnot|\bno|\bneither|\bwithout|\bexcluding|\bexcept(?: for)?|\bother than"
+    r"|n['’]t)\s+(?:(?:a|an|any|the|those|ones|have|has|had|be|been|being|with"
+    r"|on|in|for|from|taking|currently|diagnosed with)\s+)*$"
+)
+# "without {condition} or {condition}": the second slot is negated too
+_SAME_NEGATION = re.compile(r"\s*,?\s*(?:or|(nor))?\s*")
+
+SQL_PROMPT = """You translate questions about a clinical SQLite database into SQL.
+
+Schema:
+{schema}
+
+Rules:
+- Answer with one SQLite SELECT statement and nothing else.
+- The question's values were replaced by placeholders like {{date}} or {{number}}.
+  Refer to them, in order of appearance, as the named parameters :p1, :p2, ...
+  Never inline literal values for them.
+- Prefer aggregates over returning raw rows, and alias every computed column.
+"""
+
+
+class QueryPlanCache:
+    """LRU of translated SQL keyed by (source, query shape)."""
+
+    def __init__(self, max_entries: int = QUERY_PLAN_CACHE_SIZE):
+        self._max_entries = max_entries
+        self._plans: "OrderedDict[Tuple[str, str], Tuple[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is None:
+                self.misses += 1
+                return None
+            self._plans.move_to_end(key)
+            self.hits += 1
+            return plan
+
+    def put(self, key: Tuple[str, str], sql: str, translator: str) -> None:
+        with self._lock:
+            self._plans[key] = (sql, translator)
+            self._plans.move_to_end(key)
+            while len(self._plans) > self._max_entries:
+                self._plans.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, key: Tuple[str, str]) -> None:
+        with self._lock:
+            self._plans.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._plans),
+            }
+
+
+class RuleTranslator:
+    """
+    Maps a query shape onto SQL by recognizing the entity asked about, the
+    measure (list, count, rate, cost, average), group-by phrases and the
+    filter each slot implies, negated by a "not"/"without" just before it.
+    Returns None, leaving the question to the model, when a slot has no
+    clear role or a measure or negation word is left unused.
+    """
+
+    name = "rules"
+
+    def translate(self, shape: str) -> Optional[str]:
+        entity = next(
+            (name for name, pattern in ENTITIES if re.search(pattern, shape)), None
+        )
+        if entity is None:
+            return None
+        date_column = DATE_COLUMNS.get(entity)
+        joins: Dict[str, str] = {}
+        filters: List[str] = []
+        having: List[Tuple[str, str]] = []  # (comparison, param)
+        group: List[Tuple[str, str, str]] = []  # (expression, column, sort key)
+        limit = None
+
+        # The question with slots blanked out. Words that a dimension or a
+        # filter accounts for are blanked too, so what is left is read for
+        # measures; positions stay those of `shape` throughout.
+        plain = _SLOT.sub(lambda slot: " " * len(slot.group()), shape)
+        text = list(plain)
+        grouped_ends: List[int] = []
+
+        def need(table: str) -> None:
+            if table != entity and table not in joins:
+                joins[table] = (
+                    f"JOIN {table} ON {table}.patient_id = {entity}.patient_id"
+                )
+
+        def group_by(start: int, end: int) -> None:
+            dimension = _dimension(plain[start:end], entity, date_column)
+            if dimension is None:
+                return
+            expression, column, sort_key, table = dimension
+            if column not in (grouped for _, grouped, _ in group):
+                if table:
+                    need(table)
+                group.append((expression, column, sort_key))
+            text[start:end] = " " * (end - start)
+            grouped_ends.append(end)
+
+        for phrase in _GROUP_BY.finditer(plain):
+            start = phrase.start(1)
+            for piece in re.finditer(r"(?:(?!\band\b)[^,])+", phrase.group(1)):
+                word = piece.group().strip()
+                if word:
+                    offset = start + piece.start() + piece.group().index(word)
+                    group_by(offset, offset + len(word))
+        # "departments by ...", "top 5 doctors by ..." rank the leading noun
+        ranked = _RANKED.match(plain)
+        if ranked and not any(
+            re.search(pattern, ranked.group(1))
+            for pattern in [p for _, p in ENTITIES] + list(MEASURE_WORDS.values())
+        ):
+            group_by(ranked.start(1), ranked.end(1))
+
+        rate_param = None
+        rate = bool(re.search(MEASURE_WORDS["rate"], plain))
+        # Equality slots by kind and negation, as (param, text since the
+        # previous slot)
+        equal: "OrderedDict[Tuple[str, bool], List[Tuple[str, str]]]" = OrderedDict()
+        negations: List[int] = []  # where the negation words slots took start
+        negated = False
+        previous_end = 0
+        for position, slot in enumerate(_SLOT.finditer(shape), 1):
+            kind, param = slot.group(1), f":p{position}"
+            before = shape[: slot.start()]
+            after = shape[slot.end() :]
+            between_start, between = previous_end, shape[previous_end : slot.start()]
+            previous_end = slot.end()
+            previous_negated, negated = negated, False
+            if kind == "status" and rate and not rate_param:
+                if entity != "appointments":
+                    return None
+                rate_param = param
+            elif kind in SLOT_COLUMNS or kind == "patient":
+                negation = _NEGATED.search(shape, between_start, slot.start())
+                same = _SAME_NEGATION.fullmatch(between)
+                if negation:
+                    negations.append(negation.start(1))
+                    negated = True
+                elif previous_negated and same:
+                    if same.group(1):
+                        negations.append(between_start + same.start(1))
+                    negated = True
+                elif previous_negated and re.fullmatch(r"\s*,?\s*and\s*", between):
+                    # "without A and B": lacking both, or not having both?
+                    return None
+                equal.setdefault((kind, negated), []).append((param, between))
+            elif kind == "date":
+                if not date_column:
+                    return None
+                if re.search(r"\b(?:before|until|prior to|up to)\s*$", before):
+                    filters.append(f"{date_column} < {param}")
+                elif re.search(r"\bon\s*$", before):
+                    filters.append(f"{date_column} = {param}")
+                elif re.search(r"\{date\}\s+and\s*$", before):
+                    filters.append(f"{date_column} <= {param}")
+                else:
+                    filters.append(f"{date_column} >= {param}")
+            elif kind == "number":
+                comparison = _comparison(before)
+                if comparison and any(
+                    re.fullmatch(rf"\s+{_COMPARATOR}\s*", shape[end : slot.start()])
+                    for end in grouped_ends
+                ):
+                    # "... per patient above 3" compares the per-group measure
+                    having.append((comparison, param))
+                    continue
+                if comparison:
+                    value = _value_column(entity, plain[: slot.start()])
+                    if value is None:
+                        return None
+                    column, (start, end) = value
+                    text[start:end] = " " * (end - start)
+                    filters.append(f"{column} {comparison} {param}")
+                    continue
+                condition = _number_filter(before, after, param, entity)
+                if condition is None:
+                    return None
+                if condition == "LIMIT":
+                    # "top 5 departments for ..." ranks departments
+                    following = re.compile(r"\s*([a-z]+)").match(plain, slot.end())
+                    if following:
+                        group_by(following.start(1), following.end(1))
+                    limit = param
+                    continue
+                if AGE in condition:
+                    need("patients")
+                filters.append(condition)
+            else:
+                return None
+        if rate and not rate_param:
+            return None
+        if any(word.start() not in negations for word in _NEGATION.finditer(plain)):
+            # "patients with no allergies", "not above 3": no rule for these
+            return None
+
+        for (kind, negated), slots in equal.items():
+            params = [param for param, _ in slots]
+            if kind == "patient":
+                table, column = entity, "patient_id"
+            else:
+                table, column = SLOT_COLUMNS[kind]
+            if table == "patients":
+                need("patients")
+            if table in (entity, "patients"):
+                if (
+                    negated
+                    and table != "patients"
+                    and re.search(r"\bpatients?\b|people", plain)
+                ):
+                    # "patients with no {status} appointments" asks which
+                    # patients have none, not for their other appointments
+                    return None
+                # A column cannot equal two values: several mean any of them
+                filters.append(f"{table}.{column} {_equals(params, negated)}")
+            elif negated:
+                # "without {condition} or {condition}": neither of them
+                filters.append(
+                    f"{entity}.patient_id NOT IN (SELECT patient_id FROM {table} "
+                    f"WHERE {column} {_equals(params)})"
+                )
+            elif any(re.search(r"\bor\s*$", between) for _, between in slots[1:]):
+                filters.append(
+                    f"{entity}.patient_id IN (SELECT patient_id FROM {table} "
+                    f"WHERE {column} {_equals(params)})"
+                )
+            else:
+                # "with diabetes and hypertension": each one must hold
+                filters.extend(
+                    f"{entity}.patient_id IN "
+                    f"(SELECT patient_id FROM {table} WHERE {column} = {param})"
+                    for param in params
+                )
+
+        words = "".join(text)
+        wanted = {
+            measure
+            for measure, pattern in MEASURE_WORDS.items()
+            if re.search(pattern, words)
+        }
+        if entity == "patients" or re.search(r"\bpatients?\b|people", words):
+            count = (f"COUNT(DISTINCT {entity}.patient_id)", "patients")
+        else:
+            count = ("COUNT(*)", "count")
+        measures: List[Tuple[str, str]] = []  # (expression, alias)
+        used = set()
+        if "rate" in wanted:
+            measures = [
+                ("COUNT(*)", "appointments"),
+                (
+                    f"ROUND(100.0 * SUM(appointments.status = {rate_param})"
+                    " / COUNT(*), 2)",
+                    "rate_pct",
+                ),
+            ]
+            used = {"rate", "count"}
+        elif "cost" in wanted:
+            if entity != "appointments":
+                return None
+            if "average" in wanted or re.search(r"per appointment", words):
+                total = ("ROUND(AVG(appointments.cost_usd), 2)", "avg_cost_usd")
+            else:
+                total = ("ROUND(SUM(appointments.cost_usd), 2)", "total_cost_usd")
+            measures = [("COUNT(*)", "appointments"), total]
+            used = {"cost", "average", "count"}
+        elif "average" in wanted:
+            measures = [count]
+            if re.search(r"\bage\b", words):
+                need("patients")
+                measures.append((f"ROUND(AVG({AGE}), 1)", "avg_age"))
+            elif entity == "labs":
+                measures.append(("ROUND(AVG(labs.value), 2)", "avg_value"))
+            elif entity == "vitals":
+                named = [
+                    column
+                    for pattern, columns in VITAL_MEASURES
+                    if re.search(pattern, words)
+                    for column in columns
+                ]
+                measures.extend(
+                    (f"ROUND(AVG(vitals.{column}), 1)", f"avg_{column}")
+                    for column in named
+                    or [column for _, columns in VITAL_MEASURES for column in columns]
+                )
+            else:
+                return None
+            used = {"average", "count"}
+        elif group or having or "count" in wanted:
+            measures = [count]
+            used = {"count"}
+        if wanted - used or (having and not group):
+            return None
+
+        from_clause = " ".join([entity, *joins.values()])
+        where = f" WHERE {' AND '.join(filters)}" if filters else ""
+        if not measures:
+            columns = ", ".join(
+                f"{entity}.{column}" for column in LIST_COLUMNS[entity].split(", ")
+            )
+            order = f"{date_column} DESC" if date_column else f"{entity}.patient_id"
+            sql = f"SELECT {columns} FROM {from_clause}{where} ORDER BY {order}"
+        else:
+            columns = [f"{expression} AS {column}" for expression, column, _ in group]
+            columns += [f"{expression} AS {alias}" for expression, alias in measures]
+            sql = f"SELECT {', '.join(columns)} FROM {from_clause}{where}"
+            # The headline measure: rate, cost, average or count
+            headline, headline_alias = measures[-1]
+            if group:
+                sql += f" GROUP BY {', '.join(column for _, column, _ in group)}"
+                if having:
+                    sql += " HAVING " + " AND ".join(
+                        f"{headline} {comparison} {param}"
+                        for comparison, param in having
+                    )
+                if group[0][1] in CHRONOLOGICAL and not limit:
+                    sql += f" ORDER BY {group[0][2]}"
+                else:
+                    sql += f" ORDER BY {headline_alias} DESC"
+        if limit:
+            sql += f" LIMIT {limit}"
+        return sql
+
+
+def _comparison(before: str) -> Optional[str]:
+    for pattern, operator in _COMPARISONS:
+        if re.search(rf"(?:{pattern})\s*$", before):
+            return operator
+    return None
+
+
+def _equals(params: List[str], negated: bool = False) -> str:
+    if len(params) == 1:
+        return f"{'!=' if negated else '='} {params[0]}"
+    return f"{'NOT IN' if negated else 'IN'} ({', '.join(params)})"
+
+
+def _dimension(
+    piece: str, entity: str, date_column: Optional[str]
+) -> Optional[Tuple[str, str, str, Optional[str]]]:
+    """(expression, column, sort key, table to join) for a group-by phrase."""
+    for pattern, expression, column, table in DIMENSIONS:
+        if not re.search(pattern, piece):
+            continue
+        if "{date}" in expression or expression == "WEEKDAY":
+            if not date_column:
+                return None
+            if expression == "WEEKDAY":
+                return (
+                    _DAY_NAMES.format(date=date_column),
+                    column,
+                    f"MIN(strftime('%w', {date_column}))",
+                    table,
+                )
+            return expression.format(date=date_column), column, column, table
+        if expression.startswith("{entity}.status") and entity not in (
+            "appointments",
+            "conditions",
+            "patients",
+        ):
+            return None
+        return expression.format(entity=entity), column, column, table
+    return None
+
+
+def _value_column(entity: str, before: str) -> Optional[Tuple[str, Tuple[int, int]]]:
+    """
+    The numeric column a comparison refers to, from the last word naming one
+    before it, and that word's span. Lab values need no word: the test slot
+    names them.
+    """
+    if entity == "labs":
+        return "labs.value", (len(before), len(before))
+    named = [
+        (match.span(), column)
+        for pattern, column in VALUE_COLUMNS.get(entity, ())
+        for match in re.finditer(pattern, before)
+    ]
+    if not named:
+        return None
+    span, column = max(named)
+    return column, span
+
+
+def _number_filter(before: str, after: str, param: str, entity: str) -> Optional[str]:
+    """The condition a {number} slot adds, "LIMIT", or None if it has no clear role."""
+    unit = re.match(r"\s*(day|week|month|year)s?\b", after)
+    if unit and re.search(r"\b(?:last|past|previous)\s*$", before):
+        date_column = DATE_COLUMNS.get(entity)
+        if not date_column:
+            return None
+        days = _UNITS[unit.group(1)]
+        return f"{date_column} >= date('now', '-' || ({param} * {days}) || ' days')"
+    if re.search(r"\b(?:older than|aged over|age over|over the age of)\s*$", before):
+        return f"{AGE} > {param}"
+    if re.search(r"\b(?:younger than|aged under|age under)\s*$", before):
+        return f"{AGE} < {param}"
+    if re.search(r"\b(?:top|first|limit)\s*$", before):
+        return "LIMIT"
+    return None
+
+
+class ModelTranslator:
+    """Asks the shared model to write SQL for a query shape."""
+
+    name = "model"
+
+    def translate(self, shape: str) -> Optional[str]:
+        from strands import Agent
+
+        from .models import get_default_model
+
+        agent = Agent(
+            name="SQLTranslator",
+            model=get_default_model(),
+            system_prompt=SQL_PROMPT.format(
+                schema="\n".join(statement.strip() for statement in SCHEMA)
+            ),
+            callback_handler=None,
+        )
+        return _extract_sql(str(agent(f"Question: {shape}")))
+
+
+def _extract_sql(reply: str) -> Optional[str]:
+    fenced = re.search(r"```(?:sql)?\s*(.+?)```", reply, re.DOTALL | re.IGNORECASE)
+    sql = (fenced.group(1) if fenced else reply).strip().rstrip(";").strip()
+    if not re.match(r"(?is)^(select|with)\b", sql) or ";" in sql:
+        return None
+    return sql
+
+
+class QueryEngine:
+    """
+    Answers custom_query questions with SQL against the clinical store.
+
+    A question is reduced to its shape: literals (dates, numbers, patient
+    ids, quoted text) and names the store knows (conditions, lab tests,
+    drugs, departments, statuses) become typed slots and bound parameters.
+    SQL is translated once per shape and source, by the rule translator or
+    else the model, then cached; later questions of the same shape with
+    other values reuse it without translating. Results are read from a
+    streaming cursor up to a row limit.
+    """
+
+    def __init__(
+        self,
+        translators: Optional[List[Any]] = None,
+        plans: Optional[QueryPlanCache] = None,
+    ):
+        if translators is None:
+            translators = [RuleTranslator()]
+            if CUSTOM_QUERY_MODEL_FALLBACK:
+                translators.append(ModelTranslator())
+        self.translators = translators
+        self.plans = plans or QueryPlanCache()
+        self._vocabularies: Dict[str, Tuple[Pattern, Dict[str, Tuple[str, str]]]] = {}
+        self._vocabulary_lock = threading.Lock()
+        self.translations: Dict[str, int] = {}
+        self.untranslatable = 0
+
+    def _vocabulary(
+        self, source: ClinicalDataSource
+    ) -> Tuple[Pattern, Dict[str, Tuple[str, str]]]:
+        vocabulary = self._vocabularies.get(source.name)
+        if vocabulary is not None:
+            return vocabulary
+        with self._vocabulary_lock:
+            if source.name not in self._vocabularies:
+                terms = {phrase: (kind, value) for phrase, kind, value in ALIASES}
+                for kind, (table, column) in VOCABULARY.items():
+                    sql = f"SELECT DISTINCT {column} FROM {table}"
+                    with source.query(sql) as cursor:
+                        for (value,) in cursor:
+                            terms.setdefault(value.casefold(), (kind, value))
+                phrases = sorted(terms, key=len, reverse=True)
+                pattern = re.compile(
+                    r"(?P<text>\"[^\"]+\"|'[^']+')"
+                    r"|(?P<date>\b\d{4}-\d{2}-\d{2}\b)"
+                    r"|(?P<patient>\bp\d{3,}\b)"
+                    r"|(?P<term>(?<![\w-])(?:"
+                    + "|".join(re.escape(phrase) for phrase in phrases)
+                    + r")(?![\w-]))"
+                    r"|(?P<number>\b\d+(?:\.\d+)?\b)",
+                    re.IGNORECASE,
+                )
+                self._vocabularies[source.name] = (pattern, terms)
+        return self._vocabularies[source.name]
+
+    def shape(
+        self, source: ClinicalDataSource, question: str
+    ) -> Tuple[str, Dict[str, Any]]:
+        """The question's shape and the parameter values for its slots."""
+        pattern, terms = self._vocabulary(source)
+        text = unicodedata.normalize("NFKC", question)
+        parts: List[str] = []
+        params: Dict[str, Any] = {}
+        end = 0
+        for match in pattern.finditer(text):
+            kind = match.lastgroup
+            value: Any = match.group(kind)
+            if kind == "text":
+                value = value[1:-1]
+            elif kind == "patient":
+                value = value.upper()
+            elif kind == "term":
+                kind, value = terms[value.casefold()]
+            elif kind == "number":
+                value = float(value) if "." in value else int(value)
+            parts.append(text[end : match.start()].casefold())
+            parts.append(f"{{{kind}}}")
+            params[f"p{len(params) + 1}"] = value
+            end = match.end()
+        parts.append(text[end:].casefold())
+        shape = re.sub(r"\s+", " ", "".join(parts)).strip().rstrip(".!?;, ")
+        return shape, params
+
+    def _translate(self, shape: str) -> Tuple[Optional[str], Optional[str]]:
+        for translator in self.translators:
+            try:
+                sql = translator.translate(shape)
+            except Exception:
+                logger.exception("%s translator failed on %r", translator.name, shape)
+                continue
+            if sql:
+                return sql, translator.name
+        return None, None
+
+    def run(
+        self,
+        source: ClinicalDataSource,
+        question: str,
+        max_rows: int = CUSTOM_QUERY_MAX_ROWS,
+        fetch_size: int = CUSTOM_QUERY_FETCH_SIZE,
+    ) -> Dict[str, Any]:
+        shape, params = self.shape(source, question)
+        key = (source.name, shape)
+        plan = self.plans.get(key)
+        if plan:
+            sql, origin = plan[0], "cached"
+        else:
+            sql, origin = self._translate(shape)
+            if sql is None:
+                self.untranslatable += 1
+                return {
+                    "status": "error",
+                    "error": "Could not translate the query into SQL",
+                    "query_shape": shape,
+                }
+            self.translations[origin] = self.translations.get(origin, 0) + 1
+            self.plans.put(key, sql, origin)
+
+        try:
+            with source.query(sql, params) as cursor:
+                columns = [column[0] for column in cursor.description]
+                rows: List[tuple] = []
+                while len(rows) < max_rows:
+                    batch = cursor.fetchmany(min(fetch_size, max_rows - len(rows)))
+                    if not batch:
+                        break
+                    rows.extend(batch)
+                truncated = len(rows) == max_rows and cursor.fetchone() is not None
+        except sqlite3.Error as e:
+            if "interrupted" not in str(e):
+                # Broken SQL must not be served from the cache again
+                self.plans.discard(key)
+            return {
+                "status": "error",
+                "error": str(e),
+                "sql": sql,
+                "query_shape": shape,
+            }
+        return {
+            "status": "success",
+            "query_shape": shape,
+            "sql": sql,
+            "params": params,
+            "plan": origin,
+            "columns": columns,
+            "rows": [dict(zip(columns, row)) for row in rows],
+            "row_count": len(rows),
+            "truncated": truncated,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.plans.stats(),
+            "translations": dict(self.translations),
+            "untranslatable": self.untranslatable,
+        }
+
+
+query_engine = QueryEngine()
@@ -0,0 +1,226 @@
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from strands.multiagent import GraphBuilder
+from strands.multiagent.base import Status
+from strands.multiagent.graph import Graph, GraphNode
+
+from .budget import current_meter
+
+MAX_PARALLEL_NODES = int(os.getenv("WORKFLOW_MAX_PARALLEL_NODES", "4"))
+
+
+def _has_cycle(graph: Graph) -> bool:
+    children: Dict[str, List[str]] = {node_id: [] for node_id in graph.nodes}
+    for edge in graph.edges:
+        children[edge.from_node.node_id].append(edge.to_node.node_id)
+
+    visiting: Set[str] = set()
+    done: Set[str] = set()
+
+    def visit(node_id: str) -> bool:
+        visiting.add(node_id)
+        for child in children[node_id]:
+            if child in visiting or (child not in done and visit(child)):
+                return True
+        visiting.discard(node_id)
+        done.add(node_id)
+        return False
+
+    return any(node_id not in done and visit(node_id) for node_id in graph.nodes)
+
+
+class DagGraph(Graph):
+    """
+    Graph that schedules nodes as soon as their dependencies allow, instead
+    of Strands' level-by-level batches.
+
+    A node starts once every parent that can still run has finished and at
+    least one of their edges to it is traversable (a true join: merge nodes
+    run once, with all their inputs). Branches run concurrently, up to
+    `max_parallelism` nodes at a time, so a run takes as long as its
+    critical path rather than the sum of its slowest node per level. Nodes
+    whose incoming edges are all unsatisfied are skipped, along with anything
+    only reachable through them.
+
+    Once a run is over a degrading budget (see app.budget), nodes that have
+    not started are skipped too; an aborting budget fails the run instead.
+
+    Graphs with cycles keep the Strands loop semantics.
+
+    After each run, `schedule` holds per-node ready/start/end offsets with
+    wait (queued for a parallelism slot) and run times, and the critical path.
+    """
+
+    def __init__(
+        self, *args: Any, max_parallelism: int = MAX_PARALLEL_NODES, **kwargs: Any
+    ):
+        super().__init__(*args, **kwargs)
+        self.max_parallelism = max(1, max_parallelism)
+        self.schedule: Dict[str, Any] = {}
+        self._cyclic = _has_cycle(self)
+
+    async def _execute_graph(self, invocation_state: Dict[str, Any]) -> None:
+        if self._cyclic:
+            await super()._execute_graph(invocation_state)
+            return
+
+        started = time.perf_counter()
+
+        def offset() -> int:
+            return round((time.perf_counter() - started) * 1000)
+
+        incoming: Dict[str, list] = {node_id: [] for node_id in self.nodes}
+        outgoing: Dict[str, list] = {node_id: [] for node_id in self.nodes}
+        for edge in self.edges:
+            incoming[edge.to_node.node_id].append(edge)
+            outgoing[edge.from_node.node_id].append(edge)
+
+        # Parents that can never run must not hold their children back
+        reachable: Set[str] = set()
+        stack = [node.node_id for node in self.entry_points]
+        while stack:
+            node_id = stack.pop()
+            if node_id not in reachable:
+                reachable.add(node_id)
+                stack.extend(edge.to_node.node_id for edge in outgoing[node_id])
+        resolved: Set[str] = set(self.nodes) - reachable
+        skipped: List[str] = []
+        timings: Dict[str, Dict[str, int]] = {}
+        triggered_by: Dict[str, Optional[str]] = {}
+        slots = asyncio.Semaphore(self.max_parallelism)
+        running: Set[asyncio.Task] = set()
+        meter = current_meter()
+
+        def within_budget() -> bool:
+            return meter is None or meter.within_budget()
+
+        async def run(node: GraphNode) -> GraphNode:
+            async with slots:
+                timings[node.node_id]["start_ms"] = offset()
+                await self._execute_node(node, invocation_state)
+            timings[node.node_id]["end_ms"] = offset()
+            return node
+
+        def start(node: GraphNode, parent: Optional[str]) -> None:
+            timings[node.node_id] = {"ready_ms": offset()}
+            triggered_by[node.node_id] = parent
+            running.add(asyncio.create_task(run(node)))
+
+        def release_children(node_id: str) -> None:
+            # Decide every child whose parents are now all resolved
+            pending = [node_id]
+            while pending:
+                parent = pending.pop()
+                for edge in outgoing[parent]:
+                    child = edge.to_node
+                    if child.node_id in resolved or child.node_id in timings:
+                        continue
+                    edges_in = incoming[child.node_id]
+                    if any(e.from_node.node_id not in resolved for e in edges_in):
+                        continue
+                    traversable = any(
+                        e.from_node in self.state.completed_nodes
+                        and e.should_traverse(self.state)
+                        for e in edges_in
+                    )
+                    if traversable and within_budget():
+                        start(child, node_id)
+                    else:
+                        resolved.add(child.node_id)
+                        skipped.append(child.node_id)
+                        pending.append(child.node_id)
+
+        for node in self.entry_points:
+            start(node, None)
+
+        try:
+            while running:
+                timeout = None
+                if self.execution_timeout is not None:
+                    timeout = max(
+                        0.0, self.execution_timeout - (time.time() - self.state.start_time)
+                    )
+                done, running_left = await asyncio.wait(
+                    running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                running.clear()
+                running.update(running_left)
+                if not done:
+                    self.state.status = Status.FAILED
+                    return
+                for task in done:
+                    node = task.result()
+                    resolved.add(node.node_id)
+                    release_children(node.node_id)
+                should_continue, _ = self.state.should_continue(
+                    max_node_executions=self.max_node_executions,
+                    execution_timeout=self.execution_timeout,
+                )
+                if not should_continue:
+                    self.state.status = Status.FAILED
+                    return
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+            self.schedule = self._report(timings, triggered_by, skipped, offset())
+
+    def _report(
+        self,
+        timings: Dict[str, Dict[str, int]],
+        triggered_by: Dict[str, Optional[str]],
+        skipped: List[str],
+        total_ms: int,
+    ) -> Dict[str, Any]:
+        nodes = {}
+        for node_id, timing in timings.items():
+            entry = dict(timing)
+            if "start_ms" in entry:
+                entry["wait_ms"] = entry["start_ms"] - entry["ready_ms"]
+            if "end_ms" in entry:
+                entry["run_ms"] = entry["end_ms"] - entry["start_ms"]
+            nodes[node_id] = entry
+
+        # Walk back from the last node to finish through the parent whose
+        # completion released each node
+        finished = [node_id for node_id, entry in nodes.items() if "end_ms" in entry]
+        path: List[str] = []
+        current = max(finished, key=lambda n: nodes[n]["end_ms"]) if finished else None
+        while current is not None:
+            path.append(current)
+            current = triggered_by.get(current)
+        path.reverse()
+
+        return {
+            "max_parallelism": self.max_parallelism,
+            "total_ms": total_ms,
+            "nodes": nodes,
+            "skipped": skipped,
+            "critical_path": path,
+            "critical_path_ms": nodes[path[-1]]["end_ms"] if path else 0,
+        }
+
+
+class DagGraphBuilder(GraphBuilder):
+    """GraphBuilder whose build() returns a DagGraph."""
+
+    def __init__(self, max_parallelism: int = MAX_PARALLEL_NODES):
+        super().__init__()
+        self._max_parallelism = max_parallelism
+
+    def build(self) -> DagGraph:
+        graph = super().build()
+        return DagGraph(
+            nodes=graph.nodes,
+            edges=graph.edges,
+            entry_points=graph.entry_points,
+            max_node_executions=graph.max_node_executions,
+            execution_timeout=graph.execution_timeout,
+            node_timeout=graph.node_timeout,
+            reset_on_revisit=graph.reset_on_revisit,
+            max_parallelism=self._max_parallelism,
+        )
@@ -0,0 +1,41 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+
+from .executor import run_workflow
+
+
+def format_sse(payload: Dict[str, Any]) -> str:
+    """Encode one event in the text/event-stream wire format."""
+    return f"event: {payload['event']}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+
+async def workflow_event_stream(workflow_id: str, input: str) -> AsyncIterator[str]:
+    """
+    Run a workflow on a worker thread and yield its progress as server-sent
+    events: workflow_start, node_start, tool_call, tool_result, node_end and
+    finally workflow_end (or error).
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[Optional[Dict[str, Any]]] = asyncio.Queue()
+
+    def listener(payload: Optional[Dict[str, Any]]) -> None:
+        loop.call_soon_threadsafe(queue.put_nowait, payload)
+
+    def run() -> None:
+        try:
+            result = run_workflow(workflow_id, input, listener=listener)
+            listener({"event": "workflow_end", **result})
+        except Exception as e:
+            detail = getattr(e, "detail", None) or str(e)
+            listener({"event": "error", "workflow_id": workflow_id, "detail": detail})
+        finally:
+            listener(None)
+
+    loop.run_in_executor(None, run)
+
+    while True:
+        payload = await queue.get()
+        if payload is None:
+            break
+        yield format_sse(payload)
@@ -0,0 +1,388 @@
+"""
+Synthetic clinical population for the local clinical store.
+
+Patients are P1000, P1001, ... and every record is drawn from a seeded RNG,
+so the same size and seed always give the same data. Records are consistent
+within a patient: medications, lab results and appointments follow from the
+patient's conditions.
+
+    cd backend && python -m app.synthetic_data --patients 1000000 --output clinical.db
+"""
+
+import argparse
+import datetime
+import os
+import random
+import sqlite3
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .clinical_store import INDEXES, create_schema
+
+FIRST_NAMES = (
+    "Arjun", "Meera", "Amit", "Neha", "Rahul", "Priya", "Vikram", "Ananya",
+    "Rohan", "Kavya", "Suresh", "Lakshmi", "Karan", "Divya", "Sanjay", "Pooja",
+    "Ravi", "Sneha", "Manoj", "Isha", "Deepak", "Nisha", "Arun", "Shreya",
+)  # fmt: skip
+LAST_NAMES = (
+    "Patel", "Sharma", "Verma", "Singh", "Gupta", "Iyer", "Reddy", "Nair",
+    "Mehta", "Bansal", "Kapoor", "Joshi", "Rao", "Das", "Menon", "Chopra",
+)  # fmt: skip
+BLOOD_GROUPS = ("O+", "A+", "B+", "AB+", "O-", "A-", "B-", "AB-")
+BLOOD_GROUP_WEIGHTS = (37, 28, 22, 6, 3, 2, 1.5, 0.5)
+DOCTORS = {
+    "Cardiology": ("Dr. Neha Singh", "Dr. Rajesh Mehta"),
+    "Endocrinology": ("Dr. Alok Bansal", "Dr. Kavita Rao"),
+    "General Medicine": ("Dr. Sunil Iyer", "Dr. Farah Khan"),
+    "Nephrology": ("Dr. Vivek Nair",),
+    "Pulmonology": ("Dr. Anil Kapoor",),
+    "Orthopedics": ("Dr. Ritu Joshi",),
+    "Gastroenterology": ("Dr. Manish Gupta",),
+}
+
+# condition: (prevalence, department, [(drug, dosage, frequency)], [lab tests])
+CONDITIONS: Dict[str, Tuple[float, str, List[Tuple[str, ...]], List[str]]] = {
+    "Type 2 Diabetes Mellitus": (
+        0.18,
+        "Endocrinology",
+        [("Metformin", "500mg", "Twice daily"), ("Glimepiride", "1mg", "Once daily")],
+        ["HbA1c", "Fasting Glucose"],
+    ),
+    "Hypertension": (
+        0.25,
+        "Cardiology",
+        [("Amlodipine", "5mg", "Once daily"), ("Telmisartan", "40mg", "Once daily")],
+        ["Creatinine"],
+    ),
+    "Hyperlipidemia": (
+        0.15,
+        "Cardiology",
+        [("Atorvastatin", "10mg", "Once daily at night")],
+        ["Cholesterol", "LDL"],
+    ),
+    "Coronary Artery Disease": (
+        0.05,
+        "Cardiology",
+        [("Aspirin", "75mg", "Once daily"), ("Metoprolol", "25mg", "Twice daily")],
+        ["Troponin I", "LDL"],
+    ),
+    "Asthma": (
+        0.07,
+        "Pulmonology",
+        [("Salbutamol inhaler", "100mcg", "As needed")],
+        ["Eosinophil Count"],
+    ),
+    "Hypothyroidism": (
+        0.08,
+        "Endocrinology",
+        [("Levothyroxine", "50mcg", "Once daily before breakfast")],
+        ["TSH"],
+    ),
+    "Chronic Kidney Disease": (
+        0.04,
+        "Nephrology",
+        [("Sodium bicarbonate", "500mg", "Twice daily")],
+        ["Creatinine", "eGFR"],
+    ),
+    "Osteoarthritis": (
+        0.10,
+        "Orthopedics",
+        [("Paracetamol", "650mg", "As needed")],
+        ["Vitamin D"],
+    ),
+    "GERD": (
+        0.09,
+        "Gastroenterology",
+        [("Pantoprazole", "40mg", "Once daily before breakfast")],
+        [],
+    ),
+    "Vitamin D Deficiency": (
+        0.12,
+        "General Medicine",
+        [("Cholecalciferol", "60000 IU", "Once weekly")],
+        ["Vitamin D"],
+    ),
+}
+CONDITION_STATUSES = ("chronic", "controlled", "stable", "active")
+
+# test: (unit, reference range, normal mean, normal sd, abnormal mean, decimals)
+LAB_TESTS = {
+    "HbA1c": ("%", "< 5.7%", 5.3, 0.3, 7.6, 1),
+    "Fasting Glucose": ("mg/dL", "70-99 mg/dL", 88, 8, 145, 0),
+    "Cholesterol": ("mg/dL", "< 200 mg/dL", 175, 20, 235, 0),
+    "LDL": ("mg/dL", "< 100 mg/dL", 90, 15, 150, 0),
+    "Creatinine": ("mg/dL", "0.6-1.2 mg/dL", 0.9, 0.15, 1.9, 2),
+    "eGFR": ("mL/min/1.73m2", "> 90 mL/min/1.73m2", 100, 10, 45, 0),
+    "TSH": ("mIU/L", "0.4-4.0 mIU/L", 2.0, 0.8, 7.5, 2),
+    "Troponin I": ("ng/mL", "< 0.04 ng/mL", 0.01, 0.005, 0.09, 3),
+    "Vitamin D": ("ng/mL", "30-100 ng/mL", 38, 8, 17, 0),
+    "Eosinophil Count": ("cells/uL", "< 500 cells/uL", 220, 80, 650, 0),
+    "Hemoglobin": ("g/dL", "12-17 g/dL", 14, 1.2, 10.5, 1),
+}
+ROUTINE_LABS = ("Hemoglobin", "Cholesterol")
+
+PROCEDURES = (
+    ("ECG", "Technician"),
+    ("Echocardiogram", "Dr. Rajesh Mehta"),
+    ("Chest X-Ray", "Technician"),
+    ("Angioplasty", "Dr. Rajesh Mehta"),
+    ("Colonoscopy", "Dr. Manish Gupta"),
+    ("Knee Arthroscopy", "Dr. Ritu Joshi"),
+    ("Spirometry", "Dr. Anil Kapoor"),
+)
+ALLERGIES = (
+    ("Penicillin", "Rash", "Mild"),
+    ("Peanuts", "Anaphylaxis", "Severe"),
+    ("Dust", "Cough", "Mild"),
+    ("Pollen", "Sneezing", "Mild"),
+    ("Sulfa drugs", "Hives", "Moderate"),
+    ("Shellfish", "Swelling", "Severe"),
+    ("Latex", "Itching", "Moderate"),
+)
+DIETS = (
+    ("Oats with skimmed milk and almonds", "Brown rice, dal, and mixed salad",
+     "Vegetable soup and multigrain roti"),
+    ("Vegetable poha and green tea", "Quinoa, paneer and sauteed greens",
+     "Grilled fish with steamed vegetables"),
+    ("Idli with sambar", "Millet roti, chana and cucumber raita",
+     "Moong dal khichdi with curd"),
+    ("Egg white omelette and fruit", "Chapati, mixed vegetables and dal",
+     "Lentil soup and salad"),
+)  # fmt: skip
+APPOINTMENT_COST_USD = {
+    "completed": 120.0,
+    "missed": 45.0,
+    "cancelled": 0.0,
+    "scheduled": 0.0,
+}
+
+BATCH_PATIENTS = 10000
+
+
+def _date(day: datetime.date) -> str:
+    return day.isoformat()
+
+
+def _patient(rng: random.Random, i: int, as_of: datetime.date) -> Dict[str, list]:
+    """All rows of one patient, by table."""
+    patient_id = f"P{1000 + i}"
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    gender = "Female" if first in FIRST_NAMES[1::2] else "Male"
+    age = rng.randint(18, 90)
+    dob = as_of - datetime.timedelta(days=age * 365 + rng.randint(0, 364))
+    height = round(rng.gauss(172 if gender == "Male" else 159, 7), 1)
+    rows: Dict[str, list] = {
+        "patients": [
+            (
+                patient_id,
+                f"{first} {last}",
+                _date(dob),
+                gender,
+                rng.choices(BLOOD_GROUPS, BLOOD_GROUP_WEIGHTS)[0],
+                f"+91-9{rng.randint(100000000, 999999999)}",
+                f"{first.lower()}.{last.lower()}{i}@example.com",
+                "active" if rng.random() < 0.97 else "inactive",
+                height,
+            )
+        ]
+    }
+
+    # Older patients carry more conditions
+    conditions = [
+        name
+        for name, (prevalence, *_rest) in CONDITIONS.items()
+        if rng.random() < prevalence * (0.5 + age / 60)
+    ]
+    rows["conditions"] = [
+        (
+            patient_id,
+            seq,
+            name,
+            _date(as_of - datetime.timedelta(days=rng.randint(60, 365 * 12))),
+            rng.choice(CONDITION_STATUSES),
+        )
+        for seq, name in enumerate(conditions)
+    ]
+
+    medications = []
+    for name in conditions:
+        for drug, dosage, frequency in CONDITIONS[name][2][: rng.randint(1, 2)]:
+            started = as_of - datetime.timedelta(days=rng.randint(30, 365 * 8))
+            updated = as_of - datetime.timedelta(days=rng.randint(0, 30))
+            medications.append(
+                (drug, dosage, frequency, 1, _date(started), _date(updated))
+            )
+    if rng.random() < 0.3:
+        drug, dosage, frequency = rng.choice(
+            [med for meds in CONDITIONS.values() for med in meds[2]]
+        )
+        started = as_of - datetime.timedelta(days=rng.randint(400, 365 * 10))
+        medications.append((drug, dosage, frequency, 0, _date(started), _date(started)))
+    rows["medications"] = [
+        (patient_id, seq, *medication) for seq, medication in enumerate(medications)
+    ]
+
+    abnormal = {test for name in conditions for test in CONDITIONS[name][3]}
+    tests = sorted(abnormal.union(ROUTINE_LABS))
+    labs = []
+    for days_ago in sorted(rng.sample(range(1, 365), 2), reverse=True):
+        date = _date(as_of - datetime.timedelta(days=days_ago))
+        for test in tests:
+            unit, reference, mean, sd, abnormal_mean, decimals = LAB_TESTS[test]
+            center = abnormal_mean if test in abnormal else mean
+            value = round(max(0.0, rng.gauss(center, sd)), decimals)
+            labs.append((test, value, unit, reference, date))
+    rows["labs"] = [(patient_id, seq, *lab) for seq, lab in enumerate(labs)]
+
+    rows["procedures"] = [
+        (
+            patient_id,
+            seq,
+            name,
+            _date(as_of - datetime.timedelta(days=rng.randint(1, 365 * 5))),
+            performed_by,
+        )
+        for seq, (name, performed_by) in enumerate(
+            rng.sample(PROCEDURES, rng.choices((0, 1, 2, 3), (30, 40, 20, 10))[0])
+        )
+    ]
+    rows["allergies"] = [
+        (patient_id, seq, *allergy)
+        for seq, allergy in enumerate(
+            rng.sample(ALLERGIES, rng.choices((0, 1, 2), (60, 30, 10))[0])
+        )
+    ]
+
+    departments = [CONDITIONS[name][1] for name in conditions] or ["General Medicine"]
+    appointments = []
+    for _ in range(rng.randint(2, 6)):
+        offset = rng.randint(-365, 60)
+        if offset > 0:
+            status = "scheduled"
+        else:
+            status = rng.choices(("completed", "missed", "cancelled"), (80, 12, 8))[0]
+        department = rng.choice(departments)
+        appointments.append(
+            (
+                _date(as_of + datetime.timedelta(days=offset)),
+                department,
+                rng.choice(DOCTORS[department]),
+                status,
+                APPOINTMENT_COST_USD[status] * (1 + rng.random()),
+            )
+        )
+    appointments.sort()
+    rows["appointments"] = [
+        (patient_id, seq, date, department, doctor, status, round(cost, 2))
+        for seq, (date, department, doctor, status, cost) in enumerate(appointments)
+    ]
+
+    hypertensive = "Hypertension" in conditions
+    weight = max(16.0, rng.gauss(25, 4)) * (height / 100) ** 2
+    vitals_days = sorted(rng.sample(range(0, 180), 3), reverse=True)
+    rows["vitals"] = [
+        (
+            patient_id,
+            seq,
+            _date(as_of - datetime.timedelta(days=days_ago)),
+            int(rng.gauss(142 if hypertensive else 118, 10)),
+            int(rng.gauss(90 if hypertensive else 77, 7)),
+            int(rng.gauss(76, 9)),
+            round(rng.gauss(98.4, 0.4), 1),
+            min(100, int(rng.gauss(97.5, 1.2))),
+            round(weight + rng.gauss(0, 0.8), 1),
+        )
+        for seq, days_ago in enumerate(vitals_days)
+    ]
+
+    restrictions = []
+    if "Type 2 Diabetes Mellitus" in conditions:
+        restrictions.append("No sugar")
+    if hypertensive or "Chronic Kidney Disease" in conditions:
+        restrictions.append("Low salt")
+    if "Hyperlipidemia" in conditions:
+        restrictions.append("Low saturated fat")
+    carbs = rng.choice((45, 50, 55))
+    proteins = rng.choice((20, 25, 30))
+    rows["diets"] = [
+        (
+            patient_id,
+            *rng.choice(DIETS),
+            rng.choice((1600, 1800, 2000, 2200)),
+            carbs,
+            proteins,
+            100 - carbs - proteins,
+            ", ".join(restrictions),
+        )
+    ]
+    return rows
+
+
+def generate(
+    db_file: str,
+    patients: int,
+    seed: int = 0,
+    as_of: Optional[datetime.date] = None,
+    progress: bool = False,
+) -> None:
+    """
+    Write a synthetic population of `patients` patients to `db_file`. The
+    file is built next to its destination and moved into place when done,
+    so readers never see a partial store.
+    """
+    rng = random.Random(seed)
+    as_of = as_of or datetime.date.today()
+    partial = f"{db_file}.partial"
+    if os.path.exists(partial):
+        os.remove(partial)
+    conn = sqlite3.connect(partial)
+    try:
+        # Nothing to protect until the file is complete
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        create_schema(conn)
+        start = time.perf_counter()
+        for batch_start in range(0, patients, BATCH_PATIENTS):
+            tables: Dict[str, list] = {}
+            for i in range(batch_start, min(batch_start + BATCH_PATIENTS, patients)):
+                for table, rows in _patient(rng, i, as_of).items():
+                    tables.setdefault(table, []).extend(rows)
+            for table, rows in tables.items():
+                if not rows:
+                    # A small batch may have no allergies, procedures, ...
+                    continue
+                placeholders = ", ".join("?" * len(rows[0]))
+                conn.executemany(f"INSERT INTO {table} VALUES ({placeholders})", rows)
+            conn.commit()
+            if progress:
+                done = min(batch_start + BATCH_PATIENTS, patients)
+                print(
+                    f"{done}/{patients} patients in {time.perf_counter() - start:.1f}s",
+                    file=sys.stderr,
+                )
+        for statement in INDEXES:
+            conn.execute(statement)
+        conn.execute("ANALYZE")
+        conn.commit()
+    except BaseException:
+        conn.close()
+        os.remove(partial)
+        raise
+    conn.close()
+    os.replace(partial, db_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--patients", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="clinical.db")
+    args = parser.parse_args()
+    generate(args.output, args.patients, seed=args.seed, progress=True)
+
+
+if __name__ == "__main__":
+    main()
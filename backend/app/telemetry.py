@@ -0,0 +1,77 @@
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from opentelemetry import trace
+
+logger = logging.getLogger(__name__)
+
+# none | file | otlp | console. Strands emits its graph, agent, model and tool
+# spans into the same provider, nested under ours.
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none").lower()
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+
+# Resolves to the real provider once setup_tracing() has run
+tracer = trace.get_tracer("workflow-orchestrator")
+
+_setup_lock = threading.Lock()
+_configured = False
+
+# Workflow of the run executing in the current context, for metric labels
+_workflow_id: ContextVar[str] = ContextVar("telemetry_workflow_id", default="")
+
+
+def setup_tracing(exporter: str = TRACING_EXPORTER) -> None:
+    """Install the global tracer provider and exporter once per process."""
+    global _configured
+    if exporter == "none":
+        return
+    with _setup_lock:
+        if _configured:
+            return
+        # The SDK and Strands load only when tracing is on
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from strands.telemetry import StrandsTelemetry
+
+        from .trace_export import JsonLinesSpanExporter
+
+        telemetry = StrandsTelemetry()
+        if exporter == "file":
+            telemetry.tracer_provider.add_span_processor(
+                BatchSpanProcessor(JsonLinesSpanExporter(TRACE_FILE))
+            )
+        elif exporter == "console":
+            telemetry.setup_console_exporter()
+        elif exporter == "otlp":
+            try:
+                telemetry.setup_otlp_exporter()
+            except ImportError:
+                logger.error(
+                    "TRACING_EXPORTER=otlp needs opentelemetry-exporter-otlp-proto-http"
+                )
+        else:
+            raise ValueError(f"Unknown TRACING_EXPORTER '{exporter}'")
+        _configured = True
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[trace.Span]:
+    """Child span of whatever span is current; a no-op when tracing is off."""
+    with tracer.start_as_current_span(name, attributes=attributes) as current:
+        yield current
+
+
+@contextmanager
+def workflow_context(workflow_id: str) -> Iterator[None]:
+    token = _workflow_id.set(workflow_id)
+    try:
+        yield
+    finally:
+        _workflow_id.reset(token)
+
+
+def current_workflow_id() -> str:
+    return _workflow_id.get()
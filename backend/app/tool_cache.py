@@ -0,0 +1,146 @@
+import copy
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+TOOL_CACHE_ENABLED = os.getenv("TOOL_CACHE_ENABLED", "true").lower() == "true"
+TOOL_CACHE_MAX_ENTRIES = int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "10000"))
+TOOL_CACHE_DEFAULT_TTL = float(os.getenv("TOOL_CACHE_DEFAULT_TTL", "300"))
+
+# Results of run-scoped tools, shared by every node of the current run only
+_run_results: ContextVar[Optional[Dict[Tuple[str, str], Any]]] = ContextVar(
+    "tool_cache_run_results", default=None
+)
+
+
+def _arguments_key(signature: inspect.Signature, args: tuple, kwargs: dict) -> str:
+    """Same arguments give the same key, however they were passed."""
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return json.dumps(bound.arguments, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class ToolResultCache:
+    """
+    Memoizes tool functions by tool name and canonicalized arguments.
+
+    Tools cached with scope="shared" live in a process-wide LRU, each entry
+    expiring after its tool's TTL, so nodes and later runs asking for the
+    same patient reuse one result. Tools with scope="run" (live operational
+    data, free-form queries) are only reused between nodes of the same run,
+    inside `run_scope()`, and are not cached at all outside one.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = TOOL_CACHE_MAX_ENTRIES,
+        enabled: bool = TOOL_CACHE_ENABLED,
+    ):
+        self._max_entries = max_entries
+        self.enabled = enabled
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self.evictions = 0
+
+    def memoize(self, ttl: Optional[float] = None, scope: str = "shared") -> Callable:
+        """Decorator for a tool function; apply it beneath @tool."""
+        if scope not in ("shared", "run"):
+            raise ValueError(f"Unknown tool cache scope '{scope}'")
+        ttl = TOOL_CACHE_DEFAULT_TTL if ttl is None else ttl
+
+        def decorator(func: Callable) -> Callable:
+            name = func.__name__
+            signature = inspect.signature(func)
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                key = (name, _arguments_key(signature, args, kwargs))
+                if scope == "run":
+                    return self._call_run_scoped(key, func, args, kwargs)
+                return self._call_shared(key, ttl, func, args, kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def _call_shared(self, key, ttl: float, func: Callable, args, kwargs) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._count(key[0], "hits")
+                return copy.deepcopy(entry[1])
+            if entry:
+                del self._entries[key]
+                self._count(key[0], "expired")
+            self._count(key[0], "misses")
+
+        result = func(*args, **kwargs)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def _call_run_scoped(self, key, func: Callable, args, kwargs) -> Any:
+        results = _run_results.get()
+        if results is None:
+            return func(*args, **kwargs)
+        if key in results:
+            with self._lock:
+                self._count(key[0], "hits")
+            return copy.deepcopy(results[key])
+        with self._lock:
+            self._count(key[0], "misses")
+        result = func(*args, **kwargs)
+        results[key] = copy.deepcopy(result)
+        return result
+
+    def _count(self, tool_name: str, outcome: str) -> None:
+        counts = self._counts.setdefault(tool_name, {"hits": 0, "misses": 0, "expired": 0})
+        counts[outcome] += 1
+
+    @contextmanager
+    def run_scope(self) -> Iterator[None]:
+        """Share run-scoped tool results between the nodes of one run."""
+        token = _run_results.set({})
+        try:
+            yield
+        finally:
+            _run_results.reset(token)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = sum(counts["hits"] for counts in self._counts.values())
+            misses = sum(counts["misses"] for counts in self._counts.values())
+            lookups = hits + misses
+            return {
+                "enabled": self.enabled,
+                "hits": hits,
+                "misses": misses,
+                "evictions": self.evictions,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "tools": {name: dict(counts) for name, counts in self._counts.items()},
+            }
+
+
+tool_cache = ToolResultCache()
+cached = tool_cache.memoize
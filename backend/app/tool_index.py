@@ -0,0 +1,108 @@
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Clinical shorthand users type that never appears in tool descriptions
+_SYNONYMS = {
+    "med": "medication",
+    "meds": "medication",
+    "rx": "medication",
+    "bp": "vital",
+    "labs": "lab",
+    "dx": "condition",
+    "diagnosis": "condition",
+    "appt": "appointment",
+}
+
+
+def _stem(word: str) -> str:
+    if word in _SYNONYMS:
+        return _SYNONYMS[word]
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    # Underscores split too, so tool_name parts become searchable words
+    return [_stem(word) for word in _WORD.findall(text.lower().replace("_", " "))]
+
+
+def flatten_registry(registry: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """One entry per tool, tagged with its registry category."""
+    return [
+        {**tool, "category": category}
+        for category, tools in registry["tools"].items()
+        for tool in tools
+    ]
+
+
+class ToolIndex:
+    """
+    In-memory BM25 index over the tool registry (name, description, inputs,
+    output and category). Scoring a query is a dictionary walk over its
+    terms, so it stays fast for registries of thousands of tools.
+    """
+
+    def __init__(self, tools: List[Dict[str, Any]], k1: float = 1.5, b: float = 0.75):
+        self.tools = tools
+        self._k1 = k1
+        self._b = b
+        self._postings: Dict[str, List[tuple]] = {}
+        lengths = []
+        for position, tool in enumerate(tools):
+            text = " ".join(
+                [
+                    tool["tool_name"],
+                    tool.get("description", ""),
+                    " ".join(tool.get("input", [])),
+                    str(tool.get("output", "")),
+                    tool.get("category", ""),
+                ]
+            )
+            terms = Counter(tokenize(text))
+            lengths.append(sum(terms.values()))
+            for term, freq in terms.items():
+                self._postings.setdefault(term, []).append((position, freq))
+        self._lengths = lengths
+        self._avg_length = sum(lengths) / len(lengths) if lengths else 0.0
+
+    @classmethod
+    def from_registry(cls, registry: Dict[str, Any]) -> "ToolIndex":
+        return cls(flatten_registry(registry))
+
+    def search(self, query: str, k: int) -> List[Dict[str, Any]]:
+        """Top-k tools for the query; ties keep registry order."""
+        n = len(self.tools)
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for position, freq in postings:
+                norm = self._k1 * (
+                    1 - self._b + self._b * self._lengths[position] / self._avg_length
+                )
+                scores[position] = scores.get(position, 0.0) + idf * freq * (
+                    self._k1 + 1
+                ) / (freq + norm)
+
+        ranked = sorted(scores, key=lambda position: (-scores[position], position))
+        return [self.tools[position] for position in ranked[:k]]
+
+
+def render_tool_table(tools: List[Dict[str, Any]]) -> str:
+    """Compact pipe table: one line per tool, column names once."""
+    lines = ["category | tool_name | inputs | description"]
+    for tool in tools:
+        inputs = ", ".join(tool.get("input", [])) or "-"
+        lines.append(
+            f"{tool.get('category', '')} | {tool['tool_name']} | {inputs} | {tool.get('description', '')}"
+        )
+    return "\n".join(lines)
@@ -1,13 +1,20 @@
-import datetime
-import random
+import os
+from typing import List
 
 from strands import tool
 
+from .clinical_store import get_data_source
+from .query_engine import query_engine
+from .tool_cache import cached
 
-def random_date(days=30):
-    return (
-        datetime.datetime.now() - datetime.timedelta(days=random.randint(0, days))
-    ).strftime("%Y-%m-%d")
+# Cache lifetimes: vitals change by the minute, allergies almost never.
+# Live bed/discharge state and free-form queries are only shared within a run.
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# Cohort tools answer for at most this many patients per call
+BULK_MAX_PATIENTS = int(os.getenv("BULK_MAX_PATIENTS", "500"))
 
 
 # ===========================
@@ -19,42 +26,62 @@ def random_date(days=30):
     name="custom_query",
     description="Takes any natural language query as input and provides the desired data as output",
 )
+@cached(scope="run")
 def custom_query(connection_id: str, user_query: str):
     print(
         f"🧩 Invoked custom_query with connection_id={connection_id}, user_query={user_query}"
     )
+    result = query_engine.run(get_data_source(connection_id), user_query)
+    return {"query": user_query, "connection_id": connection_id, **result}
+
+
+def _unknown_patient(patient_id: str, **context):
     return {
-        "query": user_query,
-        "connection_id": connection_id,
-        "rows": [
-            {"patient_id": "P1001", "name": "Arjun Patel", "age": 45, "gender": "Male"},
-            {
-                "patient_id": "P1002",
-                "name": "Meera Sharma",
-                "age": 52,
-                "gender": "Female",
-            },
-        ],
-        "status": "success",
+        **context,
+        "patient_id": patient_id,
+        "error": f"Unknown patient {patient_id}",
     }
 
 
+def _lab_result(lab: dict) -> str:
+    unit = lab["unit"]
+    return f"{lab['value']:g}{unit}" if unit == "%" else f"{lab['value']:g} {unit}"
+
+
+def _upcoming(appointments: list) -> list:
+    return [a for a in appointments if a["status"] == "scheduled"]
+
+
+# condition: (cardiac, diabetes, stroke) risk it adds
+RISK_FACTORS = {
+    "Hypertension": (0.15, 0.05, 0.15),
+    "Hyperlipidemia": (0.1, 0.05, 0.1),
+    "Coronary Artery Disease": (0.35, 0.0, 0.15),
+    "Type 2 Diabetes Mellitus": (0.1, 0.6, 0.1),
+    "Chronic Kidney Disease": (0.1, 0.05, 0.05),
+}
+
+
 @tool(
     name="patient_service",
     description="Patient data management service for retrieving and processing patient information",
 )
+@cached(ttl=HOUR)
 def patient_service(patient_id: str, connection_id: str):
     print(
         f"🧩 Invoked patient_service with patient_id={patient_id}, connection_id={connection_id}"
     )
+    patient = get_data_source(connection_id).patient(patient_id)
+    if patient is None:
+        return _unknown_patient(patient_id)
     return {
         "patient_id": patient_id,
-        "name": "Amit Verma",
-        "dob": "1979-08-15",
-        "gender": "Male",
-        "blood_group": "O+",
-        "contact": {"phone": "+91-9876543210", "email": "amit.verma@example.com"},
-        "status": "active",
+        "name": patient["name"],
+        "dob": patient["dob"],
+        "gender": patient["gender"],
+        "blood_group": patient["blood_group"],
+        "contact": {"phone": patient["phone"], "email": patient["email"]},
+        "status": patient["status"],
     }
 
 
@@ -62,17 +89,22 @@ def patient_service(patient_id: str, connection_id: str):
     name="medication_service",
     description="Medication data management service for handling patient medication records",
 )
+@cached(ttl=15 * MINUTE)
 def medication_service(patient_id: str, connection_id: str):
     print(
         f"🧩 Invoked medication_service with patient_id={patient_id}, connection_id={connection_id}"
     )
+    medications = get_data_source(connection_id).records("medications", patient_id)
+    if medications is None:
+        return _unknown_patient(patient_id)
+    active = [m for m in medications if m["active"]]
     return {
         "patient_id": patient_id,
         "active_medications": [
-            {"drug": "Metformin", "dosage": "500mg", "frequency": "Twice daily"},
-            {"drug": "Amlodipine", "dosage": "5mg", "frequency": "Once daily"},
+            {"drug": m["drug"], "dosage": m["dosage"], "frequency": m["frequency"]}
+            for m in active
         ],
-        "last_updated": random_date(10),
+        "last_updated": max((m["last_updated"] for m in active), default=None),
     }
 
 
@@ -80,15 +112,19 @@ def medication_service(patient_id: str, connection_id: str):
     name="followup_service",
     description="Follow-up appointment management service for scheduling and tracking patient follow-ups",
 )
+@cached(ttl=15 * MINUTE)
 def followup_service(patient_id: str, connection_id: str):
+    appointments = get_data_source(connection_id).records("appointments", patient_id)
+    if appointments is None:
+        return _unknown_patient(patient_id)
+    upcoming = _upcoming(appointments)
+    if not upcoming:
+        return {"patient_id": patient_id, "next_followup": None}
     return {
         "patient_id": patient_id,
-        "next_followup": (
-            datetime.datetime.now() + datetime.timedelta(days=14)
-        ).strftime("%Y-%m-%d"),
-        "department": "Cardiology",
-        "doctor": "Dr. Neha Singh",
-        "remarks": "Monitor blood pressure daily and report any dizziness",
+        "next_followup": upcoming[0]["date"],
+        "department": upcoming[0]["department"],
+        "doctor": upcoming[0]["doctor"],
     }
 
 
@@ -96,44 +132,33 @@ def followup_service(patient_id: str, connection_id: str):
     name="condition_service",
     description="Medical condition management service for handling patient medical conditions and diagnoses",
 )
+@cached(ttl=HOUR)
 def condition_service(patient_id: str, connection_id: str):
-    return {
-        "patient_id": patient_id,
-        "diagnoses": [
-            {
-                "condition": "Type 2 Diabetes Mellitus",
-                "diagnosed_on": "2016-05-10",
-                "status": "chronic",
-            },
-            {
-                "condition": "Hypertension",
-                "diagnosed_on": "2018-03-21",
-                "status": "controlled",
-            },
-        ],
-    }
+    conditions = get_data_source(connection_id).records("conditions", patient_id)
+    if conditions is None:
+        return _unknown_patient(patient_id)
+    return {"patient_id": patient_id, "diagnoses": conditions}
 
 
 @tool(
     name="lab_service",
     description="Lab results management service for processing and retrieving laboratory test results",
 )
+@cached(ttl=15 * MINUTE)
 def lab_service(patient_id: str, connection_id: str):
+    labs = get_data_source(connection_id).records("labs", patient_id)
+    if labs is None:
+        return _unknown_patient(patient_id)
     return {
         "patient_id": patient_id,
         "lab_results": [
             {
-                "test": "HbA1c",
-                "result": "6.8%",
-                "reference_range": "< 7%",
-                "date": random_date(15),
-            },
-            {
-                "test": "Cholesterol",
-                "result": "190 mg/dL",
-                "reference_range": "< 200 mg/dL",
-                "date": random_date(10),
-            },
+                "test": lab["test"],
+                "result": _lab_result(lab),
+                "reference_range": lab["reference_range"],
+                "date": lab["date"],
+            }
+            for lab in labs
         ],
     }
 
@@ -142,52 +167,45 @@ def lab_service(patient_id: str, connection_id: str):
     name="procedure_service",
     description="Medical procedure management service for handling patient medical procedures",
 )
+@cached(ttl=HOUR)
 def procedure_service(patient_id: str, connection_id: str):
-    return {
-        "patient_id": patient_id,
-        "procedures": [
-            {
-                "name": "Angioplasty",
-                "date": "2021-09-10",
-                "performed_by": "Dr. Rajesh Mehta",
-            },
-            {"name": "ECG", "date": random_date(3), "performed_by": "Technician Ankit"},
-        ],
-    }
+    procedures = get_data_source(connection_id).records("procedures", patient_id)
+    if procedures is None:
+        return _unknown_patient(patient_id)
+    return {"patient_id": patient_id, "procedures": procedures}
 
 
 @tool(
     name="allergy_service",
     description="Allergy information management service for tracking patient allergies and reactions",
 )
+@cached(ttl=DAY)
 def allergy_service(patient_id: str, connection_id: str):
-    return {
-        "patient_id": patient_id,
-        "allergies": [
-            {"substance": "Penicillin", "reaction": "Rash", "severity": "Mild"},
-            {"substance": "Peanuts", "reaction": "Anaphylaxis", "severity": "Severe"},
-        ],
-    }
+    allergies = get_data_source(connection_id).records("allergies", patient_id)
+    if allergies is None:
+        return _unknown_patient(patient_id)
+    return {"patient_id": patient_id, "allergies": allergies}
 
 
 @tool(
     name="appointment_service",
     description="Appointment scheduling service for managing patient appointments",
 )
+@cached(ttl=15 * MINUTE)
 def appointment_service(patient_id: str, connection_id: str):
+    appointments = get_data_source(connection_id).records("appointments", patient_id)
+    if appointments is None:
+        return _unknown_patient(patient_id)
     return {
         "patient_id": patient_id,
         "appointments": [
             {
-                "date": random_date(-5),
-                "doctor": "Dr. Alok Bansal",
-                "department": "Endocrinology",
-            },
-            {
-                "date": random_date(15),
-                "doctor": "Dr. Neha Singh",
-                "department": "Cardiology",
-            },
+                "date": a["date"],
+                "doctor": a["doctor"],
+                "department": a["department"],
+                "status": a["status"],
+            }
+            for a in appointments
         ],
     }
 
@@ -196,15 +214,20 @@ def appointment_service(patient_id: str, connection_id: str):
     name="diet_service",
     description="Diet and nutrition management service for handling patient dietary information",
 )
+@cached(ttl=HOUR)
 def diet_service(patient_id: str, connection_id: str):
+    diets = get_data_source(connection_id).records("diets", patient_id)
+    if not diets:
+        return _unknown_patient(patient_id)
+    diet = diets[0]
     return {
         "patient_id": patient_id,
         "diet_plan": {
-            "breakfast": "Oats with skimmed milk and almonds",
-            "lunch": "Brown rice, dal, and mixed salad",
-            "dinner": "Vegetable soup and multigrain roti",
+            "breakfast": diet["breakfast"],
+            "lunch": diet["lunch"],
+            "dinner": diet["dinner"],
         },
-        "calories_per_day": 1800,
+        "calories_per_day": diet["calories_per_day"],
     }
 
 
@@ -212,15 +235,153 @@ def diet_service(patient_id: str, connection_id: str):
     name="patient_dashboard_service",
     description="Patient dashboard data service for comprehensive patient overview",
 )
+@cached(ttl=5 * MINUTE)
 def patient_dashboard_service(patient_id: str, connection_id: str):
+    source = get_data_source(connection_id)
+    patient = source.patient(patient_id)
+    if patient is None:
+        return _unknown_patient(patient_id)
+    vitals = source.records("vitals", patient_id)
+    labs = source.records("labs", patient_id)
+    latest = vitals[0] if vitals else None
     return {
         "patient_id": patient_id,
-        "vitals": {"bp": "120/80", "pulse": 78, "bmi": 24.5},
-        "active_conditions": ["Diabetes", "Hypertension"],
-        "last_lab_result_date": random_date(7),
+        "vitals": latest
+        and {
+            "bp": f"{latest['systolic']}/{latest['diastolic']}",
+            "pulse": latest["pulse"],
+            "bmi": round(latest["weight_kg"] / (patient["height_cm"] / 100) ** 2, 1),
+        },
+        "active_conditions": [
+            c["condition"] for c in source.records("conditions", patient_id)
+        ],
+        "last_lab_result_date": labs[0]["date"] if labs else None,
+    }
+
+
+# ===========================
+# 🧩 COHORT TOOLS
+# ===========================
+# One call covers a list of patients with a single store query, so a cohort
+# review takes one model turn instead of one per patient. Results are
+# columnar: column names once, then one array per record.
+
+
+def _cohort(kind, patient_ids, connection_id, columns, rows=None):
+    patient_ids = list(dict.fromkeys(patient_ids))
+    if len(patient_ids) > BULK_MAX_PATIENTS:
+        return {
+            "connection_id": connection_id,
+            "error": f"At most {BULK_MAX_PATIENTS} patients per call, "
+            f"got {len(patient_ids)}",
+        }
+    records, unknown = get_data_source(connection_id).records_many(
+        kind, patient_ids, columns
+    )
+    if rows is not None:
+        records = rows(records)
+    return {
+        "connection_id": connection_id,
+        "patient_count": len(patient_ids) - len(unknown),
+        "columns": ["patient_id", *columns],
+        "rows": [list(record) for record in records],
+        "unknown_patient_ids": unknown,
     }
 
 
+def _latest_per_patient(records):
+    latest = {}
+    for record in records:
+        latest.setdefault(record[0], record)
+    return list(latest.values())
+
+
+@tool(
+    name="bulk_lab_service",
+    description="Lab results for many patients at once, such as a cohort from custom_query",
+)
+@cached(ttl=15 * MINUTE)
+def bulk_lab_service(patient_ids: List[str], connection_id: str):
+    print(
+        f"🧩 Invoked bulk_lab_service with {len(patient_ids)} patients, connection_id={connection_id}"
+    )
+    return _cohort(
+        "labs",
+        patient_ids,
+        connection_id,
+        ("test", "value", "unit", "reference_range", "date"),
+    )
+
+
+@tool(
+    name="bulk_medication_service",
+    description="Medications, active and past, for many patients at once",
+)
+@cached(ttl=15 * MINUTE)
+def bulk_medication_service(patient_ids: List[str], connection_id: str):
+    print(
+        f"🧩 Invoked bulk_medication_service with {len(patient_ids)} patients, connection_id={connection_id}"
+    )
+    return _cohort(
+        "medications",
+        patient_ids,
+        connection_id,
+        ("drug", "dosage", "frequency", "active", "last_updated"),
+    )
+
+
+@tool(
+    name="bulk_vitals_service",
+    description="Latest vital signs for many patients at once",
+)
+@cached(ttl=MINUTE)
+def bulk_vitals_service(patient_ids: List[str], connection_id: str):
+    print(
+        f"🧩 Invoked bulk_vitals_service with {len(patient_ids)} patients, connection_id={connection_id}"
+    )
+    return _cohort(
+        "vitals",
+        patient_ids,
+        connection_id,
+        ("recorded_at", "systolic", "diastolic", "pulse", "temp_f", "spo2"),
+        rows=_latest_per_patient,
+    )
+
+
+@tool(
+    name="bulk_condition_service",
+    description="Medical conditions and diagnoses for many patients at once",
+)
+@cached(ttl=HOUR)
+def bulk_condition_service(patient_ids: List[str], connection_id: str):
+    print(
+        f"🧩 Invoked bulk_condition_service with {len(patient_ids)} patients, connection_id={connection_id}"
+    )
+    return _cohort(
+        "conditions",
+        patient_ids,
+        connection_id,
+        ("condition", "diagnosed_on", "status"),
+    )
+
+
+@tool(
+    name="bulk_allergy_service",
+    description="Allergies and reactions for many patients at once",
+)
+@cached(ttl=DAY)
+def bulk_allergy_service(patient_ids: List[str], connection_id: str):
+    print(
+        f"🧩 Invoked bulk_allergy_service with {len(patient_ids)} patients, connection_id={connection_id}"
+    )
+    return _cohort(
+        "allergies",
+        patient_ids,
+        connection_id,
+        ("substance", "reaction", "severity"),
+    )
+
+
 # ===========================
 # 🧩 EPIC TOOLS
 # ===========================
@@ -230,17 +391,30 @@ def patient_dashboard_service(patient_id: str, connection_id: str):
     name="generate_patient_observ",
     description="Generate Epic patient observation summary with detailed patient information",
 )
+@cached(ttl=5 * MINUTE)
 def generate_patient_observ(patient_id: str, organization: str):
+    source = get_data_source(organization)
+    patient = source.patient(patient_id)
+    if patient is None:
+        return _unknown_patient(patient_id, organization=organization)
+    vitals = source.records("vitals", patient_id)
+    if not vitals:
+        return {
+            "organization": organization,
+            "patient_id": patient_id,
+            "observations": {},
+        }
+    latest = vitals[0]
     return {
         "organization": organization,
         "patient_id": patient_id,
         "observations": {
-            "weight": "72 kg",
-            "height": "175 cm",
-            "blood_pressure": "122/78 mmHg",
-            "temperature": "98.4°F",
+            "weight": f"{latest['weight_kg']} kg",
+            "height": f"{patient['height_cm']} cm",
+            "blood_pressure": f"{latest['systolic']}/{latest['diastolic']} mmHg",
+            "temperature": f"{latest['temp_f']}°F",
         },
-        "observation_date": random_date(5),
+        "observation_date": latest["recorded_at"],
     }
 
 
@@ -248,13 +422,17 @@ def generate_patient_observ(patient_id: str, organization: str):
     name="generate_medication",
     description="Generate Epic medication summary for patient's current and past medications",
 )
+@cached(ttl=15 * MINUTE)
 def generate_medication(patient_id: str, organization: str):
+    medications = get_data_source(organization).records("medications", patient_id)
+    if medications is None:
+        return _unknown_patient(patient_id, organization=organization)
     return {
         "organization": organization,
         "patient_id": patient_id,
-        "current": ["Metformin 500mg", "Amlodipine 5mg"],
-        "past": ["Atorvastatin 10mg"],
-        "last_reviewed": random_date(14),
+        "current": [f"{m['drug']} {m['dosage']}" for m in medications if m["active"]],
+        "past": [f"{m['drug']} {m['dosage']}" for m in medications if not m["active"]],
+        "last_reviewed": max((m["last_updated"] for m in medications), default=None),
     }
 
 
@@ -262,11 +440,16 @@ def generate_medication(patient_id: str, organization: str):
     name="generate_agent_Response_followup",
     description="Generate Epic follow-up appointment summary and recommendations",
 )
+@cached(ttl=15 * MINUTE)
 def generate_agent_Response_followup(patient_id: str, organization: str):
+    appointments = get_data_source(organization).records("appointments", patient_id)
+    if appointments is None:
+        return _unknown_patient(patient_id, organization=organization)
+    upcoming = _upcoming(appointments)
     return {
         "organization": organization,
         "patient_id": patient_id,
-        "next_followup": random_date(-10),
+        "next_followup": upcoming[0]["date"] if upcoming else None,
         "advice": "Continue medication as prescribed, monitor sugar levels, and maintain diet.",
     }
 
@@ -275,12 +458,17 @@ def generate_agent_Response_followup(patient_id: str, organization: str):
     name="generate_condition",
     description="Generate Epic medical condition summary for patient's diagnoses",
 )
+@cached(ttl=HOUR)
 def generate_condition(patient_id: str, organization: str):
+    conditions = get_data_source(organization).records("conditions", patient_id)
+    if conditions is None:
+        return _unknown_patient(patient_id, organization=organization)
+    stable = all(c["status"] in ("controlled", "stable") for c in conditions)
     return {
         "organization": organization,
         "patient_id": patient_id,
-        "conditions": ["Type 2 Diabetes", "Mild Hypertension"],
-        "status": "stable",
+        "conditions": [c["condition"] for c in conditions],
+        "status": "stable" if stable else "needs review",
     }
 
 
@@ -288,16 +476,19 @@ def generate_condition(patient_id: str, organization: str):
     name="generate_lab",
     description="Generate Epic lab results summary with test results and interpretations",
 )
+@cached(ttl=15 * MINUTE)
 def generate_lab(patient_id: str, organization: str):
+    labs = get_data_source(organization).records("labs", patient_id)
+    if labs is None:
+        return _unknown_patient(patient_id, organization=organization)
+    latest = {}
+    for lab in labs:  # newest first
+        latest.setdefault(lab["test"], _lab_result(lab))
     return {
         "organization": organization,
         "patient_id": patient_id,
-        "latest_results": {
-            "HbA1c": "6.5%",
-            "Cholesterol": "180 mg/dL",
-            "Vitamin D": "28 ng/mL",
-        },
-        "date": random_date(5),
+        "latest_results": latest,
+        "date": labs[0]["date"] if labs else None,
     }
 
 
@@ -305,14 +496,15 @@ def generate_lab(patient_id: str, organization: str):
     name="generate_procedure",
     description="Generate Epic medical procedure summary for patient's procedures",
 )
+@cached(ttl=HOUR)
 def generate_procedure(patient_id: str, organization: str):
+    procedures = get_data_source(organization).records("procedures", patient_id)
+    if procedures is None:
+        return _unknown_patient(patient_id, organization=organization)
     return {
         "organization": organization,
         "patient_id": patient_id,
-        "procedures": [
-            {"name": "Echocardiogram", "date": "2023-12-01"},
-            {"name": "ECG", "date": random_date(3)},
-        ],
+        "procedures": [{"name": p["name"], "date": p["date"]} for p in procedures],
     }
 
 
@@ -320,13 +512,16 @@ def generate_procedure(patient_id: str, organization: str):
     name="generate_allergy",
     description="Generate Epic allergy summary for patient's known allergies",
 )
+@cached(ttl=DAY)
 def generate_allergy(patient_id: str, organization: str):
+    allergies = get_data_source(organization).records("allergies", patient_id)
+    if allergies is None:
+        return _unknown_patient(patient_id, organization=organization)
     return {
         "organization": organization,
         "patient_id": patient_id,
         "allergies": [
-            {"allergen": "Dust", "reaction": "Cough"},
-            {"allergen": "Pollen", "reaction": "Sneezing"},
+            {"allergen": a["substance"], "reaction": a["reaction"]} for a in allergies
         ],
     }
 
@@ -335,16 +530,17 @@ def generate_allergy(patient_id: str, organization: str):
     name="generate_agent_Response_upcoming",
     description="Generate Epic upcoming appointment summary and preparation details",
 )
+@cached(ttl=15 * MINUTE)
 def generate_agent_Response_upcoming(patient_id: str, organization: str):
+    appointments = get_data_source(organization).records("appointments", patient_id)
+    if appointments is None:
+        return _unknown_patient(patient_id, organization=organization)
     return {
         "organization": organization,
         "patient_id": patient_id,
         "appointments": [
-            {
-                "date": random_date(-2),
-                "department": "Cardiology",
-                "doctor": "Dr. Alok Bansal",
-            },
+            {"date": a["date"], "department": a["department"], "doctor": a["doctor"]}
+            for a in _upcoming(appointments)
         ],
         "preparation": "Avoid heavy meals before tests.",
     }
@@ -354,11 +550,19 @@ def generate_agent_Response_upcoming(patient_id: str, organization: str):
     name="generate_agent_Response_nutrition",
     description="Generate Epic nutrition summary with dietary recommendations",
 )
+@cached(ttl=HOUR)
 def generate_agent_Response_nutrition(patient_id: str, organization: str):
+    diets = get_data_source(organization).records("diets", patient_id)
+    if not diets:
+        return _unknown_patient(patient_id, organization=organization)
+    restrictions = diets[0]["restrictions"]
     return {
         "organization": organization,
         "patient_id": patient_id,
-        "nutrition_summary": "Balanced diet with reduced sodium and increased fiber.",
+        "nutrition_summary": (
+            f"Balanced diet of {diets[0]['calories_per_day']} kcal per day"
+            + (f"; {restrictions.lower()}." if restrictions else ".")
+        ),
         "recommended_foods": ["Oats", "Broccoli", "Apple"],
     }
 
@@ -367,15 +571,21 @@ def generate_agent_Response_nutrition(patient_id: str, organization: str):
     name="get_diet_data",
     description="Get Epic diet data including nutritional information and dietary restrictions",
 )
+@cached(ttl=HOUR)
 def get_diet_data(patient_id: str, organization: str):
+    diets = get_data_source(organization).records("diets", patient_id)
+    if not diets:
+        return _unknown_patient(patient_id, organization=organization)
+    diet = diets[0]
+    restrictions = diet["restrictions"]
     return {
         "organization": organization,
         "patient_id": patient_id,
         "diet": {
-            "carbs": "50%",
-            "proteins": "25%",
-            "fats": "25%",
-            "restrictions": ["No sugar", "Low salt"],
+            "carbs": f"{diet['carbs_pct']}%",
+            "proteins": f"{diet['proteins_pct']}%",
+            "fats": f"{diet['fats_pct']}%",
+            "restrictions": restrictions.split(", ") if restrictions else [],
         },
     }
 
@@ -384,12 +594,30 @@ def get_diet_data(patient_id: str, organization: str):
     name="riskpanel",
     description="Generate Epic risk assessment panel with health risk analysis",
 )
+@cached(ttl=HOUR)
 def riskpanel(patient_id: str, organization: str):
+    conditions = get_data_source(organization).records("conditions", patient_id)
+    if conditions is None:
+        return _unknown_patient(patient_id, organization=organization)
+    scores = [0.1, 0.1, 0.05]
+    for condition in conditions:
+        for i, weight in enumerate(RISK_FACTORS.get(condition["condition"], (0, 0, 0))):
+            scores[i] = min(0.95, scores[i] + weight)
+    highest = max(scores)
+    if highest >= 0.6:
+        overall = "high"
+    elif highest >= 0.3:
+        overall = "moderate"
+    else:
+        overall = "low"
     return {
         "organization": organization,
         "patient_id": patient_id,
-        "risk_scores": {"cardiac": 0.35, "diabetes": 0.7, "stroke": 0.2},
-        "overall_risk": "moderate",
+        "risk_scores": {
+            name: round(score, 2)
+            for name, score in zip(("cardiac", "diabetes", "stroke"), scores)
+        },
+        "overall_risk": overall,
     }
 
 
@@ -397,10 +625,15 @@ def riskpanel(patient_id: str, organization: str):
     name="aftercare",
     description="Generate Epic aftercare summary with post-treatment care instructions",
 )
+@cached(ttl=HOUR)
 def aftercare(patient_id: str, organization: str):
+    procedures = get_data_source(organization).records("procedures", patient_id)
+    if procedures is None:
+        return _unknown_patient(patient_id, organization=organization)
     return {
         "organization": organization,
         "patient_id": patient_id,
+        "last_procedure": procedures[0] if procedures else None,
         "instructions": [
             "Take medications on time.",
             "Avoid strenuous activity for 7 days.",
@@ -413,12 +646,24 @@ def aftercare(patient_id: str, organization: str):
     name="get_patient_vitals",
     description="Get Epic patient vital signs including heart rate, blood pressure, temperature",
 )
+@cached(ttl=MINUTE)
 def get_patient_vitals(patient_id: str, organization: str):
+    vitals = get_data_source(organization).records("vitals", patient_id)
+    if vitals is None:
+        return _unknown_patient(patient_id, organization=organization)
+    if not vitals:
+        return {"organization": organization, "patient_id": patient_id, "vitals": {}}
+    latest = vitals[0]
     return {
         "organization": organization,
         "patient_id": patient_id,
-        "vitals": {"bp": "118/78 mmHg", "pulse": 76, "temp": "98.6°F", "spo2": "98%"},
-        "recorded_at": random_date(1),
+        "vitals": {
+            "bp": f"{latest['systolic']}/{latest['diastolic']} mmHg",
+            "pulse": latest["pulse"],
+            "temp": f"{latest['temp_f']}°F",
+            "spo2": f"{latest['spo2']}%",
+        },
+        "recorded_at": latest["recorded_at"],
     }
 
 
@@ -429,6 +674,7 @@ from strands import tool
     name="bed_turnaround_service",
     description="Service for retrieving bed turnaround time data by disease category or specific disease",
 )
+@cached(scope="run")
 def bed_turnaround_service():
     """
     Returns static bed turnaround time statistics for diseases.
@@ -481,6 +727,7 @@ def bed_turnaround_service():
     name="bed_availability_service",
     description="Service for checking current bed availability and status by department or disease type",
 )
+@cached(scope="run")
 def bed_availability_service():
     """
     Returns static current bed availability and occupancy data.
@@ -515,6 +762,7 @@ def bed_availability_service():
     name="discharge_workflow_service",
     description="Service for retrieving discharge and bed preparation workflow steps and timings",
 )
+@cached(scope="run")
 def discharge_workflow_service():
     """
     Returns static workflow steps for bed turnaround process.
@@ -571,6 +819,7 @@ def discharge_workflow_service():
     name="turnaround_analytics_service",
     description="Service for analyzing bed turnaround performance metrics and trends over time",
 )
+@cached(scope="run")
 def turnaround_analytics_service():
     """
     Returns static analytics and trends for bed turnaround times.
@@ -628,6 +877,11 @@ available_tools = [
     appointment_service,
     diet_service,
     patient_dashboard_service,
+    bulk_lab_service,
+    bulk_medication_service,
+    bulk_vitals_service,
+    bulk_condition_service,
+    bulk_allergy_service,
     generate_patient_observ,
     generate_medication,
     generate_agent_Response_followup,
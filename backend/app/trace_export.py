@@ -0,0 +1,30 @@
+import json
+import logging
+import threading
+from typing import Sequence
+
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+logger = logging.getLogger(__name__)
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Appends finished spans to a file as one OTLP-style JSON object per line."""
+
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = [json.dumps(json.loads(span.to_json())) for span in spans]
+        try:
+            with self._lock, open(self._path, "a") as file:
+                file.write("\n".join(lines) + "\n")
+        except OSError:
+            logger.exception("Could not write spans to %s", self._path)
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
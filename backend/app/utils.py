@@ -1,186 +1,283 @@
+import base64
 import hashlib
 import json
+import logging
+import os
+import re
 import sqlite3
 import traceback
-from typing import Optional
+from typing import List, Optional, Sequence, Tuple, Union
 import uuid
-from functools import lru_cache
 
 from fastapi import HTTPException
-from strands import Agent
-from strands.multiagent import GraphBuilder
 
-from .models import bedrock_model
+from .architecture import (
+    SCHEMA_VERSION,
+    InvalidArchitectureError,
+    canonical_json,
+    parse_architecture,
+)
+from .conditions import compile_condition, edge_predicate
+from .db import get_connection
+
+logger = logging.getLogger(__name__)
+
+# The architect is asked to end each prompt with "Tools: [a, b]. Output: ..."
+_TOOLS_SEGMENT = re.compile(r"Tools:\s*\[([^\]]*)\]", re.IGNORECASE)
+_NO_TOOLS = {"", "none", "n/a", "na", "-"}
+
+
+def resolve_node_tools(node: dict, available_tools: list) -> list:
+    """
+    Pick the tools a node actually needs, so each model call only carries
+    those tool specs. Uses the node's `tools` list, else the `Tools: [...]`
+    segment of its system prompt. Names the backend does not define are
+    looked up among the MCP gateway's tools, if a gateway is configured.
+    Names found nowhere are dropped with a warning; a node that names only
+    unknown tools gets none rather than every tool.
+    """
+    names = node.get("tools")
+    if names is None:
+        match = _TOOLS_SEGMENT.search(node["agent_system_prompt"])
+        if not match:
+            return available_tools
+        names = match.group(1).split(",")
+
+    names = [str(name).strip().strip("'\"`") for name in names]
+    names = [name for name in names if name.lower() not in _NO_TOOLS]
+    if not names:
+        return []
+
+    tools_by_name = {tool.tool_name: tool for tool in available_tools}
+    scoped = [tools_by_name[name] for name in names if name in tools_by_name]
+    missing = [name for name in names if name not in tools_by_name]
+    if missing and os.getenv("GATEWAY_URL"):
+        # Imported on demand: only workflows that use gateway tools pay for MCP
+        from .mcp_client import gateway_tools
 
-
-DB_FILE = "workflows.db"
+        try:
+            scoped += gateway_tools(missing)
+        except Exception:
+            logger.exception("Could not load gateway tools %s", missing)
+    found = {getattr(tool, "tool_name", None) for tool in scoped}
+    unknown = [name for name in names if name not in found]
+    if unknown:
+        logger.warning("Node %s names unknown tools %s", node["node_id"], unknown)
+    return scoped
 
 
 def json_to_strands_graph(workflow_json, available_tools):
-    builder = GraphBuilder()
+    # Strands (and the model client behind it) load on the first graph build,
+    # not at import, so the API starts without them
+    from strands import Agent
+
+    from .hooks import ProgressHooks, TelemetryHooks, UsageHooks
+    from .models import get_default_model
+    from .scheduler import DagGraphBuilder
+
+    builder = DagGraphBuilder()
     builder.set_execution_timeout(600)  # 10 minute timeout
 
     # 1. Create agents for each node
     nodes = {}
     try:
         for node in workflow_json["nodes"]:
-            print(node)
             agent = Agent(
-                model=bedrock_model,
+                model=get_default_model(),
                 name=node["agent_name"],
                 system_prompt=node["agent_system_prompt"],
-                tools=available_tools,  # Assuming tools are pre-defined
+                tools=resolve_node_tools(node, available_tools),
+                hooks=[
+                    ProgressHooks(node["node_id"]),
+                    TelemetryHooks(node["node_id"]),
+                    UsageHooks(node["node_id"]),
+                ],
             )
             nodes[node["node_id"]] = agent
             builder.add_node(agent, node["node_id"])
 
         # 2. Add standard edges
-        for edge in workflow_json["edges"]:
+        for edge in workflow_json.get("edges", []):
             builder.add_edge(edge["from"], edge["to"])
 
-        # 3. Add conditional edges (if any)
+        # 3. Add conditional edges: one guarded edge per branch. Conditions
+        # compile once here and live on the graph's edges, so routing is a
+        # local evaluation against node outputs with no model call.
         for cond_edge in workflow_json.get("conditional_edges", []):
-            # Assuming cond_edge has 'from', 'to', and 'condition' (a function or logic)
-            # For Strands, you need to define the condition function separately
-            # Here, we just add the edge; you'll need to define the condition logic elsewhere
-            builder.add_conditional_edge(
-                cond_edge["from"],
-                cond_edge["to"],
-                condition=cond_edge["condition"],  # This should be a callable
-            )
+            condition = compile_condition(cond_edge["condition"])
+            branches = cond_edge.get("branches") or [{"to": cond_edge["to"]}]
+            cases = tuple(b["case"] for b in branches if "case" in b)
+            for branch in branches:
+                case = branch.get("case")
+                builder.add_edge(
+                    cond_edge["from"],
+                    branch["to"],
+                    condition=edge_predicate(
+                        condition, case, tuple(c for c in cases if c != case)
+                    ),
+                )
 
         builder.set_entry_point(workflow_json["entry_point"])
 
-
         return builder.build()
     except Exception:
         traceback.print_exc()
 
 
-@lru_cache(maxsize=128)
 def get_workflow_from_db(workflow_id: str) -> dict:
-    """Fetch workflow architecture from database"""
+    """
+    Fetch workflow architecture from database. Canonical rows cost a single
+    parse; the row is read on every call so that every worker sees updates
+    such as a new budget, and each caller gets its own dict.
+    """
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT architecture FROM workflows WHERE id = ?", (workflow_id,)
-        )
-        result = cursor.fetchone()
-        conn.close()
+        with get_connection() as conn:
+            result = conn.execute(
+                "SELECT architecture, schema_version FROM workflows WHERE id = ?",
+                (workflow_id,),
+            ).fetchone()
 
         if not result:
             raise HTTPException(status_code=404, detail="Workflow not found")
 
-        architecture = result[0]
+        architecture, schema_version = result
         try:
-            data = json.loads(architecture)
-            data = json.loads(data)
-            return data
-        except json.JSONDecodeError:
+            if schema_version == SCHEMA_VERSION:
+                return json.loads(architecture)
+            # Legacy row the migration could not normalize
+            return parse_architecture(architecture)
+        except (json.JSONDecodeError, InvalidArchitectureError):
             raise HTTPException(
                 status_code=400, detail="Invalid workflow architecture JSON"
             )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
 def save_workflow(
-    user_id: int, description: str, architecture: str
+    user_id: int, description: str, architecture: Union[str, dict]
 ) -> str:
+    """
+    Validate an architecture (architect text or parsed dict) and store it in
+    canonical form. Raises a 422 if it does not describe a buildable graph.
+    """
+    try:
+        architecture_json = canonical_json(parse_architecture(architecture))
+    except InvalidArchitectureError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid architecture: {e}")
+
     workflow_id = str(uuid.uuid4())
-    architecture_json = json.dumps(architecture)
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO workflows (id, user_id, description, architecture) VALUES (?, ?, ?, ?)",
-            (workflow_id, user_id, description, architecture_json),
-        )
-        conn.commit()
-        conn.close()
+        with get_connection() as conn:
+            conn.execute(
+                "INSERT INTO workflows (id, user_id, description, architecture, schema_version) VALUES (?, ?, ?, ?, ?)",
+                (workflow_id, user_id, description, architecture_json, SCHEMA_VERSION),
+            )
         return workflow_id
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error saving workflow: {str(e)}")
-        return None
-
 
-def list_workflows_for_user(user_id: str):
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
 
-    cursor.execute(
-        """
-        SELECT id, description, architecture, created_at
-        FROM workflows
-        WHERE user_id = ?
-        ORDER BY created_at DESC
-    """,
-        (user_id,),
-    )
-
-    workflows = cursor.fetchall()
+def set_workflow_budget(workflow_id: str, budget: Optional[dict]) -> dict:
+    """
+    Store (or with None, remove) the workflow's run budget and return the
+    updated architecture. Raises a 422 if the budget is invalid.
+    """
+    architecture = get_workflow_from_db(workflow_id)
+    architecture.pop("budget", None)
+    if budget is not None:
+        architecture["budget"] = budget
+    try:
+        architecture_json = canonical_json(parse_architecture(architecture))
+    except InvalidArchitectureError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid budget: {e}")
+
+    with get_connection() as conn:
+        conn.execute(
+            "UPDATE workflows SET architecture = ?, schema_version = ? WHERE id = ?",
+            (architecture_json, SCHEMA_VERSION, workflow_id),
+        )
+    return architecture
 
-    conn.close()
 
-    # Convert the tuples to readable dicts
-    workflow_list = [
-        {
-            "id": row[0],
-            "description": row[1],
-            "architecture": row[2],
-            "created_at": row[3],
-        }
-        for row in workflows
-    ]
+# Columns /workflow/list may project; `architecture` is the only large one.
+# avg_cost_usd is the mean model cost of the workflow's recorded runs.
+WORKFLOW_LIST_FIELDS = (
+    "id",
+    "description",
+    "architecture",
+    "created_at",
+    "avg_cost_usd",
+)
+_LIST_COLUMNS = {
+    "avg_cost_usd": "ROUND(total_cost_usd / NULLIF(costed_runs, 0), 6)",
+}
 
-    return workflow_list
 
+def encode_cursor(created_at: str, workflow_id: str) -> str:
+    raw = json.dumps([created_at, workflow_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
 
-# Initialize Database
-def init_db():
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
 
-    # Users table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-
-    # Workflows table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS workflows (
-            id TEXT PRIMARY KEY,
-            user_id INTEGER NOT NULL,
-            description TEXT NOT NULL,
-            architecture TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        )
-    """)
-
-    # Execution history table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS execution_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            workflow_id TEXT NOT NULL,
-            user_id INTEGER NOT NULL,
-            input TEXT NOT NULL,
-            output TEXT NOT NULL,
-            executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (workflow_id) REFERENCES workflows(id),
-            FOREIGN KEY (user_id) REFERENCES users(id)
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        created_at, workflow_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return created_at, workflow_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def list_workflows_for_user(
+    user_id: str,
+    fields: Sequence[str] = WORKFLOW_LIST_FIELDS,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    List a user's workflows, newest first, with keyset pagination.
+
+    Only the requested `fields` are read, so listings that leave out
+    `architecture` never load the blobs. Pass the returned cursor back to
+    get the next page; it is None on the last page.
+    """
+    unknown = set(fields) - set(WORKFLOW_LIST_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
         )
-    """)
 
-    conn.commit()
-    conn.close()
+    # id and created_at are always read: they form the keyset cursor
+    columns = ["id", "created_at"] + [f for f in fields if f not in ("id", "created_at")]
+    selected = ", ".join(_LIST_COLUMNS.get(column, column) for column in columns)
+    query = f"SELECT {selected} FROM workflows WHERE user_id = ?"
+    params: list = [user_id]
+    if cursor:
+        created_at, workflow_id = decode_cursor(cursor)
+        query += " AND (created_at < ? OR (created_at = ? AND id < ?))"
+        params += [created_at, created_at, workflow_id]
+    query += " ORDER BY created_at DESC, id DESC"
+    if limit:
+        # One extra row tells us whether another page exists
+        query += " LIMIT ?"
+        params.append(limit + 1)
+
+    with get_connection() as conn:
+        rows = conn.execute(query, params).fetchall()
+
+    next_cursor = None
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0])
 
+    # Convert the tuples to readable dicts
+    workflow_list = [
+        {field: value for field, value in zip(columns, row) if field in fields}
+        for row in rows
+    ]
+
+    return workflow_list, next_cursor
 
 
 # ------------------------------
@@ -194,15 +291,12 @@ def hash_password(password: str) -> str:
 # ------------------------------
 def register_user(username: str, password: str) -> tuple[bool, str]:
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
         hashed_pw = hash_password(password)
-        cursor.execute(
-            "INSERT INTO users (username, password) VALUES (?, ?)",
-            (username, hashed_pw),
-        )
-        conn.commit()
-        conn.close()
+        with get_connection() as conn:
+            conn.execute(
+                "INSERT INTO users (username, password) VALUES (?, ?)",
+                (username, hashed_pw),
+            )
         return True, "Registration successful!"
     except sqlite3.IntegrityError:
         return False, "Username already exists"
@@ -211,18 +305,16 @@ def register_user(username: str, password: str) -> tuple[bool, str]:
 
 def login_user(username: str, password: str) -> tuple[bool, Optional[int]]:
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
         hashed_pw = hash_password(password)
-        cursor.execute(
-            "SELECT id FROM users WHERE username = ? AND password = ?",
-            (username, hashed_pw),
-        )
-        result = cursor.fetchone()
-        conn.close()
+        with get_connection() as conn:
+            result = conn.execute(
+                "SELECT id FROM users WHERE username = ? AND password = ?",
+                (username, hashed_pw),
+            ).fetchone()
 
         if result:
             return True, result[0]
         return False, None
-    except Exception as _:
+    except Exception:
+        logger.exception("Login failed for %s", username)
         return False, None
\ No newline at end of file
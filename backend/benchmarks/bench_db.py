@@ -0,0 +1,155 @@
+"""
+Concurrent throughput of the workflow/user queries: one fresh connection
+per call in the default rollback journal (the old behaviour) against the
+pooled WAL connections of app.db.
+
+    cd backend && python -m benchmarks.bench_db --threads 8 --ops 500
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+from app import db
+from app.utils import list_workflows_for_user, login_user, register_user, save_workflow
+
+ARCHITECTURE = json.dumps(
+    {
+        "nodes": [
+            {
+                "node_id": "step_1",
+                "agent_name": "Summarizer",
+                "agent_system_prompt": "Summarize the input. Tools: []. Output: text.",
+            }
+        ],
+        "edges": [],
+        "entry_point": "step_1",
+    }
+)
+
+
+# Connection-per-call versions of the same queries, as they were before app.db
+def legacy_save_workflow(db_file, user_id, description, architecture):
+    conn = sqlite3.connect(db_file, timeout=30)
+    cursor = conn.cursor()
+    cursor.execute(
+        "INSERT INTO workflows (id, user_id, description, architecture) VALUES (?, ?, ?, ?)",
+        (str(uuid.uuid4()), user_id, description, json.dumps(architecture)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def legacy_list_workflows_for_user(db_file, user_id):
+    conn = sqlite3.connect(db_file, timeout=30)
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT id, description, architecture, created_at FROM workflows WHERE user_id = ? ORDER BY created_at DESC",
+        (user_id,),
+    )
+    rows = cursor.fetchall()
+    conn.close()
+    return [
+        {"id": r[0], "description": r[1], "architecture": r[2], "created_at": r[3]}
+        for r in rows
+    ]
+
+
+def legacy_login_user(db_file, username, password):
+    conn = sqlite3.connect(db_file, timeout=30)
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT id FROM users WHERE username = ? AND password = ?",
+        (username, hashlib.sha256(password.encode()).hexdigest()),
+    )
+    row = cursor.fetchone()
+    conn.close()
+    return row
+
+
+def run_concurrently(fn, threads, ops):
+    """Call fn(i) `ops` times from each of `threads` threads; return ops/sec."""
+
+    def worker():
+        for i in range(ops):
+            fn(i)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return threads * ops / (time.perf_counter() - start)
+
+
+def journal_mode(db_file):
+    conn = sqlite3.connect(db_file)
+    try:
+        return conn.execute("PRAGMA journal_mode").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def prepare(db_file, wal):
+    db.configure_db(db_file)
+    db.init_db()
+    register_user("bench", "secret")
+    for i in range(50):
+        save_workflow(1, f"seed {i}", ARCHITECTURE)
+    if not wal:
+        # Pooled connections re-apply the WAL pragma, so switch back only once
+        # they are closed; the legacy queries never open the pool again
+        db.get_pool().close()
+        conn = sqlite3.connect(db_file)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_db = os.path.join(tmp, "legacy.db")
+        pooled_db = os.path.join(tmp, "pooled.db")
+        prepare(legacy_db, wal=False)
+        prepare(pooled_db, wal=True)
+        for db_file, expected in ((legacy_db, "delete"), (pooled_db, "wal")):
+            mode = journal_mode(db_file)
+            assert mode == expected, f"{db_file} is in {mode} mode, not {expected}"
+
+        cases = {
+            "save_workflow": (
+                lambda i: legacy_save_workflow(legacy_db, 1, f"wf {i}", ARCHITECTURE),
+                lambda i: save_workflow(1, f"wf {i}", ARCHITECTURE),
+            ),
+            "list_workflows_for_user": (
+                lambda i: legacy_list_workflows_for_user(legacy_db, 1),
+                lambda i: list_workflows_for_user(1)[0],
+            ),
+            "login_user": (
+                lambda i: legacy_login_user(legacy_db, "bench", "secret"),
+                lambda i: login_user("bench", "secret"),
+            ),
+        }
+
+        print(f"{'query':<26}{'legacy ops/s':>14}{'pooled ops/s':>14}{'speedup':>10}")
+        for name, (legacy, pooled) in cases.items():
+            legacy_rate = run_concurrently(legacy, args.threads, args.ops)
+            pooled_rate = run_concurrently(pooled, args.threads, args.ops)
+            print(
+                f"{name:<26}{legacy_rate:>14.0f}{pooled_rate:>14.0f}{pooled_rate / legacy_rate:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Planner system prompt size as the tool registry grows, embedding the whole
+registry (before) against the top-k ranked tool table (after).
+
+The real registry is padded with synthetic MCP-style tools to each size.
+
+    cd backend && python -m benchmarks.bench_planner_prompt --sizes 28 100 500 2000
+"""
+
+import argparse
+import copy
+import time
+
+from app.prompts import PLANNER_TOOL_TOP_K, load_registry, planner_prompt
+from app.tool_index import ToolIndex, flatten_registry
+
+CHARS_PER_TOKEN = 4  # rough average for JSON with English descriptions
+
+QUERIES = [
+    "Summarize a patient's active medications and allergies",
+    "Check recent labs and vitals and flag abnormal results",
+    "Find beds waiting for cleaning and estimate turnaround",
+]
+
+SYNTHETIC_DOMAINS = [
+    ("billing", "invoice", "Retrieve billing invoices and payment status for an account"),
+    ("imaging", "study", "Fetch radiology imaging studies and report text"),
+    ("scheduling", "slot", "List open scheduling slots for a provider"),
+    ("pharmacy", "order", "Look up pharmacy dispense orders and refill dates"),
+    ("staffing", "shift", "Return nurse staffing shifts for a unit"),
+]
+
+
+def padded_registry(size: int) -> dict:
+    registry = copy.deepcopy(load_registry())
+    missing = size - len(flatten_registry(registry))
+    mcp = registry["tools"].setdefault("MCP_Tools", [])
+    for i in range(max(missing, 0)):
+        domain, noun, description = SYNTHETIC_DOMAINS[i % len(SYNTHETIC_DOMAINS)]
+        mcp.append(
+            {
+                "tool_name": f"{domain}_{noun}_tool_{i}",
+                "description": f"{description} (variant {i})",
+                "input": [f"{noun}_id", "date_range"],
+                "output": f"{noun}_records",
+            }
+        )
+    return registry
+
+
+def full_registry_prompt(registry: dict) -> str:
+    # What planner_prompt() produced before the tool index
+    template = planner_prompt("", top_k=0, index=ToolIndex([]))
+    return template + f"\n# {registry}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[28, 100, 500, 2000])
+    parser.add_argument("--top-k", type=int, default=PLANNER_TOOL_TOP_K)
+    args = parser.parse_args()
+
+    print(f"{'tools':>7}{'before':>10}{'after':>10}{'build ms':>10}{'search ms':>11}")
+    for size in args.sizes:
+        registry = padded_registry(size)
+        start = time.perf_counter()
+        index = ToolIndex.from_registry(registry)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        before = len(full_registry_prompt(registry)) // CHARS_PER_TOKEN
+        start = time.perf_counter()
+        after = max(
+            len(planner_prompt(query, top_k=args.top_k, index=index))
+            for query in QUERIES
+        ) // CHARS_PER_TOKEN
+        search_ms = (time.perf_counter() - start) * 1000 / len(QUERIES)
+        print(
+            f"{len(index.tools):>7}{before:>10}{after:>10}{build_ms:>10.1f}{search_ms:>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
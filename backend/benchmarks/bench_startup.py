@@ -0,0 +1,175 @@
+"""
+Cold-start cost of the API server: each sample is a fresh interpreter that
+imports `main`, runs the app's startup, and serves its first requests.
+
+Cases:
+  startup/import          import main
+  startup/lifespan        app startup (database init, job recovery)
+  startup/first_request   first GET /workflow/cache/stats, a light endpoint
+  startup/first_execute   first GET /workflow/execute, which builds the graph
+
+Runs against a temporary database and the offline model with no simulated
+latency, so the numbers are import and construction time only.
+
+    cd backend && python -m benchmarks.bench_startup --runs 10 --output startup.json
+    cd backend && python -m benchmarks.bench_startup --no-prewarm --baseline startup.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+CASES = ("import", "lifespan", "first_request", "first_execute")
+
+
+def child(workflow_id: str) -> None:
+    """One cold start; prints its timings in seconds as a JSON line."""
+    timings = {}
+    start = time.perf_counter()
+    import main
+
+    timings["import"] = time.perf_counter() - start
+
+    from fastapi.testclient import TestClient
+
+    client = TestClient(main.app)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        client.__enter__()
+        timings["lifespan"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        client.get("/workflow/cache/stats").raise_for_status()
+        timings["first_request"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        client.get(
+            "/workflow/execute",
+            params={"workflow_id": workflow_id, "input": "Review patient P1000"},
+        ).raise_for_status()
+        timings["first_execute"] = time.perf_counter() - start
+        client.__exit__(None, None, None)
+    print(json.dumps(timings))
+
+
+def seed_workflow(db_file: str, clinical_db_file: str) -> str:
+    os.environ.setdefault("MODEL_PROVIDER", "offline")
+    from app import db
+    from app.synthetic_data import generate
+    from app.utils import save_workflow
+
+    from .fixtures import clinical_architecture
+
+    generate(clinical_db_file, 1000)
+    db.configure_db(db_file)
+    db.init_db()
+    with db.get_connection() as conn:
+        user_id = conn.execute(
+            "INSERT INTO users (username, password) VALUES (?, ?)",
+            (f"bench_start_{uuid.uuid4().hex[:6]}", "x"),
+        ).lastrowid
+    return save_workflow(user_id, "bench startup", clinical_architecture(5, fan_out=True))
+
+
+def cold_start(env: dict, workflow_id: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child", workflow_id],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def sample_cold_starts(args: argparse.Namespace, workdir: str) -> dict:
+    db_file = os.path.join(workdir, "bench.db")
+    clinical_db_file = os.path.join(workdir, "clinical.db")
+    workflow_id = seed_workflow(db_file, clinical_db_file)
+    env = {
+        **os.environ,
+        "MODEL_PROVIDER": "offline",
+        "OFFLINE_MODEL_LATENCY_MS": "0",
+        "OFFLINE_MODEL_LATENCY_JITTER_MS": "0",
+        "OFFLINE_MODEL_TOKENS_PER_SEC": "0",
+        "WORKFLOW_DB_FILE": db_file,
+        "CLINICAL_DB_FILE": clinical_db_file,
+        "TRACING_EXPORTER": "none",
+        "STARTUP_PREWARM": "false" if args.no_prewarm else "true",
+    }
+
+    samples = {case: [] for case in CASES}
+    for run in range(args.runs):
+        timings = cold_start(env, workflow_id)
+        for case in CASES:
+            samples[case].append(timings[case])
+        print(
+            f"run {run + 1}/{args.runs}: import {timings['import'] * 1000:.0f}ms",
+            file=sys.stderr,
+        )
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--no-prewarm", action="store_true", help="run with STARTUP_PREWARM=false"
+    )
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--child", metavar="WORKFLOW_ID", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+
+    from .suite import compare, summarize
+
+    workdir = tempfile.mkdtemp(prefix="workflow-bench-")
+    try:
+        samples = sample_cold_starts(args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    results = {f"startup/{case}": summarize(samples[case]) for case in CASES}
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "model_provider": "offline",
+            "runs": args.runs,
+            "prewarm": not args.no_prewarm,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\nRegressed beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Tool-spec payload carried by every model call, per node, with all tools
+registered on every agent (before) and with per-node scoping (after).
+
+    cd backend && python -m benchmarks.bench_tool_scoping --nodes 5
+"""
+
+import argparse
+import json
+
+from app.tools import available_tools
+from app.utils import resolve_node_tools
+
+from .fixtures import clinical_architecture
+
+CHARS_PER_TOKEN = 4  # rough average for JSON with English descriptions
+
+
+def spec_tokens(tools: list) -> int:
+    payload = json.dumps([{"toolSpec": tool.tool_spec} for tool in tools])
+    return len(payload) // CHARS_PER_TOKEN
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, default=5)
+    args = parser.parse_args()
+
+    architecture = clinical_architecture(args.nodes)
+    full = spec_tokens(available_tools)
+
+    print(f"{'node':<14}{'tools':>7}{'before':>10}{'after':>10}")
+    total_before = total_after = 0
+    for node in architecture["nodes"]:
+        scoped = resolve_node_tools(node, available_tools)
+        after = spec_tokens(scoped) if scoped else 0
+        total_before += full
+        total_after += after
+        print(f"{node['node_id']:<14}{len(scoped):>7}{full:>10}{after:>10}")
+
+    saved = 1 - total_after / total_before
+    print(
+        f"{'all nodes':<14}{'':>7}{total_before:>10}{total_after:>10}"
+        f"   ~{saved:.0%} fewer tool-spec input tokens"
+    )
+
+
+if __name__ == "__main__":
+    main()
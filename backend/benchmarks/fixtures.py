@@ -0,0 +1,65 @@
+"""Realistic architectures for benchmarks, shaped like the architect's output."""
+
+from typing import Any, Dict, List
+
+# (agent name, task, tools) for the kinds of steps the architect produces
+STEP_TEMPLATES = [
+    ("PatientLookupAgent", "Retrieve patient demographics", ["patient_service"]),
+    ("LabReviewAgent", "Retrieve and interpret recent lab results", ["lab_service", "generate_lab"]),
+    ("MedicationAgent", "Retrieve active medications", ["medication_service"]),
+    ("AllergyAgent", "Retrieve known allergies", ["allergy_service", "generate_allergy"]),
+    ("VitalsAgent", "Retrieve the latest vital signs", ["get_patient_vitals"]),
+    ("ConditionAgent", "Summarize active diagnoses", ["condition_service"]),
+    ("RiskAgent", "Assess cardiac and diabetes risk", ["riskpanel"]),
+    ("FollowupAgent", "Plan follow-up appointments", ["followup_service", "appointment_service"]),
+]
+
+
+def clinical_architecture(n_nodes: int = 5, fan_out: bool = False) -> Dict[str, Any]:
+    """
+    Build an n-node architecture ending in a tool-less final_result node.
+    Sequential by default; with fan_out every middle node depends only on
+    the first node and feeds final_result directly.
+    """
+    nodes: List[Dict[str, Any]] = []
+    for i in range(n_nodes - 1):
+        name, task, tools = STEP_TEMPLATES[i % len(STEP_TEMPLATES)]
+        nodes.append(
+            {
+                "node_id": f"step_{i + 1}",
+                "agent_name": f"{name}{i + 1}",
+                "agent_system_prompt": (
+                    f"{task} for the patient in the input. "
+                    f"Tools: [{', '.join(tools)}]. Output: JSON summary."
+                ),
+                "tools": tools,
+            }
+        )
+    nodes.append(
+        {
+            "node_id": "final_result",
+            "agent_name": "ReportAgent",
+            "agent_system_prompt": "Compile the inputs into a clinical summary. Tools: []. Output: markdown report.",
+            "tools": [],
+        }
+    )
+
+    ids = [node["node_id"] for node in nodes]
+    if fan_out and n_nodes > 2:
+        edges = [(ids[0], node_id) for node_id in ids[1:-1]]
+        edges += [(node_id, ids[-1]) for node_id in ids[1:-1]]
+    else:
+        edges = list(zip(ids, ids[1:]))
+
+    return {
+        "workflow_name": f"clinical_review_{n_nodes}",
+        "description": "Benchmark fixture",
+        "graph_type": "sequential",
+        "nodes": nodes,
+        "edges": [
+            {"id": f"edge_{i + 1}", "from": a, "to": b} for i, (a, b) in enumerate(edges)
+        ],
+        "conditional_edges": [],
+        "entry_point": ids[0],
+        "exit_point": "final_result",
+    }
@@ -0,0 +1,388 @@
+"""
+Offline benchmark suite for the orchestration hot paths, with JSON results
+(p50/p95/p99 per case) and a regression check against a saved baseline.
+
+Cases:
+  graph_build/<n>        json_to_strands_graph for 5, 20 and 100 node architectures
+  db/<rows>/get          get_workflow_from_db on a table of <rows> workflows
+  db/<rows>/list         list_workflows_for_user, first page and a cursor page
+  save/<threads>         save_workflow with <threads> concurrent writers
+  clinical/<kind>        clinical store lookup of one random patient's records
+  clinical/tool          lab_service (uncached) through the clinical store
+  clinical/custom_query  custom_query (uncached) answered from a cached query plan
+  clinical/bulk_tool     bulk_lab_service (uncached) for 100 random patients
+  execute                GET /workflow/execute through the FastAPI test client
+
+Everything runs against a temporary database and the offline model, so no
+network or AWS credentials are needed.
+
+    cd backend && python -m benchmarks.suite --output bench.json
+    cd backend && python -m benchmarks.suite --rows 10000 1000000 --baseline bench.json
+
+Exits non-zero when a case's p50 or p95 is slower than the baseline by more
+than --threshold (default 20%).
+"""
+
+import os
+
+# Must be set before app modules build the shared model
+os.environ.setdefault("MODEL_PROVIDER", "offline")
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List
+
+from app import db
+from app.architecture import SCHEMA_VERSION, canonical_json
+from app.clinical_store import RECORD_ORDER, configure_data_source, get_data_source
+from app.graph_cache import graph_cache
+from app.synthetic_data import generate
+from app.tool_cache import tool_cache
+from app.tools import available_tools, bulk_lab_service, custom_query, lab_service
+from app.utils import (
+    get_workflow_from_db,
+    json_to_strands_graph,
+    list_workflows_for_user,
+    save_workflow,
+)
+
+from .fixtures import clinical_architecture
+
+ROWS_PER_USER = 1000  # list cost then depends on table size, not page contents
+
+_INSERT_WORKFLOW = """
+    INSERT INTO workflows
+        (id, user_id, description, architecture, schema_version, created_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[float], elapsed: float = None) -> Dict[str, float]:
+    """Latency percentiles in milliseconds, plus throughput."""
+    ms = [s * 1000 for s in samples]
+    return {
+        "n": len(ms),
+        "p50_ms": round(percentile(ms, 50), 4),
+        "p95_ms": round(percentile(ms, 95), 4),
+        "p99_ms": round(percentile(ms, 99), 4),
+        "mean_ms": round(sum(ms) / len(ms), 4),
+        "ops_per_sec": round(len(ms) / (elapsed if elapsed else sum(samples)), 2),
+    }
+
+
+def measure(fn: Callable[[int], object], iterations: int, warmup: int = 3) -> List[float]:
+    for i in range(warmup):
+        fn(i)
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+@contextlib.contextmanager
+def quiet():
+    # Graph building and the stub tools print on every call
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def bench_graph_build(iterations: int) -> Dict[str, dict]:
+    results = {}
+    for n_nodes in (5, 20, 100):
+        architecture = clinical_architecture(n_nodes, fan_out=n_nodes > 5)
+
+        def build(_: int) -> None:
+            if json_to_strands_graph(architecture, available_tools) is None:
+                raise RuntimeError(f"Could not build the {n_nodes} node fixture")
+
+        with quiet():
+            samples = measure(build, max(5, iterations // max(1, n_nodes // 5)))
+        results[f"graph_build/{n_nodes}"] = summarize(samples)
+    return results
+
+
+def seed_workflows(rows: int) -> List[int]:
+    """Insert `rows` workflows spread over users of ROWS_PER_USER each."""
+    architecture = canonical_json(clinical_architecture(3))
+    n_users = max(1, rows // ROWS_PER_USER)
+    with db.get_connection() as conn:
+        user_ids = []
+        for i in range(n_users):
+            cursor = conn.execute(
+                "INSERT INTO users (username, password) VALUES (?, ?)",
+                (f"bench_{rows}_{i}_{uuid.uuid4().hex[:6]}", "x"),
+            )
+            user_ids.append(cursor.lastrowid)
+        base = time.time() - rows
+        batch = []
+        for i in range(rows):
+            batch.append(
+                (
+                    str(uuid.uuid4()),
+                    user_ids[i % n_users],
+                    f"Workflow {i}",
+                    architecture,
+                    SCHEMA_VERSION,
+                    time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(base + i)),
+                )
+            )
+            if len(batch) == 10000:
+                conn.executemany(_INSERT_WORKFLOW, batch)
+                batch = []
+        if batch:
+            conn.executemany(_INSERT_WORKFLOW, batch)
+        conn.execute("ANALYZE")
+    return user_ids
+
+
+def bench_db(rows: int, iterations: int) -> Dict[str, dict]:
+    user_ids = seed_workflows(rows)
+    with db.get_connection() as conn:
+        workflow_ids = [
+            row[0]
+            for row in conn.execute(
+                "SELECT id FROM workflows ORDER BY random() LIMIT ?", (iterations + 3,)
+            )
+        ]
+
+    def get(i: int) -> None:
+        get_workflow_from_db(workflow_ids[i % len(workflow_ids)])
+
+    def list_pages(i: int) -> None:
+        user_id = user_ids[i % len(user_ids)]
+        fields = ["id", "description", "created_at"]
+        _, cursor = list_workflows_for_user(user_id, fields, 50, None)
+        list_workflows_for_user(user_id, fields, 50, cursor)
+
+    return {
+        f"db/{rows}/get": summarize(measure(get, iterations)),
+        f"db/{rows}/list": summarize(measure(list_pages, iterations)),
+    }
+
+
+def bench_concurrent_saves(ops_per_thread: int) -> Dict[str, dict]:
+    architecture = clinical_architecture(5)
+    with db.get_connection() as conn:
+        user_id = conn.execute(
+            "INSERT INTO users (username, password) VALUES (?, ?)",
+            (f"bench_writer_{uuid.uuid4().hex[:6]}", "x"),
+        ).lastrowid
+
+    results = {}
+    for threads in (1, 4, 8):
+        samples: List[float] = []
+        lock = threading.Lock()
+
+        def writer() -> None:
+            local = measure(
+                lambda i: save_workflow(user_id, f"bench save {i}", architecture),
+                ops_per_thread,
+                warmup=0,
+            )
+            with lock:
+                samples.extend(local)
+
+        workers = [threading.Thread(target=writer) for _ in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        results[f"save/{threads}"] = summarize(samples, time.perf_counter() - start)
+    return results
+
+
+def bench_clinical(iterations: int, patients: int) -> Dict[str, dict]:
+    source = get_data_source()
+    ids = [f"P{1000 + i}" for i in range(patients)]
+    rng = random.Random(0)
+    results = {
+        "clinical/patient": summarize(
+            measure(lambda i: source.patient(rng.choice(ids)), iterations)
+        )
+    }
+    for kind in RECORD_ORDER:
+        results[f"clinical/{kind}"] = summarize(
+            measure(lambda i: source.records(kind, rng.choice(ids)), iterations)
+        )
+    tool_cache.enabled = False
+    try:
+        with quiet():
+            samples = measure(
+                lambda i: lab_service(patient_id=rng.choice(ids), connection_id="bench"),
+                iterations,
+            )
+            results["clinical/tool"] = summarize(samples)
+            # Same shape every time, so only the first call translates
+            samples = measure(
+                lambda i: custom_query(
+                    connection_id="bench",
+                    user_query=f"appointments for {rng.choice(ids)} since 2025-01-01",
+                ),
+                iterations,
+            )
+            results["clinical/custom_query"] = summarize(samples)
+            samples = measure(
+                lambda i: bulk_lab_service(
+                    patient_ids=rng.sample(ids, 100), connection_id="bench"
+                ),
+                iterations,
+            )
+            results["clinical/bulk_tool"] = summarize(samples)
+    finally:
+        tool_cache.enabled = True
+    return results
+
+
+def bench_execute(iterations: int) -> Dict[str, dict]:
+    from fastapi.testclient import TestClient
+
+    import main
+
+    architecture = clinical_architecture(5, fan_out=True)
+    with db.get_connection() as conn:
+        user_id = conn.execute(
+            "INSERT INTO users (username, password) VALUES (?, ?)",
+            (f"bench_exec_{uuid.uuid4().hex[:6]}", "x"),
+        ).lastrowid
+    workflow_id = save_workflow(user_id, "bench execute", architecture)
+    graph_cache.clear()
+
+    with TestClient(main.app) as client, quiet():
+
+        def execute(i: int) -> None:
+            response = client.get(
+                "/workflow/execute",
+                params={"workflow_id": workflow_id, "input": f"Review patient P{1000 + i}"},
+            )
+            response.raise_for_status()
+
+        samples = measure(execute, iterations)
+    return {"execute": summarize(samples)}
+
+
+def compare(
+    results: Dict[str, dict], baseline: Dict[str, dict], threshold: float
+) -> List[str]:
+    """Print a comparison table and return the cases that regressed."""
+    regressions = []
+    print(f"\n{'case':<22}{'p50 ms':>10}{'base':>10}{'p95 ms':>10}{'base':>10}  change")
+    for case, stats in results.items():
+        base = baseline.get(case)
+        if not base:
+            print(
+                f"{case:<22}{stats['p50_ms']:>10.3f}{'-':>10}"
+                f"{stats['p95_ms']:>10.3f}{'-':>10}  new"
+            )
+            continue
+        change = stats["p50_ms"] / base["p50_ms"] - 1 if base["p50_ms"] else 0.0
+        change_p95 = stats["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        regressed = change > threshold or change_p95 > threshold
+        if regressed:
+            regressions.append(case)
+        print(
+            f"{case:<22}{stats['p50_ms']:>10.3f}{base['p50_ms']:>10.3f}"
+            f"{stats['p95_ms']:>10.3f}{base['p95_ms']:>10.3f}  {change:+.0%}"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+
+def run(args: argparse.Namespace, workdir: str) -> Dict[str, dict]:
+    db.configure_db(os.path.join(workdir, "bench.db"))
+    db.init_db()
+    clinical_db = os.path.join(workdir, "clinical.db")
+    generate(clinical_db, args.patients)
+    configure_data_source(clinical_db)
+
+    results: Dict[str, dict] = {}
+    steps = [("graph build", lambda: bench_graph_build(args.iterations))]
+    steps += [
+        (f"db {rows} rows", lambda rows=rows: bench_db(rows, args.iterations))
+        for rows in args.rows
+    ]
+    steps += [
+        ("concurrent saves", lambda: bench_concurrent_saves(args.save_ops)),
+        ("clinical store", lambda: bench_clinical(args.iterations, args.patients)),
+        ("execute", lambda: bench_execute(max(10, args.iterations // 4))),
+    ]
+    for label, step in steps:
+        start = time.perf_counter()
+        results.update(step())
+        print(f"{label:<20} done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000])
+    parser.add_argument("--save-ops", type=int, default=100, help="saves per writer thread")
+    parser.add_argument(
+        "--patients", type=int, default=20000, help="synthetic clinical store size"
+    )
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument(
+        "--keep-workdir", action="store_true", help="keep the benchmark databases"
+    )
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="workflow-bench-")
+    try:
+        results = run(args, workdir)
+    finally:
+        if args.keep_workdir:
+            print(f"Benchmark databases kept in {workdir}", file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "model_provider": os.environ["MODEL_PROVIDER"],
+            "iterations": args.iterations,
+            "rows": args.rows,
+            "patients": args.patients,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\nRegressed beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
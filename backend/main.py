@@ -1,20 +1,68 @@
+import logging
+import os
+import threading
+import time
 from contextlib import asynccontextmanager
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import uvicorn
-from app.agents import architect_agent, planner_agent
-from app.tools import available_tools
+from app.architecture import InvalidArchitectureError
+from app.batch import (
+    BATCH_DEFAULT_CONCURRENCY,
+    BATCH_MAX_CONCURRENCY,
+    batch_result_stream,
+    parse_batch_inputs,
+    parse_ndjson,
+)
+from app.budget import BudgetExceededError
+from app.db import init_db
+from app.executor import run_workflow
+from app.generation import generate_workflow, generation_cache_stats
+from app.graph_cache import graph_cache
+from app.history import history_writer, list_execution_history
+from app.jobs import job_manager
+from app.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_FLIGHT, registry
+from app.streaming import workflow_event_stream
+from app.telemetry import setup_tracing, span
+from app.tool_cache import tool_cache
 from app.utils import (
+    WORKFLOW_LIST_FIELDS,
     get_workflow_from_db,
-    init_db,
-    json_to_strands_graph,
     list_workflows_for_user,
     login_user,
     register_user,
     save_workflow,
+    set_workflow_budget,
 )
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import Body, FastAPI, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+# MCP gateway tools are optional; without a gateway the MCP client is never imported
+GATEWAY_URL = os.getenv("GATEWAY_URL")
+# Load Strands, the model client and the tool index in the background once
+# the server is up, so the first real request does not pay for them either
+STARTUP_PREWARM = os.getenv("STARTUP_PREWARM", "true").lower() in ("1", "true", "yes")
+
+logger = logging.getLogger(__name__)
+
+
+def prewarm() -> None:
+    """Import and build what the first generation or execution would need."""
+    try:
+        import app.hooks  # noqa: F401
+        import app.scheduler  # noqa: F401
+        import app.tools  # noqa: F401
+        from app.clinical_store import get_data_source
+        from app.models import get_default_model
+        from app.prompts import get_tool_index
+
+        get_default_model()
+        get_tool_index()
+        get_data_source()
+    except Exception:
+        logger.exception("Startup prewarm failed; loading on first use instead")
 
 
 # =========================
@@ -22,9 +70,21 @@ from fastapi.middleware.cors import CORSMiddleware
 # =========================
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database on app startup."""
+    """Initialize database on app startup; stop job workers and flush history on shutdown."""
+    setup_tracing()
     init_db()
+    job_manager.recover()
+    if STARTUP_PREWARM:
+        threading.Thread(target=prewarm, name="startup-prewarm", daemon=True).start()
+    if GATEWAY_URL:
+        from app.mcp_client import mcp_sessions
+
+        mcp_sessions.warm_in_background()
     yield
+    job_manager.shutdown()
+    history_writer.close()
+    if GATEWAY_URL:
+        mcp_sessions.close()
 
 
 app = FastAPI(
@@ -40,9 +100,44 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    """
+    Root span and latency histogram for every request. Spans for graph
+    builds, workflow runs, nodes, model calls and tool calls nest under it.
+    Streaming responses are timed until their first byte.
+    """
+    start = time.perf_counter()
+    status = 500
+    with (
+        span(
+            f"{request.method} {request.url.path}", **{"http.method": request.method}
+        ) as current,
+        HTTP_REQUESTS_IN_FLIGHT.track(),
+    ):
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # Label by route template so ids in the path don't explode cardinality
+            route = request.scope.get("route")
+            path = route.path if route else "unmatched"
+            current.update_name(f"{request.method} {path}")
+            current.set_attribute("http.route", path)
+            current.set_attribute("http.status_code", status)
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=request.method,
+                route=path,
+                status=str(status),
+            )
+
+
 # =========================
 # 🚀 Endpoints
 # =========================
@@ -52,32 +147,66 @@ app.add_middleware(
 async def workflow_generator(
     user_id: str = Query(..., description="User ID for which to generate workflow"),
     description: str = Query(..., description="Description of the workflow"),
+    force_regenerate: bool = Query(
+        False, description="Skip the generation cache and call the model again"
+    ),
 ) -> Dict[str, Any]:
     """
     Generate a workflow by planning and architecting its structure.
+    Identical descriptions are served from the generation cache.
     Saves the workflow to the database and returns its ID.
     """
     try:
-        plan = planner_agent(description).message["content"][0]["text"]
-        architecture = architect_agent(plan).message["content"][0]["text"]
+        plan, architecture, cached = await run_in_threadpool(
+            generate_workflow, description, force_regenerate
+        )
         workflow_id = save_workflow(user_id, description, architecture)
-        return {"workflow_id": workflow_id, "status": "success"}
+        return {"workflow_id": workflow_id, "status": "success", "cached": cached}
+    except InvalidArchitectureError as e:
+        raise HTTPException(status_code=422, detail=f"Generated architecture is invalid: {e}")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate workflow: {e}")
 
 
 @app.get("/workflow/list")
 async def list_workflows(
+    response: Response,
     user_id: str = Query(..., description="User ID"),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return (id, description, architecture, created_at, avg_cost_usd); default all",
+    ),
+    limit: Optional[int] = Query(
+        None, ge=1, le=500, description="Page size; omit to return every workflow"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="Value of X-Next-Cursor from the previous page"
+    ),
 ) -> List[Dict[str, Any]]:
     """
-    List all workflows belonging to a user.
+    List workflows belonging to a user, newest first.
+
+    With `limit`, results are paginated and the cursor for the next page
+    is returned in the `X-Next-Cursor` response header.
     """
+    selected = (
+        [f.strip() for f in fields.split(",") if f.strip()]
+        if fields
+        else WORKFLOW_LIST_FIELDS
+    )
     try:
-        workflows = list_workflows_for_user(user_id)
-        return workflows
+        workflows, next_cursor = list_workflows_for_user(
+            user_id, selected, limit, cursor
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list workflows: {e}")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return workflows
 
 
 @app.get("/workflow/execute")
@@ -87,18 +216,166 @@ async def execute_workflow(
 ) -> Dict[str, Any]:
     """
     Execute a workflow using the given input and return the final result.
+    A run over a degrading budget returns `status: "degraded"`; one over an
+    aborting budget fails with a 422.
     """
     try:
-        workflow_json = get_workflow_from_db(workflow_id)
-        graph = json_to_strands_graph(workflow_json, available_tools)
-        response = graph(input)
-        last_key = list(response.results.keys())[-1]
-        final_result = response.results[last_key].result.message["content"][0]["text"]
-        return {"workflow_id": workflow_id, "result": final_result}
+        return await run_in_threadpool(run_workflow, workflow_id, input)
+    except HTTPException:
+        raise
+    except BudgetExceededError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Workflow execution failed: {e}")
 
 
+@app.put("/workflow/{workflow_id}/budget")
+async def update_workflow_budget(
+    workflow_id: str, budget: Optional[Dict[str, Any]] = Body(None)
+) -> Dict[str, Any]:
+    """
+    Set the per-run budget of a workflow, e.g. {"max_tokens": 50000,
+    "max_cost_usd": 0.25, "max_latency_ms": 60000, "on_exceed": "degrade"}.
+    An empty body removes it.
+    """
+    architecture = await run_in_threadpool(set_workflow_budget, workflow_id, budget)
+    return {"workflow_id": workflow_id, "budget": architecture.get("budget")}
+
+
+@app.get("/workflow/execute/stream")
+async def stream_workflow(
+    workflow_id: str = Query(..., description="Workflow ID to execute"),
+    input: str = Query(..., description="Input to run the workflow"),
+) -> StreamingResponse:
+    """
+    Execute a workflow and stream its progress as server-sent events:
+    one event per node start, tool call and node completion (with the
+    node's output), followed by the final result.
+    """
+    return StreamingResponse(
+        workflow_event_stream(workflow_id, input),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/workflow/{workflow_id}/execute_batch")
+async def execute_workflow_batch(
+    workflow_id: str,
+    request: Request,
+    concurrency: int = Query(
+        BATCH_DEFAULT_CONCURRENCY,
+        ge=1,
+        le=BATCH_MAX_CONCURRENCY,
+        description="Number of inputs executed at the same time",
+    ),
+) -> StreamingResponse:
+    """
+    Execute a workflow over many inputs and stream one NDJSON result line
+    per input as it completes, followed by a summary line.
+
+    The body is either JSON (`{"inputs": [...]}` or a bare list) or NDJSON,
+    sent raw as application/x-ndjson or as a multipart upload in `file`.
+    Each input is a string or an object `{"input": ..., "id": ...}`; the
+    `id` and the input's `index` are echoed back on its result line.
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=422, detail="Expected an NDJSON file in 'file'")
+        items = parse_ndjson(await upload.read())
+    elif content_type.startswith("application/x-ndjson"):
+        items = parse_ndjson(await request.body())
+    else:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=422, detail="Body must be JSON or NDJSON")
+        items = parse_batch_inputs(body.get("inputs") if isinstance(body, dict) else body)
+
+    # Fail fast with 404/400 before the stream starts
+    workflow_json = await run_in_threadpool(get_workflow_from_db, workflow_id)
+    return StreamingResponse(
+        batch_result_stream(workflow_id, workflow_json, items, concurrency),
+        media_type="application/x-ndjson",
+    )
+
+
+@app.get("/workflow/history")
+async def workflow_history(
+    workflow_id: str = Query(..., description="Workflow ID"),
+    limit: int = Query(50, ge=1, le=500, description="Number of runs to return"),
+) -> List[Dict[str, Any]]:
+    """
+    Recent executions of a workflow, newest first, with total latency,
+    token counts, per-node timings and the tool calls made.
+    """
+    try:
+        return await run_in_threadpool(list_execution_history, workflow_id, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load history: {e}")
+
+
+@app.post("/workflow/jobs")
+async def submit_workflow_job(
+    workflow_id: str = Query(..., description="Workflow ID to execute"),
+    input: str = Query(..., description="Input to run the workflow"),
+) -> Dict[str, Any]:
+    """
+    Queue a workflow execution on the worker pool and return its job ID
+    immediately. Poll `/workflow/jobs/{job_id}` for status and result.
+    """
+    job_id = job_manager.submit(workflow_id, input)
+    return {"job_id": job_id, "status": "queued"}
+
+
+@app.get("/workflow/jobs/{job_id}")
+async def get_workflow_job(job_id: str) -> Dict[str, Any]:
+    """
+    Return the status of a queued workflow execution, with its result
+    once it has finished.
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/workflow/cache/stats")
+async def cache_stats() -> Dict[str, Any]:
+    """
+    Hit/miss counters for the compiled-graph, generation, tool result and
+    custom_query plan caches, plus MCP gateway sessions and tool spec
+    version when configured.
+    """
+    from app.query_engine import query_engine
+
+    stats = {
+        "graph_cache": graph_cache.stats(),
+        "generation_cache": await run_in_threadpool(generation_cache_stats),
+        "tool_cache": tool_cache.stats(),
+        "query_plans": query_engine.stats(),
+    }
+    if GATEWAY_URL:
+        from app.mcp_client import mcp_sessions
+
+        stats["mcp"] = mcp_sessions.stats()
+    return stats
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """
+    Prometheus scrape endpoint: latency histograms per route, workflow, node,
+    model call and tool, plus in-flight gauges.
+    """
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.post("/user/register")
 async def register(
     username: str = Query(..., description="Unique username for the user"),
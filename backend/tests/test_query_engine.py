@@ -0,0 +1,195 @@
+import sqlite3
+
+import pytest
+
+from app.clinical_store import SQLiteClinicalStore
+from app.query_engine import QueryEngine, RuleTranslator
+from app.synthetic_data import generate
+
+APPOINTMENT_COLUMNS = (
+    "appointments.patient_id, appointments.date, appointments.department, "
+    "appointments.doctor, appointments.status, appointments.cost_usd"
+)
+PATIENT_COLUMNS = (
+    "patients.patient_id, patients.name, patients.dob, patients.gender, "
+    "patients.blood_group, patients.status"
+)
+AGE = "CAST((julianday('now') - julianday(patients.dob)) / 365.25 AS INTEGER)"
+
+
+@pytest.mark.parametrize(
+    "shape, sql",
+    [
+        (
+            "top {number} departments by {status} appointment cost",
+            "SELECT appointments.department AS department, COUNT(*) AS appointments, "
+            "ROUND(SUM(appointments.cost_usd), 2) AS total_cost_usd FROM appointments "
+            "WHERE appointments.status = :p2 GROUP BY department "
+            "ORDER BY total_cost_usd DESC LIMIT :p1",
+        ),
+        (
+            "departments by {status} appointment cost",
+            "SELECT appointments.department AS department, COUNT(*) AS appointments, "
+            "ROUND(SUM(appointments.cost_usd), 2) AS total_cost_usd FROM appointments "
+            "WHERE appointments.status = :p1 GROUP BY department "
+            "ORDER BY total_cost_usd DESC",
+        ),
+        (
+            "{status} appointments per patient above {number}",
+            "SELECT appointments.patient_id AS patient_id, COUNT(*) AS count "
+            "FROM appointments WHERE appointments.status = :p1 GROUP BY patient_id "
+            "HAVING COUNT(*) > :p2 ORDER BY count DESC",
+        ),
+        (
+            "list appointments for {patient} and {patient}",
+            f"SELECT {APPOINTMENT_COLUMNS} FROM appointments "
+            "WHERE appointments.patient_id IN (:p1, :p2) "
+            "ORDER BY appointments.date DESC",
+        ),
+        (
+            "{status} appointment rate by department",
+            "SELECT appointments.department AS department, COUNT(*) AS appointments, "
+            "ROUND(100.0 * SUM(appointments.status = :p1) / COUNT(*), 2) AS rate_pct "
+            "FROM appointments GROUP BY department ORDER BY rate_pct DESC",
+        ),
+        (
+            "average blood pressure by age",
+            f"SELECT ({AGE} / 10) * 10 AS age_band, COUNT(*) AS count, "
+            "ROUND(AVG(vitals.systolic), 1) AS avg_systolic, "
+            "ROUND(AVG(vitals.diastolic), 1) AS avg_diastolic FROM vitals "
+            "JOIN patients ON patients.patient_id = vitals.patient_id "
+            "GROUP BY age_band ORDER BY age_band",
+        ),
+        (
+            "patients with {condition} and {condition}",
+            f"SELECT {PATIENT_COLUMNS} FROM patients WHERE "
+            "patients.patient_id IN "
+            "(SELECT patient_id FROM conditions WHERE condition = :p1) AND "
+            "patients.patient_id IN "
+            "(SELECT patient_id FROM conditions WHERE condition = :p2) "
+            "ORDER BY patients.patient_id",
+        ),
+        (
+            "patients with {condition} or {condition}",
+            f"SELECT {PATIENT_COLUMNS} FROM patients WHERE "
+            "patients.patient_id IN "
+            "(SELECT patient_id FROM conditions WHERE condition IN (:p1, :p2)) "
+            "ORDER BY patients.patient_id",
+        ),
+        (
+            "how many patients are not {condition}",
+            "SELECT COUNT(DISTINCT patients.patient_id) AS patients FROM patients "
+            "WHERE patients.patient_id NOT IN "
+            "(SELECT patient_id FROM conditions WHERE condition = :p1)",
+        ),
+        (
+            "how many appointments were not {status}",
+            "SELECT COUNT(*) AS count FROM appointments "
+            "WHERE appointments.status != :p1",
+        ),
+        (
+            "list appointments excluding {status} ones",
+            f"SELECT {APPOINTMENT_COLUMNS} FROM appointments "
+            "WHERE appointments.status != :p1 ORDER BY appointments.date DESC",
+        ),
+        (
+            "patients without {condition} or {condition}",
+            f"SELECT {PATIENT_COLUMNS} FROM patients WHERE "
+            "patients.patient_id NOT IN "
+            "(SELECT patient_id FROM conditions WHERE condition IN (:p1, :p2)) "
+            "ORDER BY patients.patient_id",
+        ),
+        (
+            "patients with {condition} but not {condition}",
+            f"SELECT {PATIENT_COLUMNS} FROM patients WHERE "
+            "patients.patient_id IN "
+            "(SELECT patient_id FROM conditions WHERE condition = :p1) AND "
+            "patients.patient_id NOT IN "
+            "(SELECT patient_id FROM conditions WHERE condition = :p2) "
+            "ORDER BY patients.patient_id",
+        ),
+        (
+            "how many {condition} patients",
+            "SELECT COUNT(DISTINCT patients.patient_id) AS patients FROM patients "
+            "WHERE patients.patient_id IN "
+            "(SELECT patient_id FROM conditions WHERE condition = :p1)",
+        ),
+    ],
+)
+def test_rules_translate_shape(shape, sql):
+    assert RuleTranslator().translate(shape) == sql
+
+
+@pytest.mark.parametrize(
+    "shape",
+    [
+        "highest {test} by gender",  # no rule for a maximum
+        "{status} appointment rate and cost by department",  # cost left unused
+        "average cost of {test}",  # labs have no cost
+        "appointments above {number}",  # no column named for the comparison
+        "what is the weather",
+        "patients with no allergies",  # negates the entity, not a slot
+        "non-diabetic patients",
+        "how many patients had no {status} appointments",  # which have none
+        "patients without {condition} and {condition}",  # lacking both or either?
+        "{status} appointments per patient not above {number}",
+    ],
+)
+def test_rules_leave_unplaceable_questions_to_the_model(shape):
+    assert RuleTranslator().translate(shape) is None
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    db_file = str(tmp_path_factory.mktemp("clinical") / "clinical.db")
+    generate(db_file, 50)
+    store = SQLiteClinicalStore(db_file)
+    yield store
+    store.close()
+
+
+def test_run_binds_repeated_patients_and_reuses_the_plan(store):
+    engine = QueryEngine(translators=[RuleTranslator()])
+
+    first = engine.run(store, "list appointments for P1000 and P1001")
+    assert first["plan"] == "rules"
+    assert first["params"] == {"p1": "P1000", "p2": "P1001"}
+    assert {row["patient_id"] for row in first["rows"]} == {"P1000", "P1001"}
+
+    second = engine.run(store, "list appointments for P1002 and P1003")
+    assert second["plan"] == "cached"
+    assert {row["patient_id"] for row in second["rows"]} == {"P1002", "P1003"}
+
+
+def test_run_negation_complements_the_filter(store):
+    engine = QueryEngine(translators=[RuleTranslator()])
+
+    def count(question):
+        result = engine.run(store, question)
+        assert result["status"] == "success"
+        return next(iter(result["rows"][0].values()))
+
+    assert count("How many patients are not diabetic?") == count(
+        "How many patients without diabetes?"
+    )
+    assert count("How many patients have diabetes?") + count(
+        "How many patients are not diabetic?"
+    ) == count("How many patients are there?")
+    assert count("How many appointments were missed?") + count(
+        "How many appointments were not missed?"
+    ) == count("How many appointments are there?")
+    rows = engine.run(store, "List appointments excluding cancelled ones")["rows"]
+    assert rows and all(row["status"] != "cancelled" for row in rows)
+
+
+def test_run_limits_rows(store):
+    engine = QueryEngine(translators=[RuleTranslator()])
+    result = engine.run(store, "list appointments", max_rows=5, fetch_size=2)
+    assert result["row_count"] == 5
+    assert result["truncated"] is True
+
+
+def test_store_query_is_read_only(store):
+    with pytest.raises(sqlite3.DatabaseError):
+        with store.query("DELETE FROM patients"):
+            pass
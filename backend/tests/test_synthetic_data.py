@@ -0,0 +1,66 @@
+import os
+import sqlite3
+
+import pytest
+
+from app import clinical_store, synthetic_data
+from app.synthetic_data import generate
+
+
+def count(db_file, table):
+    conn = sqlite3.connect(db_file)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("patients", [0, 1, 2, 3])
+def test_generate_small_population(tmp_path, patients):
+    db_file = str(tmp_path / "clinical.db")
+    generate(db_file, patients)
+    assert count(db_file, "patients") == patients
+    assert not os.path.exists(f"{db_file}.partial")
+
+
+def test_generate_is_deterministic(tmp_path):
+    first, second = str(tmp_path / "a.db"), str(tmp_path / "b.db")
+    generate(first, 20, seed=7)
+    generate(second, 20, seed=7)
+    conn = sqlite3.connect(first)
+    conn.execute(f"ATTACH DATABASE '{second}' AS other")
+    try:
+        for table in ("patients", "appointments", "labs"):
+            difference = conn.execute(
+                f"SELECT COUNT(*) FROM (SELECT * FROM {table} "
+                f"EXCEPT SELECT * FROM other.{table})"
+            ).fetchone()[0]
+            assert difference == 0
+    finally:
+        conn.close()
+
+
+def test_generate_failure_removes_partial_file(tmp_path, monkeypatch):
+    db_file = str(tmp_path / "clinical.db")
+
+    def broken(*args):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(synthetic_data, "_patient", broken)
+    with pytest.raises(RuntimeError):
+        generate(db_file, 5)
+    assert os.listdir(tmp_path) == []
+
+
+def test_default_source_generates_missing_store(tmp_path, monkeypatch):
+    db_file = str(tmp_path / "clinical.db")
+    monkeypatch.setattr(clinical_store, "CLINICAL_DB_FILE", db_file)
+    monkeypatch.setattr(clinical_store, "CLINICAL_SYNTHETIC_PATIENTS", 1)
+    monkeypatch.setattr(clinical_store, "_default_source", None)
+
+    source = clinical_store.get_data_source()
+    try:
+        with source.query("SELECT patient_id FROM patients") as cursor:
+            assert [row[0] for row in cursor] == ["P1000"]
+    finally:
+        source.close()
@@ -1,137 +1,23 @@
-import hashlib
 import json
-import sqlite3
-import uuid
 from typing import Optional
 
 import requests
 import streamlit as st
+from app.db import get_connection, init_db
+from app.utils import login_user, register_user
 
 # Configuration
 API_BASE_URL = "http://localhost:8000"
-DB_FILE = "workflows.db"
-
-
-# Initialize Database
-def init_db():
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-
-    # Users table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-
-    # Workflows table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS workflows (
-            id TEXT PRIMARY KEY,
-            user_id INTEGER NOT NULL,
-            description TEXT NOT NULL,
-            architecture TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        )
-    """)
-
-    # Execution history table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS execution_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            workflow_id TEXT NOT NULL,
-            user_id INTEGER NOT NULL,
-            input TEXT NOT NULL,
-            output TEXT NOT NULL,
-            executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (workflow_id) REFERENCES workflows(id),
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        )
-    """)
-
-    conn.commit()
-    conn.close()
-
-
-# User Authentication
-def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
-
-
-def register_user(username: str, password: str) -> tuple[bool, str]:
-    try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        hashed_pw = hash_password(password)
-        cursor.execute(
-            "INSERT INTO users (username, password) VALUES (?, ?)",
-            (username, hashed_pw),
-        )
-        conn.commit()
-        conn.close()
-        return True, "Registration successful!"
-    except sqlite3.IntegrityError:
-        return False, "Username already exists"
-    except Exception as e:
-        return False, f"Error: {str(e)}"
-
-
-def login_user(username: str, password: str) -> tuple[bool, Optional[int]]:
-    try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        hashed_pw = hash_password(password)
-        cursor.execute(
-            "SELECT id FROM users WHERE username = ? AND password = ?",
-            (username, hashed_pw),
-        )
-        result = cursor.fetchone()
-        conn.close()
-
-        if result:
-            return True, result[0]
-        return False, None
-    except Exception as e:
-        st.error(f"Error: {str(e)}")
-        return False, None
 
 
 # Workflow Management
-def save_workflow(user_id: int, description: str, architecture: str) -> str:
-    workflow_id = str(uuid.uuid4())
-    try:
-        workflow_dict = json.loads(architecture)
-        print("$" * 20)
-        print(workflow_dict)
-        print("$" * 20)
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO workflows (id, user_id, description, architecture) VALUES (?, ?, ?, ?)",
-            (workflow_id, user_id, description, architecture),
-        )
-        conn.commit()
-        conn.close()
-        return workflow_id
-    except Exception as e:
-        st.error(f"Error saving workflow: {str(e)}")
-        return None
-
-
 def get_user_workflows(user_id: int):
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT id, description, created_at FROM workflows WHERE user_id = ? ORDER BY created_at DESC",
-            (user_id,),
-        )
-        workflows = cursor.fetchall()
-        conn.close()
+        with get_connection() as conn:
+            workflows = conn.execute(
+                "SELECT id, description, created_at FROM workflows WHERE user_id = ? ORDER BY created_at DESC",
+                (user_id,),
+            ).fetchall()
         return workflows
     except Exception as e:
         st.error(f"Error fetching workflows: {str(e)}")
@@ -140,44 +26,24 @@ def get_user_workflows(user_id: int):
 
 def get_workflow(workflow_id: str):
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT id, description, architecture, created_at FROM workflows WHERE id = ?",
-            (workflow_id,),
-        )
-        workflow = cursor.fetchone()
-        conn.close()
+        with get_connection() as conn:
+            workflow = conn.execute(
+                "SELECT id, description, architecture, created_at FROM workflows WHERE id = ?",
+                (workflow_id,),
+            ).fetchone()
         return workflow
     except Exception as e:
         st.error(f"Error fetching workflow: {str(e)}")
         return None
 
 
-def save_execution(workflow_id: str, user_id: int, input_text: str, output: str):
-    try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO execution_history (workflow_id, user_id, input, output) VALUES (?, ?, ?, ?)",
-            (workflow_id, user_id, input_text, output),
-        )
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        st.error(f"Error saving execution: {str(e)}")
-
-
 def get_execution_history(workflow_id: str, limit: int = 50):
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT input, output, executed_at FROM execution_history WHERE workflow_id = ? ORDER BY executed_at DESC LIMIT ?",
-            (workflow_id, limit),
-        )
-        history = cursor.fetchall()
-        conn.close()
+        with get_connection() as conn:
+            history = conn.execute(
+                "SELECT input, output, executed_at, latency_ms FROM execution_history WHERE workflow_id = ? ORDER BY executed_at DESC LIMIT ?",
+                (workflow_id, limit),
+            ).fetchall()
         return history
     except Exception as e:
         st.error(f"Error fetching history: {str(e)}")
@@ -185,11 +51,12 @@ def get_execution_history(workflow_id: str, limit: int = 50):
 
 
 # API Calls
-def generate_workflow(description: str) -> Optional[str]:
+def generate_workflow(user_id: int, description: str) -> Optional[dict]:
+    # The backend validates the architecture and saves the workflow itself
     try:
         response = requests.post(
             f"{API_BASE_URL}/workflow/generate",
-            params={"description": description},
+            params={"user_id": user_id, "description": description},
             timeout=60,
         )
         response.raise_for_status()
@@ -279,13 +146,11 @@ def show_workflow_generator():
         if st.button("Generate Workflow", type="primary", use_container_width=True):
             if description:
                 with st.spinner("Generating workflow..."):
-                    architecture = generate_workflow(description)
-                    if architecture:
-                        workflow_id = save_workflow(
-                            st.session_state.user_id,
-                            description,
-                            json.dumps(architecture),
-                        )
+                    generated = generate_workflow(
+                        st.session_state.user_id, description
+                    )
+                    if generated:
+                        workflow_id = generated["workflow_id"]
                         st.session_state.generated_workflow_id = workflow_id
                         st.success("✅ Workflow generated and saved!")
                         st.info(f"Workflow ID: {workflow_id}")
@@ -338,17 +203,12 @@ def show_chat_interface(workflow_id: str):
     if execute_btn and user_input:
         with st.spinner("Executing workflow..."):
             result = execute_workflow(workflow_id, user_input)
+            # The backend records the run in execution_history itself
             if result:
-                save_execution(
-                    workflow_id,
-                    st.session_state.user_id,
-                    user_input,
-                    json.dumps(result),
-                )
                 st.success("✅ Execution completed!")
                 with st.expander("📝 View Result"):
                     st.json(result)
-                st.write(result["content"][0]["text"])
+                st.write(result["result"])
 
     # Execution history
     st.divider()
@@ -356,12 +216,16 @@ def show_chat_interface(workflow_id: str):
 
     history = get_execution_history(workflow_id)
     if history:
-        for i, (inp, out, exec_time) in enumerate(history, 1):
-            with st.expander(f"Execution {i} - {exec_time}"):
+        for i, (inp, out, exec_time, latency_ms) in enumerate(history, 1):
+            took = f" ({latency_ms / 1000:.1f}s)" if latency_ms else ""
+            with st.expander(f"Execution {i} - {exec_time}{took}"):
                 st.write("**Input:**")
                 st.write(inp)
                 st.write("**Output:**")
-                st.json(json.loads(out) if isinstance(out, str) else out)
+                try:
+                    st.json(json.loads(out))
+                except ValueError:
+                    st.write(out)
     else:
         st.info("No execution history yet")
 
@@ -43,9 +43,12 @@ export default function Workflow() {
 
   if (currentWorkflow?.architecture) {
     try {
-      const parsedArchitecture = JSON.parse(
-        JSON.parse(currentWorkflow.architecture)
-      );
+      // Stored as canonical JSON; rows from before schema_version 1
+      // may still be a JSON-encoded string.
+      let parsedArchitecture = JSON.parse(currentWorkflow.architecture);
+      if (typeof parsedArchitecture === "string") {
+        parsedArchitecture = JSON.parse(parsedArchitecture);
+      }
       workflowData = parsedArchitecture;
       workflowTitle = parsedArchitecture.workflow_name;
     } catch (e) {
@@ -21,3 +21,38 @@ export async function executeWorkflow(workflow_id) {
   });
   return res.data;
 }
+
+// Streams execution progress over server-sent events. `onEvent` receives
+// every event (node_start, tool_call, tool_result, node_end, workflow_end,
+// error); the returned function closes the stream early.
+export function streamWorkflow(workflow_id, input, onEvent) {
+  const url = new URL(
+    "/workflow/execute/stream",
+    import.meta.env.VITE_PUBLIC_API_URL || window.location.origin
+  );
+  url.searchParams.set("workflow_id", workflow_id);
+  url.searchParams.set("input", input);
+
+  const source = new EventSource(url);
+  const events = [
+    "workflow_start",
+    "node_start",
+    "tool_call",
+    "tool_result",
+    "node_end",
+    "workflow_end",
+    "error",
+  ];
+  events.forEach((name) =>
+    source.addEventListener(name, (e) => {
+      if (!e.data) {
+        source.close();
+        return;
+      }
+      const payload = JSON.parse(e.data);
+      onEvent(payload);
+      if (name === "workflow_end" || name === "error") source.close();
+    })
+  );
+  return () => source.close();
+}